@@ -2,21 +2,36 @@
 桥梁冲刷计算系统 - Streamlit Web应用
 功能与原始Tkinter应用完全一致
 """
+from startup_profile import StartupProfiler
+
+STARTUP_BUDGET_SECONDS = 1.0  # 脚本单次运行到登录页的耗时预算（秒），设置 BRIDGE_STARTUP_PROFILE=1 时检查
+# Streamlit 每次交互都会重新执行本脚本，只分析进程内的首次运行
+startup_profiler = StartupProfiler('app', budget=STARTUP_BUDGET_SECONDS, once=True)
+startup_profiler.start_import_tracking()
+
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # 使用非交互式后端
-import pandas as pd
-from io import StringIO, BytesIO
-import re
-
-# 导入计算模块
+from io import BytesIO
+import hashlib
+
+# 导入计算模块（scipy 在首次积分时才导入）
 from bridge_calculations import *
+from bridge_plotting import draw_cross_section
+
+startup_profiler.stop_import_tracking()
+startup_profiler.mark('模块导入')
 
-plt.rcParams["font.family"] = ["WenQuanYi Micro Hei", "SimHei", "Heiti TC"]
-# 解释：按顺序查找字体，找到可用的中文字体即停止，兼容不同系统
-plt.rcParams["axes.unicode_minus"] = False  # 强制解决负号显示异常
+
+def load_pyplot():
+    """首次绘图时导入 matplotlib（非交互式后端）并设置中文字体"""
+    import matplotlib
+    matplotlib.use('Agg')  # 使用非交互式后端
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["font.family"] = ["WenQuanYi Micro Hei", "SimHei", "Heiti TC"]
+    # 解释：按顺序查找字体，找到可用的中文字体即停止，兼容不同系统
+    plt.rcParams["axes.unicode_minus"] = False  # 强制解决负号显示异常
+    return plt
 
 
 # 页面配置
@@ -74,7 +89,10 @@ def check_user_auth():
     return False
 
 # -------------------------- 第三步：执行登录验证，未通过则终止程序 --------------------------
-if not check_user_auth():
+authenticated = check_user_auth()
+startup_profiler.mark('登录验证')
+if not authenticated:
+    startup_profiler.report()
     st.stop()
 
 # 初始化session state
@@ -82,33 +100,41 @@ if 'distances' not in st.session_state:
     st.session_state.distances = None
     st.session_state.elevations = None
     st.session_state.calculation_results = None
+    st.session_state.pipeline = None
+
+# 缓存设置：解析结果和计算结果按内容缓存，超时或超出条目数后淘汰
+CACHE_TTL = 3600  # 缓存有效期（秒）
+CACHE_MAX_ENTRIES = 32  # 每个缓存函数保留的最大条目数
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def parse_cross_section_data(content):
+    """解析断面数据文本（str 或 bytes），按内容缓存，内容不变时不重复解析
+
+    返回 (distances, elevations, bad_lines)，有效数据点不足时距离、高程为 None。
+    """
+    try:
+        return parse_cross_section_text(content)
+    except SectionParseError as e:
+        return None, None, e.bad_lines
+
+def parsed_section_with_warning(parsed):
+    """提示被跳过的格式错误行，返回 (distances, elevations)"""
+    distances, elevations, bad_lines = parsed
+    if bad_lines:
+        st.warning(f"第 {format_bad_lines(bad_lines)}数据格式错误，已跳过")
+    return distances, elevations
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def run_analysis_cached(distances, elevations, params, _pipeline):
+    """按断面数据和参数缓存完整计算结果；未命中时用会话流水线增量计算"""
+    _pipeline.set_section((distances, elevations))
+    return _pipeline.run(params)
 
 def read_cross_section_from_file(uploaded_file):
     """从上传的文件读取断面数据"""
     try:
         if uploaded_file is not None:
-            # 读取文件内容
-            content = uploaded_file.read().decode('utf-8')
-            lines = content.strip().split('\n')
-            
-            distances = []
-            elevations = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                # 支持空格、制表符、逗号分隔
-                parts = re.split(r'[\s,\t]+', line)
-                if len(parts) >= 2:
-                    try:
-                        distances.append(float(parts[0]))
-                        elevations.append(float(parts[1]))
-                    except ValueError:
-                        continue
-            
-            if len(distances) >= 2:
-                return np.array(distances), np.array(elevations)
+            return parsed_section_with_warning(parse_cross_section_data(uploaded_file.getvalue()))
     except Exception as e:
         st.error(f"读取文件错误: {str(e)}")
     return None, None
@@ -117,90 +143,51 @@ def read_cross_section_from_text(text_input):
     """从文本输入读取断面数据"""
     try:
         if text_input:
-            lines = text_input.strip().split('\n')
-            distances = []
-            elevations = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                parts = re.split(r'[\s,\t]+', line)
-                if len(parts) >= 2:
-                    try:
-                        distances.append(float(parts[0]))
-                        elevations.append(float(parts[1]))
-                    except ValueError:
-                        continue
-            
-            if len(distances) >= 2:
-                return np.array(distances), np.array(elevations)
+            return parsed_section_with_warning(parse_cross_section_data(text_input))
     except Exception as e:
         st.error(f"解析文本数据错误: {str(e)}")
     return None, None
 
+# 页面断面图样式：沿用网页版原有的浅色网格
+APP_PLOT_CONFIG = {
+    'title': '河道横断面图', 'xlabel': '距离 (m)', 'ylabel': '高程 (m)',
+    'xmin': None, 'xmax': None, 'ymin': None, 'ymax': None,
+    'grid_alpha': 0.3, 'grid_style': '-',
+}
+
 def plot_cross_section(distances, elevations, water_level=None, design_water_level=None,
-                       channel_boundaries=None, pier_obstructions=None, title="河道横断面图"):
-    """绘制河道横断面图"""
-    fig, ax = plt.subplots(figsize=(12, 6))
-    
-    ax.plot(distances, elevations, 'k-', linewidth=2, label='河道断面')
-    ax.fill_between(distances, elevations, np.min(elevations) - 1, color='lightgray', alpha=0.5)
-
-    # 绘制平滩水位线
-    if water_level is not None:
-        ax.axhline(y=water_level, color='b', linestyle='--', linewidth=1.5, label='平滩水位')
-        intersections = find_waterline_intersections(distances, elevations, water_level)
-        if len(intersections) >= 2:
-            start_idx = np.argmin(np.abs(distances - intersections[0]))
-            end_idx = np.argmin(np.abs(distances - intersections[1]))
-            x = np.concatenate([[distances[start_idx]], distances[start_idx:end_idx + 1], [distances[end_idx]]])
-            y = np.concatenate([[water_level], elevations[start_idx:end_idx + 1], [water_level]])
-            ax.fill(x, y, 'b', alpha=0.3)
-
-    # 绘制设计水位线
-    if design_water_level is not None:
-        ax.axhline(y=design_water_level, color='r', linestyle='-', linewidth=1.5, label='设计水位')
-        intersections = find_waterline_intersections(distances, elevations, design_water_level)
-        if len(intersections) >= 2:
-            start_idx = np.argmin(np.abs(distances - intersections[0]))
-            end_idx = np.argmin(np.abs(distances - intersections[1]))
-            x = np.concatenate([[distances[start_idx]], distances[start_idx:end_idx + 1], [distances[end_idx]]])
-            y = np.concatenate([[design_water_level], elevations[start_idx:end_idx + 1], [design_water_level]])
-            ax.fill(x, y, 'r', alpha=0.2)
-
-    # 标记河槽和河滩的分界点
-    if channel_boundaries is not None and len(channel_boundaries) == 2:
-        ax.axvline(x=channel_boundaries[0], color='g', linestyle='-.', linewidth=1.5, label='河槽左边界')
-        ax.axvline(x=channel_boundaries[1], color='g', linestyle='-.', linewidth=1.5, label='河槽右边界')
-
-    # 标记桥墩位置和阻水区域
-    if pier_obstructions and len(pier_obstructions) > 0:
-        for i, pier in enumerate(pier_obstructions):
-            pier_pos = pier['position']
-            depth = pier['depth']
-            region = pier['region']
-            
-            color = 'purple' if region == '河槽' else 'blue' if region == '左河滩' else 'red'
-            
-            ax.axvline(x=pier_pos, color=color, linestyle='--', linewidth=1,
-                      label=f'桥墩 {i + 1} ({region})' if i == 0 else '')
-            
-            if design_water_level is not None:
-                ax.plot([pier_pos, pier_pos], [design_water_level - depth, design_water_level],
-                       color, marker='o', markersize=4)
-                ax.text(pier_pos, design_water_level + 0.5, f'墩{i + 1}: {depth:.1f}m',
-                       horizontalalignment='center', rotation=90, color=color)
-
-    ax.set_xlabel('距离 (m)')
-    ax.set_ylabel('高程 (m)')
-    ax.set_title(title)
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    plt.tight_layout()
-    
+                       channel_boundaries=None, pier_obstructions=None, title="河道横断面图", dpi=None):
+    """绘制河道横断面图，dpi 为输出分辨率，用于确定断面线抽稀程度"""
+    plt = load_pyplot()
+    fig = plt.figure(figsize=(12, 6))
+    draw_cross_section(fig, distances, elevations, water_level, design_water_level,
+                       channel_boundaries, pier_obstructions, title, APP_PLOT_CONFIG, dpi)
     return fig
 
+SCREEN_DPI = 100  # 页面显示分辨率
+EXPORT_DPI = 300  # 下载图形分辨率
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def render_cross_section_png(distances, elevations, water_level=None, design_water_level=None,
+                             channel_boundaries=None, pier_obstructions=None, title="河道横断面图",
+                             dpi=SCREEN_DPI):
+    """绘制断面图并输出 PNG 字节，按绘图数据和分辨率缓存，绘制后立即释放图形"""
+    fig = plot_cross_section(distances, elevations, water_level, design_water_level,
+                             channel_boundaries, pier_obstructions, title, dpi)
+    try:
+        buf = BytesIO()
+        fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+        return buf.getvalue()
+    finally:
+        load_pyplot().close(fig)
+
+def result_digest(params, distances, elevations):
+    """计算结果标识：断面数据和参数的摘要"""
+    digest = hashlib.md5(repr(sorted(params.items())).encode())
+    digest.update(np.ascontiguousarray(distances, dtype=float).tobytes())
+    digest.update(np.ascontiguousarray(elevations, dtype=float).tobytes())
+    return digest.hexdigest()
+
 def format_results(params, obstruction_results, flow_areas, flow_distribution,
                   scour_results, local_scour_results):
     """格式化计算结果输出"""
@@ -385,146 +372,25 @@ with tab1:
                     
                     # 执行计算
                     with st.spinner("正在计算..."):
-                        # 计算平滩水位下的水力参数
-                        avg_depth, max_depth, _, _ = calculate_hydraulic_parameters(
-                            distances, elevations, water_level)
-                        
-                        if avg_depth is None:
-                            raise ValueError("平滩水位设置不合理，无法计算水力参数")
-                        
-                        # 识别河槽和河滩的分界点
-                        boundary1, boundary2 = identify_channel_and_floodplain(
-                            distances, elevations, water_level)
-                        
-                        if boundary1 is None or boundary2 is None:
-                            raise ValueError("无法识别河槽和河滩的分界点")
-                        
-                        # 计算设计水位下的参数
-                        avg_depth_design, max_depth_design, flow_area, _ = calculate_hydraulic_parameters(
-                            distances, elevations, design_water_level)
-                        
-                        if avg_depth_design is None:
-                            raise ValueError("设计水位设置不合理，无法计算水力参数")
-                        
-                        # 计算各区域过水面积
-                        left_area, channel_area, right_area = calculate_flow_areas(
-                            distances, elevations, design_water_level, boundary1, boundary2)
-                        
-                        if left_area is None:
-                            raise ValueError("无法计算各区域过水面积")
-                        
-                        # 解析桥梁配置
-                        spans = parse_bridge_config(bridge_config)
-                        if not spans:
-                            raise ValueError("桥梁配置解析失败，请检查格式")
-                        
-                        # 计算桥墩阻水面积
-                        intersections = find_waterline_intersections(
-                            distances, elevations, design_water_level)
-                        
-                        obstruction_results = calculate_bridge_obstruction(
-                            spans, pier_width, skew_angle, design_water_level, distances, elevations,
-                            bridge_start, boundary1, boundary2)
-                        
-                        (total_obstruction_area, obstruction_ratio, pier_obstructions,
-                         left_obstruction_area, channel_obstruction_area, right_obstruction_area,
-                         left_obstruction_width, channel_obstruction_width, right_obstruction_width) = obstruction_results
-                        
-                        # 计算各区域阻水后的过流面积和宽度
-                        left_area_after = left_area - left_obstruction_area
-                        right_area_after = right_area - right_obstruction_area
-                        channel_area_after = channel_area - channel_obstruction_area
-                        
-                        left_width_after = (boundary1 - intersections[0]) - left_obstruction_width
-                        right_width_after = (intersections[1] - boundary2) - right_obstruction_width
-                        channel_width_after = (boundary2 - boundary1) - channel_obstruction_width
-                        
-                        left_width_before = (boundary1 - intersections[0])
-                        channel_width_before = (boundary2 - boundary1)
-                        right_width_before = (intersections[1] - boundary2)
-                        
-                        # 计算各区域平均水深
-                        left_depth_after = left_area_after / left_width_after if left_width_after > 0 else 0
-                        right_depth_after = right_area_after / right_width_after if right_width_after > 0 else 0
-                        channel_depth_after = channel_area_after / channel_width_after if channel_width_after > 0 else 0
-                        
-                        # 计算流量分布
-                        flow_distribution = calculate_flow_distribution(
-                            params, left_area, channel_area, right_area,
-                            left_area_after, channel_area_after, right_area_after,
-                            left_width_after, channel_width_after, right_width_after,
-                            left_width_before, channel_width_before, right_width_before)
-                        
-                        # 计算冲刷深度参数
-                        B = boundary2 - boundary1
-                        H = avg_depth
-                        Lcj = channel_width_after
-                        h_max = max_depth_design
-                        h_c = channel_depth_after
-                        B_c = B
-                        B_2 = channel_width_after
-                        
-                        # 计算一般冲刷深度
-                        scour_depth_64_1, A = calculate_scour(
-                            flow_distribution['channel_Q_final'], B_c, H, Lcj, h_max, h_c,
-                            mu, E, d)
-                        
-                        scour_depth_64_2, A_2 = calculate_scour_64_2(
-                            flow_distribution['channel_Q_final'], flow_distribution['Q_c'],
-                            B_c, B_2, obstruction_ratio, mu, h_max, B, H)
-                        
-                        # 确定一般冲刷深度
-                        if choice_h_p.lower() in ('y', 'yes', ''):
-                            h_p = max(scour_depth_64_1, scour_depth_64_2)
-                        else:
-                            try:
-                                h_p = float(choice_h_p)
-                            except ValueError:
-                                raise ValueError(
-                                    f"输入错误: '{choice_h_p}' 无法转换为浮点数。"
-                                    "请输入 'y' 自动选择最大值，或输入具体数值。")
-                        
-                        # 计算局部冲刷深度
-                        local_scour_65_2 = calculate_local_scour(V, K_t, d, B_1, h_p)
-                        local_scour_65_1 = calculate_local_scour_65_1(V, K_t, d, B_1, h_p)
-                        
-                        # 准备结果数据
-                        flow_areas = (
-                            left_area, channel_area, right_area,
-                            left_area_after, channel_area_after, right_area_after,
-                            left_width_after, channel_width_after, right_width_after,
-                            left_depth_after, channel_depth_after, right_depth_after
-                        )
-                        
-                        scour_results = {
-                            'A': A,
-                            'B': B,
-                            'H': H,
-                            'Lcj': Lcj,
-                            'h_max': h_max,
-                            'h_c': h_c,
-                            'scour_depth_64_1': scour_depth_64_1,
-                            'scour_depth_64_2': scour_depth_64_2
-                        }
-                        
-                        local_scour_results = {
-                            'local_scour_65_1': local_scour_65_1,
-                            'local_scour_65_2': local_scour_65_2
-                        }
+                        # 相同数据和参数直接取缓存结果，否则复用会话内的计算流水线，只重算输入发生变化的阶段
+                        if st.session_state.get('pipeline') is None:
+                            st.session_state.pipeline = ScourPipeline((distances, elevations))
+                        result = run_analysis_cached(distances, elevations, params, st.session_state.pipeline)
                         
                         # 保存计算结果
                         st.session_state.calculation_results = {
-                            'params': params,
-                            'obstruction_results': obstruction_results,
-                            'flow_areas': flow_areas,
-                            'flow_distribution': flow_distribution,
-                            'scour_results': scour_results,
-                            'local_scour_results': local_scour_results,
-                            'distances': distances,
-                            'elevations': elevations,
-                            'boundary1': boundary1,
-                            'boundary2': boundary2,
-                            'pier_obstructions': pier_obstructions
+                            'params': result.params,
+                            'obstruction_results': result.obstruction_results,
+                            'flow_areas': result.flow_areas,
+                            'flow_distribution': result.flow_distribution,
+                            'scour_results': result.scour_results,
+                            'local_scour_results': result.local_scour_results,
+                            'distances': result.distances,
+                            'elevations': result.elevations,
+                            'boundary1': result.boundary1,
+                            'boundary2': result.boundary2,
+                            'pier_obstructions': result.pier_obstructions,
+                            'result_hash': result_digest(result.params, result.distances, result.elevations)
                         }
                         
                         st.success("✅ 计算完成！请切换到'计算结果'或'断面图形'标签页查看结果。")
@@ -567,29 +433,32 @@ with tab3:
         results = st.session_state.calculation_results
         params = results['params']
         
-        fig = plot_cross_section(
+        plot_args = (
             results['distances'],
             results['elevations'],
             params['water_level'],
             params['design_water_level'],
             [results['boundary1'], results['boundary2']],
             results['pier_obstructions'],
-            title="河道横断面分析"
-        )
-        
-        st.pyplot(fig)
-        
-        # 下载图形按钮
-        buf = BytesIO()
-        fig.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-        buf.seek(0)
-        st.download_button(
-            label="📥 下载图形",
-            data=buf,
-            file_name="桥梁冲刷计算结果图.png",
-            mime="image/png"
+            "河道横断面分析"
         )
 
+        st.image(render_cross_section_png(*plot_args), use_container_width=True)
+
+        # 高分辨率图形只在点击后生成，并按结果缓存
+        result_hash = results['result_hash']
+        if st.session_state.get('export_result_hash') != result_hash:
+            if st.button(f"🖼️ 生成高清图形 ({EXPORT_DPI} dpi)"):
+                st.session_state.export_result_hash = result_hash
+                st.rerun()
+        else:
+            st.download_button(
+                label="📥 下载图形",
+                data=render_cross_section_png(*plot_args, dpi=EXPORT_DPI),
+                file_name="桥梁冲刷计算结果图.png",
+                mime="image/png"
+            )
+
 with tab4:
     st.header("断面自定义绘制")
     st.info("此功能允许您通过绘制方式输入断面数据。")
@@ -626,8 +495,10 @@ with tab4:
     with col2:
         st.subheader("断面预览")
         if distances is not None and elevations is not None:
-            fig_preview = plot_cross_section(distances, elevations, title="当前断面数据")
-            st.pyplot(fig_preview)
+            st.image(render_cross_section_png(distances, elevations, title="当前断面数据"),
+                     use_container_width=True)
         else:
             st.info("暂无断面数据")
 
+startup_profiler.mark('页面渲染')
+startup_profiler.report()
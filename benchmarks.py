@@ -0,0 +1,253 @@
+"""
+桥梁冲刷计算性能基准
+对 bridge_calculations 的热点函数和完整计算流程计时，断面规模 10 ~ 10^6 个测点，
+桥梁规模 1 ~ 5000 孔。断面和桥梁均为固定随机种子生成的合成数据，不需要网络和外部文件。
+
+用法：
+    python benchmarks.py -o bench.json               # 完整基准，结果写入 JSON
+    python benchmarks.py --quick                     # 只跑较小规模，快速检查
+    python benchmarks.py --compare base.json         # 与之前的结果比较，变慢超过阈值时返回 1
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+import bridge_calculations as bc
+
+SECTION_SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)  # 断面测点数
+BRIDGE_SPANS = (1, 10, 100, 1_000, 5_000)  # 桥孔数
+QUICK_SECTION_LIMIT = 10_000  # --quick 时的最大测点数
+QUICK_SPAN_LIMIT = 100  # --quick 时的最大桥孔数
+MIN_BENCH_SECONDS = 0.2  # 每项至少累计计时多久
+MAX_REPEAT = 200  # 每项最多重复次数
+REGRESSION_THRESHOLD = 1.25  # 比较时耗时超过基准的倍数视为变慢
+
+SECTION_WIDTH = 1200.0  # 合成断面宽度（米）
+SPAN_LENGTH = 40.0  # 合成桥梁单孔跨径（米）
+WATER_LEVEL = 963.38  # 平滩水位
+DESIGN_WATER_LEVEL = 968.52  # 设计水位
+BENCH_PARAMS = dict(
+    n_l=0.034, n_c=0.032, n_r=0.034, J=0.00173, mu=1.0, E=0.86, d=3.0,
+    water_level=WATER_LEVEL, design_water_level=DESIGN_WATER_LEVEL,
+    bridge_config="8-32+1-40+2-64+1-40+3-32", pier_width=5.0, skew_angle=68.0, bridge_start=-426.0,
+    K_t=1.0, B_1=6.0, V=2.0, Design_Q=3480.0, choice_h_p='y')
+
+
+def synthetic_section(n_points, width=SECTION_WIDTH, seed=0):
+    """生成 U 形合成断面：两岸高程 975，河底约 960，叠加固定种子的随机起伏"""
+    rng = np.random.default_rng(seed)
+    distances = np.linspace(-width / 2, width / 2, n_points)
+    elevations = 960 + 8 * np.abs(distances / (width / 2)) ** 1.5 + rng.normal(0, 0.3, n_points)
+    elevations[0] = elevations[-1] = 975.0
+    return distances, elevations
+
+
+def time_call(func, setup=None, min_seconds=MIN_BENCH_SECONDS, max_repeat=MAX_REPEAT):
+    """重复调用 func 直到累计耗时达到 min_seconds（或达到 max_repeat 次），返回耗时统计
+
+    setup 在每次调用前执行，不计时。耗时较长的项只重复一两次，整套基准的总时间可控。
+    """
+    # 先调用一次预热，延迟导入（如 scipy）等一次性开销不计入
+    if setup is not None:
+        setup()
+    func()
+
+    times = []
+    while len(times) < max_repeat and sum(times) < min_seconds:
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return {
+        'runs': len(times),
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.fmean(times),
+    }
+
+
+def section_cases(n_points):
+    """断面规模相关的基准项，返回 [(名称, 函数, setup)]"""
+    distances, elevations = synthetic_section(n_points)
+    boundary1, boundary2 = bc.identify_channel_and_floodplain(distances, elevations, WATER_LEVEL)
+    params = dict(BENCH_PARAMS)
+
+    def end_to_end():
+        bc.run_scour_analysis((distances, elevations), params)
+
+    return [
+        ('find_waterline_intersections',
+         lambda: bc.find_waterline_intersections(distances, elevations, DESIGN_WATER_LEVEL), None),
+        ('calculate_hydraulic_parameters',
+         lambda: bc.calculate_hydraulic_parameters(distances, elevations, DESIGN_WATER_LEVEL), None),
+        ('calculate_flow_areas',
+         lambda: bc.calculate_flow_areas(distances, elevations, DESIGN_WATER_LEVEL, boundary1, boundary2), None),
+        ('CrossSection', lambda: bc.CrossSection(distances, elevations), None),
+        # 首次查询会建立前缀和索引
+        ('CrossSection.area', lambda: bc.CrossSection(distances, elevations).area(DESIGN_WATER_LEVEL), None),
+        # 每次清空几何缓存，测量未命中缓存时的完整计算
+        ('run_scour_analysis', end_to_end, bc.geometry_cache.clear),
+    ]
+
+
+def bridge_cases(n_spans):
+    """桥孔数相关的基准项：断面宽度随桥长放大，测点数固定"""
+    width = max(SECTION_WIDTH, n_spans * SPAN_LENGTH / 0.7)
+    distances, elevations = synthetic_section(10_000, width=width)
+    boundary1, boundary2 = bc.identify_channel_and_floodplain(distances, elevations, WATER_LEVEL)
+    intersections = bc.find_waterline_intersections(distances, elevations, DESIGN_WATER_LEVEL)
+    _, _, flow_area, _ = bc.calculate_hydraulic_parameters(distances, elevations, DESIGN_WATER_LEVEL,
+                                                           intersections=intersections)
+    spans = bc.parse_bridge_config(f"{n_spans}-{SPAN_LENGTH:g}")
+    bridge_start = -n_spans * SPAN_LENGTH / 2
+
+    def obstruction(as_table):
+        return lambda: bc.calculate_bridge_obstruction(
+            spans, 2.0, 0.0, DESIGN_WATER_LEVEL, distances, elevations, bridge_start, boundary1, boundary2,
+            flow_area=flow_area, as_table=as_table, intersections=intersections)
+
+    return [
+        ('parse_bridge_config', lambda: bc.parse_bridge_config(f"{n_spans}-{SPAN_LENGTH:g}"), None),
+        ('calculate_bridge_obstruction', obstruction(False), None),
+        ('calculate_bridge_obstruction[table]', obstruction(True), None),
+    ]
+
+
+def formula_cases():
+    """冲刷公式：单次标量调用和 10^6 组参数的数组版本"""
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    q = rng.uniform(1000, 5000, n)
+    h_p = rng.uniform(2, 10, n)
+    return [
+        ('calculate_scour', lambda: bc.calculate_scour(3000.0, 300.0, 4.0, 250.0, 8.0, 5.0, 1.0, 0.86, 3.0), None),
+        ('calculate_scour_64_2',
+         lambda: bc.calculate_scour_64_2(3000.0, 2500.0, 300.0, 250.0, 0.06, 1.0, 8.0, 300.0, 4.0), None),
+        ('calculate_local_scour', lambda: bc.calculate_local_scour(2.0, 1.0, 3.0, 6.0, 5.0), None),
+        ('calculate_local_scour_65_1', lambda: bc.calculate_local_scour_65_1(2.0, 1.0, 3.0, 6.0, 5.0), None),
+        ('calculate_scour_array[1e6]',
+         lambda: bc.calculate_scour_array(q, 300.0, 4.0, 250.0, 8.0, 5.0, 1.0, 0.86, 3.0), None),
+        ('calculate_local_scour_array[1e6]', lambda: bc.calculate_local_scour_array(2.0, 1.0, 3.0, 6.0, h_p), None),
+        ('calculate_local_scour_65_1_array[1e6]',
+         lambda: bc.calculate_local_scour_65_1_array(2.0, 1.0, 3.0, 6.0, h_p), None),
+    ]
+
+
+def machine_info():
+    """记录运行环境，便于比较不同机器、不同提交的结果"""
+    info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'commit': None,
+    }
+    try:
+        import scipy
+        info['scipy'] = scipy.__version__
+    except ImportError:
+        info['scipy'] = None
+    try:
+        import subprocess
+        info['commit'] = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return info
+
+
+def run_benchmarks(quick=False, min_seconds=MIN_BENCH_SECONDS, select=None, progress=None):
+    """执行全部基准，返回结果列表，每项为 {name, group, size, runs, min, median, mean}
+
+    select: 只运行名称包含该字符串的项
+    progress: 可选回调 progress(结果项)
+    """
+    groups = []
+    for n_points in SECTION_SIZES:
+        if not quick or n_points <= QUICK_SECTION_LIMIT:
+            groups.append(('section', n_points, lambda n=n_points: section_cases(n)))
+    for n_spans in BRIDGE_SPANS:
+        if not quick or n_spans <= QUICK_SPAN_LIMIT:
+            groups.append(('bridge', n_spans, lambda n=n_spans: bridge_cases(n)))
+    groups.append(('formula', 1, formula_cases))
+
+    results = []
+    for group, size, make_cases in groups:
+        for name, func, setup in make_cases():
+            if select and select not in name:
+                continue
+            entry = {'name': name, 'group': group, 'size': size}
+            entry.update(time_call(func, setup, min_seconds))
+            results.append(entry)
+            if progress is not None:
+                progress(entry)
+    return results
+
+
+def compare_results(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """与基准结果比较最短耗时（受系统抖动影响最小），返回 [(名称, 规模, 基准耗时, 当前耗时, 倍数)]，按倍数降序"""
+    base = {(item['name'], item['group'], item['size']): item['min'] for item in baseline['results']}
+    rows = []
+    for item in results:
+        key = (item['name'], item['group'], item['size'])
+        if key in base and base[key] > 0:
+            rows.append((item['name'], item['size'], base[key], item['min'], item['min'] / base[key]))
+    return sorted(rows, key=lambda row: -row[4])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='桥梁冲刷计算性能基准')
+    parser.add_argument('-o', '--output', help='结果 JSON 文件')
+    parser.add_argument('--quick', action='store_true',
+                        help=f'只运行不超过 {QUICK_SECTION_LIMIT} 个测点、{QUICK_SPAN_LIMIT} 孔的规模')
+    parser.add_argument('--min-time', type=float, default=MIN_BENCH_SECONDS, help='每项最少累计计时（秒）')
+    parser.add_argument('-k', '--select', help='只运行名称包含该字符串的项')
+    parser.add_argument('--compare', help='与之前保存的结果 JSON 比较')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='最短耗时超过基准的该倍数时视为变慢')
+    args = parser.parse_args(argv)
+
+    def report(entry):
+        print(f"{entry['group']:<8} {entry['name']:<38} {entry['size']:>9} "
+              f"{entry['median'] * 1000:10.3f} ms  (min {entry['min'] * 1000:.3f}, {entry['runs']} 次)",
+              file=sys.stderr)
+
+    summary = {'machine': machine_info(), 'quick': args.quick, 'results': run_benchmarks(
+        args.quick, args.min_time, args.select, report)}
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"结果已写入 {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows = compare_results(summary['results'], baseline, args.threshold)
+        regressions = [row for row in rows if row[4] > args.threshold]
+        print(f"\n与 {args.compare}（提交 {baseline['machine'].get('commit')}）比较：", file=sys.stderr)
+        for name, size, before, after, ratio in rows:
+            flag = '  变慢' if ratio > args.threshold else ''
+            print(f"  {name:<38} {size:>9} {before * 1000:10.3f} -> {after * 1000:10.3f} ms  x{ratio:.2f}{flag}",
+                  file=sys.stderr)
+        if regressions:
+            print(f"{len(regressions)} 项变慢超过 {args.threshold:g} 倍", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
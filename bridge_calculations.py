@@ -5,48 +5,502 @@
 import numpy as np
 import math
 import re
-from scipy.integrate import simpson
+import hashlib
+import copy
+import csv
+import functools
+import io
+import json
+import warnings
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass
 
 # 常量定义
 MAX_A_COEFFICIENT = 1.8  # 单宽流量集中系数最大值
 SAMPLING_INTERVAL = 0.1  # 水力参数计算采样间隔
 
-
+# 桥墩所在区域编码
+REGION_LEFT = 0  # 左河滩
+REGION_CHANNEL = 1  # 河槽
+REGION_RIGHT = 2  # 右河滩
+REGION_LABELS = ('左河滩', '河槽', '右河滩')
+
+GEOMETRY_CACHE_SIZE = 256  # 断面几何缓存最大条目数
+
+# 桥墩明细表结构：位置、水深、阻水面积、区域编码
+PIER_DTYPE = np.dtype([('position', 'f8'), ('depth', 'f8'), ('area', 'f8'), ('region', 'i1')])
+
+
+# ---------------- 计算阶段计时 ----------------
+
+_stage_listeners = ()  # 已注册的阶段计时回调；整体替换而不原地修改，读取时无需加锁
+_stage_listeners_lock = threading.Lock()
+_stage_local = threading.local()  # 各线程当前的阶段嵌套层数
+
+
+def add_stage_listener(callback):
+    """注册阶段计时回调 callback(记录)，记录字段见 instrumented_stage"""
+    global _stage_listeners
+    with _stage_listeners_lock:
+        _stage_listeners = _stage_listeners + (callback,)
+
+
+def remove_stage_listener(callback):
+    """注销阶段计时回调"""
+    global _stage_listeners
+    with _stage_listeners_lock:
+        listeners = list(_stage_listeners)
+        if callback in listeners:
+            listeners.remove(callback)
+        _stage_listeners = tuple(listeners)
+
+
+def _argument_size(args, index):
+    """取第 index 个位置参数的元素个数作为规模，无法取得时返回 None"""
+    if index is None or len(args) <= index:
+        return None
+    try:
+        return int(np.size(args[index]))
+    except Exception:
+        return None
+
+
+def instrumented_stage(stage, size_arg=0):
+    """装饰器：把函数登记为计算阶段 stage，有回调注册时记录每次调用
+
+    记录为字典：stage 阶段名、function 函数名、seconds 耗时、size 第 size_arg 个参数的元素个数、
+    depth 嵌套层数（0 为最外层，如水力参数内部查找交点时为 1）、thread 线程名。
+    未注册回调时只多一次判断，不计时。
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            listeners = _stage_listeners
+            if not listeners:
+                return func(*args, **kwargs)
+
+            depth = getattr(_stage_local, 'depth', 0)
+            _stage_local.depth = depth + 1
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - started
+                _stage_local.depth = depth
+                record = {
+                    'stage': stage,
+                    'function': func.__name__,
+                    'seconds': seconds,
+                    'size': _argument_size(args, size_arg),
+                    'depth': depth,
+                    'thread': threading.current_thread().name,
+                }
+                for listener in listeners:
+                    listener(record)
+        return wrapper
+    return decorate
+
+
+class StageTimer:
+    """阶段计时记录器，在 with 块内收集所有线程的阶段调用记录
+
+        with StageTimer('timing.jsonl') as timer:
+            run_scour_analysis(section, params)
+        print(timer.summary())
+
+    jsonl: 可选的文件路径或已打开的文本文件，每条记录写为一行 JSON
+    """
+
+    def __init__(self, jsonl=None):
+        self.jsonl = jsonl
+        self.records = []
+        self._file = None
+        self._owns_file = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        if isinstance(self.jsonl, (str, os.PathLike)):
+            self._file = open(self.jsonl, 'a', encoding='utf-8')
+            self._owns_file = True
+        else:
+            self._file = self.jsonl
+        add_stage_listener(self.record)
+        return self
+
+    def __exit__(self, *exc):
+        remove_stage_listener(self.record)
+        if self._owns_file:
+            self._file.close()
+        self._file = None
+        self._owns_file = False
+
+    def record(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self._file is not None:
+                self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def summary(self):
+        """按阶段汇总：{阶段: {calls, seconds, max_size}}
+
+        seconds 为各次调用的累计耗时（含内部嵌套调用的其他阶段），calls 为调用次数，
+        max_size 为最大规模；命中几何缓存的调用不会出现在记录中。
+        """
+        summary = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            entry = summary.setdefault(record['stage'], {'calls': 0, 'seconds': 0.0, 'max_size': None})
+            entry['calls'] += 1
+            entry['seconds'] += record['seconds']
+            if record['size'] is not None:
+                entry['max_size'] = max(entry['max_size'] or 0, record['size'])
+        return summary
+
+
+@instrumented_stage('intersections')
 def find_waterline_intersections(distances, elevations, water_level):
-    """找到水位线与断面的交点"""
-    left_intersection = None
-    for i in range(len(distances) - 1):
-        if (elevations[i] <= water_level and elevations[i + 1] > water_level) or \
-                (elevations[i] >= water_level and elevations[i + 1] < water_level):
-            x = distances[i] + (water_level - elevations[i]) * \
-                (distances[i + 1] - distances[i]) / (elevations[i + 1] - elevations[i])
-            left_intersection = x
-            break
-
-    right_intersection = None
-    for i in range(len(distances) - 1, 0, -1):
-        if (elevations[i] <= water_level and elevations[i - 1] > water_level) or \
-                (elevations[i] >= water_level and elevations[i - 1] < water_level):
-            x = distances[i] + (water_level - elevations[i]) * \
-                (distances[i - 1] - distances[i]) / (elevations[i - 1] - elevations[i])
-            right_intersection = x
-            break
-
-    if left_intersection is not None and right_intersection is not None:
-        return [left_intersection, right_intersection]
-    return []
-
-
-def calculate_hydraulic_parameters(distances, elevations, water_level, interval=SAMPLING_INTERVAL):
-    """计算水力参数：平均水深、最大水深、过流面积"""
-    intersections = find_waterline_intersections(distances, elevations, water_level)
-
-    if len(intersections) < 2:
-        return None, None, None, None
-
-    left_boundary, right_boundary = intersections
-    sample_points = np.arange(left_boundary, right_boundary + interval, interval)
-
+    """找到水位线与断面的交点（最左、最右两个交点）"""
+    distances = np.asarray(distances, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
+    e0 = elevations[:-1]
+    e1 = elevations[1:]
+
+    # 从左向右：第一个跨越水位线的段
+    left_hits = np.flatnonzero(((e0 <= water_level) & (e1 > water_level)) |
+                               ((e0 >= water_level) & (e1 < water_level)))
+    # 从右向左：最后一个跨越水位线的段
+    right_hits = np.flatnonzero(((e1 <= water_level) & (e0 > water_level)) |
+                                ((e1 >= water_level) & (e0 < water_level)))
+
+    if len(left_hits) == 0 or len(right_hits) == 0:
+        return []
+
+    i = left_hits[0]
+    left_intersection = distances[i] + (water_level - elevations[i]) * \
+        (distances[i + 1] - distances[i]) / (elevations[i + 1] - elevations[i])
+
+    i = right_hits[-1] + 1
+    right_intersection = distances[i] + (water_level - elevations[i]) * \
+        (distances[i - 1] - distances[i]) / (elevations[i - 1] - elevations[i])
+
+    return [left_intersection, right_intersection]
+
+
+def find_waterline_crossings(distances, elevations, water_level, collapse=False):
+    """一次扫描找出水位线下所有过水区间
+
+    返回 (起点数组, 终点数组)，每对对应一段连续过水区间，河心滩、分汊河道分别列出；
+    断面端点低于水位时区间延伸至断面端点。测点少于 2 个或全部露出水面时返回两个空数组。
+    collapse 为 True 时合并为最外侧的一个区间（各至多一个元素），兼容只需要左右交点的调用方。
+    """
+    distances = np.asarray(distances, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
+    if len(distances) < 2:
+        return np.empty(0), np.empty(0)
+    e0 = elevations[:-1]
+    e1 = elevations[1:]
+
+    # 过水段：段内有低于水位的部分；露出水面的测点处区间断开
+    wet = np.minimum(e0, e1) < water_level
+    first_segments = np.flatnonzero(wet & (e0 >= water_level))
+    last_segments = np.flatnonzero(wet & (e1 >= water_level))
+    if wet[0] and e0[0] < water_level:
+        first_segments = np.concatenate(([0], first_segments))
+    if wet[-1] and e1[-1] < water_level:
+        last_segments = np.concatenate((last_segments, [len(wet) - 1]))
+
+    def crossing(i):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return distances[i] + (water_level - e0[i]) * (distances[i + 1] - distances[i]) / (e1[i] - e0[i])
+
+    starts = np.where(e0[first_segments] < water_level,
+                      distances[first_segments], crossing(first_segments))
+    ends = np.where(e1[last_segments] < water_level,
+                    distances[last_segments + 1], crossing(last_segments))
+    if collapse:
+        return starts[:1], ends[-1:]
+    return starts, ends
+
+
+def _wetted_width(distances, elevations, water_level, left_boundary, right_boundary):
+    """左右交点之间各过水区间的总宽度（不计露出水面的河心滩）"""
+    starts, ends = find_waterline_crossings(distances, elevations, water_level)
+    starts = np.maximum(starts, left_boundary)
+    ends = np.minimum(ends, right_boundary)
+    return float(np.sum(np.maximum(ends - starts, 0)))
+
+
+def _clip_section(distances, elevations, x_start, x_end):
+    """截取[x_start, x_end]范围内的断面折线，两端按线性插值补点"""
+    distances = np.asarray(distances, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
+    inner = (distances > x_start) & (distances < x_end)
+    x = np.concatenate(([x_start], distances[inner], [x_end]))
+    z = np.concatenate(([np.interp(x_start, distances, elevations)], elevations[inner],
+                        [np.interp(x_end, distances, elevations)]))
+    return x, z
+
+
+def _wet_segment_geometry(x, z, water_level):
+    """按水位线裁剪每个折线段，返回各段过水面积、水面宽度、湿周"""
+    dx = np.diff(x)
+    dz = np.diff(z)
+    h0 = water_level - z[:-1]
+    h1 = water_level - z[1:]
+    h_high = np.maximum(h0, h1)
+    h_low = np.minimum(h0, h1)
+
+    # 全淹没段比例为1；部分淹没段按水位线交点计算淹没比例；干段及恰在水位线上的平段为0
+    partial = (h_low < 0) & (h_high > 0)
+    wet_fraction = np.where((h_low >= 0) & (h_high > 0), 1.0, 0.0)
+    np.divide(h_high, h_high - h_low, out=wet_fraction, where=partial)
+
+    widths = wet_fraction * dx
+    areas = np.where(h_low >= 0, 0.5 * (h0 + h1) * dx, 0.5 * np.maximum(h_high, 0) * widths)
+    perimeters = wet_fraction * np.hypot(dx, dz)
+    return areas, widths, perimeters
+
+
+def integrate_wetted_section(distances, elevations, water_level, x_start=None, x_end=None):
+    """精确积分水位线以下的断面几何：过流面积、水面宽度、最大水深、湿周
+
+    断面为折线，逐段在水位线处裁剪后解析积分，计算量与测点数成正比，与采样间隔无关。
+    x_start/x_end 指定积分范围，缺省时取断面全长（不裁剪，两端的竖直岸壁也计入）。
+    """
+    distances = np.asarray(distances, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
+    if x_start is None and x_end is None:
+        x, z = distances, elevations
+    else:
+        x_start = distances[0] if x_start is None else x_start
+        x_end = distances[-1] if x_end is None else x_end
+        if x_end <= x_start:
+            return 0.0, 0.0, 0.0, 0.0
+        x, z = _clip_section(distances, elevations, x_start, x_end)
+    if len(x) < 2:
+        return 0.0, 0.0, 0.0, 0.0
+
+    areas, widths, perimeters = _wet_segment_geometry(x, z, water_level)
+    max_depth = max(water_level - np.min(z), 0.0)
+
+    return float(np.sum(areas)), float(np.sum(widths)), float(max_depth), float(np.sum(perimeters))
+
+
+def _array_digest(*arrays):
+    """按数组内容计算摘要，用作缓存键"""
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=float)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+class CrossSection:
+    """河道横断面
+
+    初始化时一次性校验、排序并去除重复测点。首次查询过流面积、水面宽度、湿周时
+    预计算各折线段几何，并按段最高/最低高程排序建立前缀和索引，此后任意水位下的查询
+    只需二分查找加前缀和即可得到（O(log n)），且支持水位数组批量查询。
+    只使用排序后数组的场合（如 ScourPipeline）不会建立索引。
+    注：索引统计整个断面上低于水位的部分，断面两端应高于查询水位。
+    """
+
+    def __init__(self, distances, elevations):
+        distances = np.asarray(distances, dtype=float).ravel()
+        elevations = np.asarray(elevations, dtype=float).ravel()
+
+        if distances.shape != elevations.shape:
+            raise ValueError("距离和高程数据数量不匹配")
+        if not (np.all(np.isfinite(distances)) and np.all(np.isfinite(elevations))):
+            raise ValueError("断面数据包含无效数值")
+
+        order = np.argsort(distances, kind='stable')
+        distances = distances[order]
+        elevations = elevations[order]
+
+        keep = np.ones(len(distances), dtype=bool)
+        keep[1:] = (np.diff(distances) != 0) | (np.diff(elevations) != 0)
+        distances = distances[keep]
+        elevations = elevations[keep]
+
+        if len(distances) < 2:
+            raise ValueError("至少需要2个数据点")
+
+        distances.flags.writeable = False
+        elevations.flags.writeable = False
+        self.distances = distances
+        self.elevations = elevations
+        self._splits = {}
+        self._content_hash = None
+        self._z_ref = None
+
+    def __len__(self):
+        return len(self.distances)
+
+    @property
+    def content_hash(self):
+        """断面数据内容摘要"""
+        if self._content_hash is None:
+            self._content_hash = _array_digest(self.distances, self.elevations)
+        return self._content_hash
+
+    def _build_index(self):
+        """预计算折线段几何及前缀和，只在首次查询时执行一次"""
+        if self._z_ref is not None:
+            return
+        # 以最低点为基准高程，减小前缀和相减时的舍入误差
+        z_ref = float(np.min(self.elevations))
+        z = self.elevations - z_ref
+        dx = np.diff(self.distances)
+        z_lo = np.minimum(z[:-1], z[1:])
+        z_hi = np.maximum(z[:-1], z[1:])
+        dz = z_hi - z_lo
+        seg_len = np.hypot(dx, dz)
+
+        # 部分淹没段：水面宽 = k·(h - z_lo)，湿周 = p·(h - z_lo)，面积 = k·(h - z_lo)²/2
+        sloped = dz > 0
+        k = np.zeros_like(dx)
+        p = np.zeros_like(dx)
+        np.divide(dx, dz, out=k, where=sloped)
+        np.divide(seg_len, dz, out=p, where=sloped)
+
+        def prefix(values, order):
+            return np.concatenate(([0.0], np.cumsum(values[order])))
+
+        # 完全淹没段（z_hi < h），按 z_hi 排序
+        hi_order = np.argsort(z_hi, kind='stable')
+        self._z_hi_sorted = z_hi[hi_order]
+        self._full_dx = prefix(dx, hi_order)
+        self._full_dxz = prefix(dx * 0.5 * (z[:-1] + z[1:]), hi_order)
+        self._full_len = prefix(seg_len, hi_order)
+        self._full_k = prefix(k, hi_order)
+        self._full_kz = prefix(k * z_lo, hi_order)
+        self._full_kz2 = prefix(k * z_lo ** 2, hi_order)
+        self._full_p = prefix(p, hi_order)
+        self._full_pz = prefix(p * z_lo, hi_order)
+
+        # 已入水段（z_lo < h），按 z_lo 排序
+        lo_order = np.argsort(z_lo, kind='stable')
+        self._z_lo_sorted = z_lo[lo_order]
+        self._wet_k = prefix(k, lo_order)
+        self._wet_kz = prefix(k * z_lo, lo_order)
+        self._wet_kz2 = prefix(k * z_lo ** 2, lo_order)
+        self._wet_p = prefix(p, lo_order)
+        self._wet_pz = prefix(p * z_lo, lo_order)
+        # 最后赋值，其他线程看到 _z_ref 时索引已完整
+        self._z_ref = z_ref
+
+    def geometry(self, water_level):
+        """返回水位下的 (过流面积, 水面宽度, 湿周)，水位可为标量或数组"""
+        self._build_index()
+        h = np.asarray(water_level, dtype=float) - self._z_ref
+        i_full = np.searchsorted(self._z_hi_sorted, h, side='left')
+        i_wet = np.searchsorted(self._z_lo_sorted, h, side='left')
+
+        k = self._wet_k[i_wet] - self._full_k[i_full]
+        kz = self._wet_kz[i_wet] - self._full_kz[i_full]
+        kz2 = self._wet_kz2[i_wet] - self._full_kz2[i_full]
+        p = self._wet_p[i_wet] - self._full_p[i_full]
+        pz = self._wet_pz[i_wet] - self._full_pz[i_full]
+
+        area = h * self._full_dx[i_full] - self._full_dxz[i_full] + 0.5 * (k * h * h - 2 * kz * h + kz2)
+        width = self._full_dx[i_full] + k * h - kz
+        perimeter = self._full_len[i_full] + p * h - pz
+
+        area = np.maximum(area, 0.0)
+        width = np.maximum(width, 0.0)
+        perimeter = np.maximum(perimeter, 0.0)
+        if area.ndim == 0:
+            return float(area), float(width), float(perimeter)
+        return area, width, perimeter
+
+    def area(self, water_level):
+        """过流面积"""
+        return self.geometry(water_level)[0]
+
+    def top_width(self, water_level):
+        """水面宽度（不含露出水面的部分）"""
+        return self.geometry(water_level)[1]
+
+    def wetted_perimeter(self, water_level):
+        """湿周"""
+        return self.geometry(water_level)[2]
+
+    def max_depth(self, water_level):
+        """最大水深"""
+        self._build_index()
+        depth = np.maximum(np.asarray(water_level, dtype=float) - self._z_ref, 0.0)
+        return float(depth) if depth.ndim == 0 else depth
+
+    def hydraulic_radius(self, water_level):
+        """水力半径 A/P"""
+        area, _, perimeter = self.geometry(water_level)
+        area = np.asarray(area)
+        perimeter = np.asarray(perimeter)
+        radius = np.divide(area, perimeter, out=np.zeros_like(area), where=perimeter > 0)
+        return float(radius) if radius.ndim == 0 else radius
+
+    def interpolate(self, x):
+        """插值计算任意距离处的河床高程"""
+        return np.interp(x, self.distances, self.elevations)
+
+    def intersections(self, water_level):
+        """水位线与断面的左右交点"""
+        return find_waterline_intersections(self.distances, self.elevations, water_level)
+
+    def wetted_intervals(self, water_level):
+        """水位线下所有过水区间 (起点数组, 终点数组)"""
+        return find_waterline_crossings(self.distances, self.elevations, water_level)
+
+    def clip(self, x_start, x_end):
+        """截取[x_start, x_end]范围内的子断面，范围内不足一段时返回None"""
+        x_start = max(x_start, self.distances[0])
+        x_end = min(x_end, self.distances[-1])
+        if x_end <= x_start:
+            return None
+        x, z = _clip_section(self.distances, self.elevations, x_start, x_end)
+        return CrossSection(x, z)
+
+    def split(self, boundary1, boundary2):
+        """按河槽分界点拆分为 (左河滩, 河槽, 右河滩) 子断面，结果缓存复用"""
+        key = (float(boundary1), float(boundary2))
+        if key not in self._splits:
+            self._splits[key] = (
+                self.clip(self.distances[0], boundary1),
+                self.clip(boundary1, boundary2),
+                self.clip(boundary2, self.distances[-1]),
+            )
+        return self._splits[key]
+
+    def sub_areas(self, water_level, boundary1, boundary2):
+        """返回水位下 (左河滩, 河槽, 右河滩) 的过流面积"""
+        zero = np.zeros_like(np.asarray(water_level, dtype=float))
+        return tuple(part.area(water_level) if part is not None else zero + 0.0
+                     for part in self.split(boundary1, boundary2))
+
+
+def as_cross_section(distances, elevations=None):
+    """将距离/高程数组转换为 CrossSection，已是 CrossSection 时原样返回"""
+    if isinstance(distances, CrossSection):
+        return distances
+    return CrossSection(distances, elevations)
+
+
+def simpson(y, x):
+    """辛普森积分；scipy 在首次调用时才导入，导入本模块不加载 scipy"""
+    from scipy.integrate import simpson as scipy_simpson
+    return scipy_simpson(y, x=x)
+
+
+def _sample_depths_loop(distances, elevations, water_level, sample_points):
+    """逐点插值计算采样点水深（原始循环实现，用于结果核对）"""
     water_depths = []
     for x in sample_points:
         idx = np.searchsorted(distances, x)
@@ -62,12 +516,57 @@ def calculate_hydraulic_parameters(distances, elevations, water_level, interval=
         depth = max(0, water_level - elevation)
         water_depths.append(depth)
 
-    water_depths = np.array(water_depths)
+    return np.array(water_depths)
+
+
+def _sample_depths_vectorized(distances, elevations, water_level, sample_points):
+    """一次插值计算全部采样点水深"""
+    sample_elevations = np.interp(sample_points, distances, elevations)
+    return np.maximum(water_level - sample_elevations, 0)
+
+
+@instrumented_stage('hydraulic')
+def calculate_hydraulic_parameters(distances, elevations, water_level, interval=SAMPLING_INTERVAL,
+                                   method='vectorized', wetted_only=False, intersections=None):
+    """计算水力参数：平均水深、最大水深、过流面积
+
+    method: 'vectorized' 批量插值（默认）；'loop' 原始逐点循环，用于核对结果；
+            'exact' 按折线精确积分，平均水深为过流面积除以左右交点间距
+    wetted_only: 为 True 时平均水深只按实际过水区间宽度计算，不计露出水面的河心滩
+    intersections: 已求得的水位线交点，给出时不再重新查找
+    """
+    if intersections is None:
+        intersections = find_waterline_intersections(distances, elevations, water_level)
+
+    if len(intersections) < 2:
+        return None, None, None, None
+
+    left_boundary, right_boundary = intersections
+
+    if method == 'exact':
+        flow_area, wet_width, max_depth, _ = integrate_wetted_section(
+            distances, elevations, water_level, left_boundary, right_boundary)
+        water_width = wet_width if wetted_only else right_boundary - left_boundary
+        avg_depth = flow_area / water_width if water_width > 0 else 0.0
+        return avg_depth, max_depth, flow_area, intersections
+
+    sample_points = np.arange(left_boundary, right_boundary + interval, interval)
+
+    if method == 'vectorized':
+        water_depths = _sample_depths_vectorized(distances, elevations, water_level, sample_points)
+    elif method == 'loop':
+        water_depths = _sample_depths_loop(distances, elevations, water_level, sample_points)
+    else:
+        raise ValueError(f"未知的水力参数计算方法: {method}")
 
     max_depth = np.max(water_depths)
     avg_depth = np.mean(water_depths)
     flow_area = simpson(water_depths, sample_points)
 
+    if wetted_only:
+        wet_width = _wetted_width(distances, elevations, water_level, left_boundary, right_boundary)
+        avg_depth = flow_area / wet_width if wet_width > 0 else 0.0
+
     return avg_depth, max_depth, flow_area, intersections
 
 
@@ -94,75 +593,71 @@ def parse_bridge_config(config_str):
     return spans
 
 
-def calculate_bridge_obstruction(spans, pier_width, skew_angle, water_level, distances, elevations, 
-                                 bridge_start, left_channel_boundary, right_channel_boundary):
-    """计算桥墩阻水面积和阻水比率，同时区分区域"""
-    intersections = find_waterline_intersections(distances, elevations, water_level)
-    if len(intersections) < 2:
-        return 0, 0, [], 0, 0, 0, 0, 0, 0
+def calculate_pier_table(spans, pier_width, skew_angle, water_level, distances, elevations,
+                         bridge_start, left_channel_boundary, right_channel_boundary):
+    """向量化计算断面范围内各桥墩的位置、水深、阻水面积及所在区域，返回 PIER_DTYPE 结构化数组"""
+    distances = np.asarray(distances, dtype=float)
+    elevations = np.asarray(elevations, dtype=float)
 
-    pier_positions = []
-    current_position = bridge_start
-    pier_positions.append(current_position)
+    projected_spans = np.asarray(spans, dtype=float) * math.cos(math.radians(skew_angle))
+    positions = np.cumsum(np.concatenate(([float(bridge_start)], projected_spans)))
+    positions = positions[(positions >= distances[0]) & (positions <= distances[-1])]
 
-    for span in spans:
-        projected_span = span * math.cos(math.radians(skew_angle))
-        current_position += projected_span
-        pier_positions.append(current_position)
+    depths = np.maximum(water_level - np.interp(positions, distances, elevations), 0)
 
-    effective_pier_width = pier_width
-    total_obstruction_area = 0
-    left_obstruction_area = 0
-    channel_obstruction_area = 0
-    right_obstruction_area = 0
+    table = np.empty(len(positions), dtype=PIER_DTYPE)
+    table['position'] = positions
+    table['depth'] = depths
+    table['area'] = pier_width * depths
+    table['region'] = np.where(positions < left_channel_boundary, REGION_LEFT,
+                               np.where(positions > right_channel_boundary, REGION_RIGHT, REGION_CHANNEL))
+    return table
 
-    left_obstruction_width = 0
-    channel_obstruction_width = 0
-    right_obstruction_width = 0
 
-    pier_obstructions = []
+def pier_table_to_dicts(table):
+    """将桥墩结构化数组转换为原有的字典列表格式"""
+    return [{
+        'position': position,
+        'depth': depth,
+        'area': area,
+        'region': REGION_LABELS[region]
+    } for position, depth, area, region in zip(
+        table['position'].tolist(), table['depth'].tolist(), table['area'].tolist(), table['region'].tolist())]
 
-    for pier_pos in pier_positions:
-        projected_pos = pier_pos
 
-        if projected_pos < distances[0] or projected_pos > distances[-1]:
-            continue
+@instrumented_stage('obstruction')
+def calculate_bridge_obstruction(spans, pier_width, skew_angle, water_level, distances, elevations, 
+                                 bridge_start, left_channel_boundary, right_channel_boundary,
+                                 method='vectorized', flow_area=None, as_table=False, intersections=None):
+    """计算桥墩阻水面积和阻水比率，同时区分区域
+
+    method: 计算总过流面积所用方法，同 calculate_hydraulic_parameters
+    flow_area: 已知的设计水位过流面积，给出时不再重新计算
+    as_table: 为 True 时桥墩明细以 PIER_DTYPE 结构化数组返回（水位无交点时为空表），否则为字典列表
+    intersections: 已求得的设计水位交点，给出时不再重新查找
+    """
+    if intersections is None:
+        intersections = find_waterline_intersections(distances, elevations, water_level)
+    if len(intersections) < 2:
+        return 0, 0, np.empty(0, dtype=PIER_DTYPE) if as_table else [], 0, 0, 0, 0, 0, 0
 
-        idx = np.searchsorted(distances, projected_pos)
-        if idx == 0:
-            depth = water_level - elevations[0]
-        elif idx >= len(distances):
-            depth = water_level - elevations[-1]
-        else:
-            ratio = (projected_pos - distances[idx - 1]) / (distances[idx] - distances[idx - 1])
-            elevation = elevations[idx - 1] + ratio * (elevations[idx] - elevations[idx - 1])
-            depth = water_level - elevation
-
-        depth = max(0, depth)
-        pier_area = effective_pier_width * depth
-        total_obstruction_area += pier_area
-
-        if projected_pos < left_channel_boundary:
-            left_obstruction_area += pier_area
-            left_obstruction_width += effective_pier_width
-        elif projected_pos > right_channel_boundary:
-            right_obstruction_area += pier_area
-            right_obstruction_width += effective_pier_width
-        else:
-            channel_obstruction_area += pier_area
-            channel_obstruction_width += effective_pier_width
-
-        pier_obstructions.append({
-            'position': projected_pos,
-            'depth': depth,
-            'area': pier_area,
-            'region': '左河滩' if projected_pos < left_channel_boundary else
-            '右河滩' if projected_pos > right_channel_boundary else '河槽'
-        })
-
-    _, _, flow_area, _ = calculate_hydraulic_parameters(distances, elevations, water_level)
+    table = calculate_pier_table(spans, pier_width, skew_angle, water_level, distances, elevations,
+                                 bridge_start, left_channel_boundary, right_channel_boundary)
+
+    region_areas = np.bincount(table['region'], weights=table['area'], minlength=3)
+    region_counts = np.bincount(table['region'], minlength=3)
+    total_obstruction_area = float(np.sum(table['area']))
+    left_obstruction_area, channel_obstruction_area, right_obstruction_area = region_areas.tolist()
+    left_obstruction_width, channel_obstruction_width, right_obstruction_width = (
+        region_counts * pier_width).tolist()
+
+    if flow_area is None:
+        _, _, flow_area, _ = calculate_hydraulic_parameters(distances, elevations, water_level, method=method,
+                                                            intersections=intersections)
     obstruction_ratio = total_obstruction_area / flow_area if flow_area > 0 else 0
 
+    pier_obstructions = table if as_table else pier_table_to_dicts(table)
+
     return (total_obstruction_area, obstruction_ratio, pier_obstructions,
             left_obstruction_area, channel_obstruction_area, right_obstruction_area,
             left_obstruction_width, channel_obstruction_width, right_obstruction_width)
@@ -182,6 +677,7 @@ def calculate_flow(area, width, n, J):
     return discharge, velocity, hydraulic_radius
 
 
+@instrumented_stage('general_scour')
 def calculate_scour(channel_Q, B, H, Lcj, h_max, h_c, mu, E, d):
     """计算桥梁一般冲刷深度（64-1修正式）"""
     A_d = (math.sqrt(B) / H) ** 0.15
@@ -193,6 +689,7 @@ def calculate_scour(channel_Q, B, H, Lcj, h_max, h_c, mu, E, d):
     return scour_depth, A_d
 
 
+@instrumented_stage('general_scour')
 def calculate_scour_64_2(Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z):
     """根据64-2计算公式计算桥梁一般冲刷后的最大水深"""
     A_d = (math.sqrt(B_z) / H_z) ** 0.15
@@ -206,6 +703,7 @@ def calculate_scour_64_2(Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z):
     return h_p, A_d
 
 
+@instrumented_stage('local_scour', size_arg=4)
 def calculate_local_scour(V, K_t, d, B_1, h_p):
     """根据65-2计算公式计算桥墩局部冲刷深度"""
     V_0 = 0.28 * (d + 0.7) ** 0.5
@@ -220,6 +718,7 @@ def calculate_local_scour(V, K_t, d, B_1, h_p):
     return h_b
 
 
+@instrumented_stage('local_scour', size_arg=4)
 def calculate_local_scour_65_1(V, K_t, d, B_1, h_p):
     """根据65-1计算公式计算桥墩局部冲刷深度"""
     V_0 = 0.0246 * (h_p / d) ** 0.14 * math.sqrt(332 * d + (10 + h_p) / (d ** 0.72))
@@ -235,13 +734,91 @@ def calculate_local_scour_65_1(V, K_t, d, B_1, h_p):
     return h_b
 
 
-def calculate_flow_areas(distances, elevations, design_water_level, boundary1, boundary2):
-    """计算设计水位下各区域的过水面积"""
-    intersections = find_waterline_intersections(distances, elevations, design_water_level)
+@instrumented_stage('general_scour')
+def calculate_scour_array(channel_Q, B, H, Lcj, h_max, h_c, mu, E, d):
+    """calculate_scour 的数组版本，各参数均可为可广播的数组，A_d 上限逐元素生效"""
+    channel_Q, B, H, Lcj, h_max, h_c, mu, E, d = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (channel_Q, B, H, Lcj, h_max, h_c, mu, E, d)))
+    A_d = np.minimum((np.sqrt(B) / H) ** 0.15, MAX_A_COEFFICIENT)
+    h_ratio = (h_max / h_c) ** (5 / 3)
+    numerator = A_d * (channel_Q / (mu * Lcj)) * h_ratio
+    denominator = E * (d ** (1 / 6))
+    scour_depth = (numerator / denominator) ** (3 / 5)
+    return scour_depth, A_d
+
+
+@instrumented_stage('general_scour')
+def calculate_scour_64_2_array(Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z):
+    """calculate_scour_64_2 的数组版本，各参数均可为可广播的数组"""
+    Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z)))
+    A_d = np.minimum((np.sqrt(B_z) / H_z) ** 0.15, MAX_A_COEFFICIENT)
+    term1 = (A_d * (Q_2 / Q_c)) ** 0.90
+    term2 = (B_c / ((1 - lambda_) * mu * B_2)) ** 0.66
+    h_p = 1.04 * term1 * term2 * h_cm
+    return h_p, A_d
+
+
+@instrumented_stage('local_scour', size_arg=4)
+def calculate_local_scour_array(V, K_t, d, B_1, h_p):
+    """calculate_local_scour（65-2）的数组版本，V <= V_0 分支按掩码逐元素选择"""
+    V, K_t, d, B_1, h_p = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (V, K_t, d, B_1, h_p)))
+    V_0 = 0.28 * (d + 0.7) ** 0.5
+    V_0_prime = 0.12 * (d + 0.5) ** 0.55
+    K_η2 = (0.0023 / (d ** 2.2)) + 0.375 * d ** 0.24
+    ratio = (V - V_0_prime) / V_0
+    base = K_t * K_η2 * B_1 ** 0.6 * h_p ** 0.15
+
+    # 未选中的分支可能对负数取幂，屏蔽其无效值警告
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n2 = (V_0 / V) ** (0.23 + 0.19 * np.log10(d))
+        h_b = np.where(V <= V_0, base * ratio, base * ratio ** n2)
+    return h_b
+
+
+@instrumented_stage('local_scour', size_arg=4)
+def calculate_local_scour_65_1_array(V, K_t, d, B_1, h_p):
+    """calculate_local_scour_65_1 的数组版本，V <= V_0 分支按掩码逐元素选择"""
+    V, K_t, d, B_1, h_p = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (V, K_t, d, B_1, h_p)))
+    V_0 = 0.0246 * (h_p / d) ** 0.14 * np.sqrt(332 * d + (10 + h_p) / (d ** 0.72))
+    K_η1 = 0.8 * (1 / (d ** 0.45) + 1 / (d ** 0.15))
+    V_0_prime = 0.462 * (d / B_1) ** 0.06 * V_0
+    base = K_t * K_η1 * B_1 ** 0.6
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        n1 = (V_0 / V) ** (0.25 * d ** 0.19)
+        h_b = np.where(V <= V_0,
+                       base * (V - V_0_prime),
+                       base * (V_0 - V_0_prime) * ((V - V_0_prime) / (V_0 - V_0_prime)) ** n1)
+    return h_b
+
+
+@instrumented_stage('area_split')
+def calculate_flow_areas(distances, elevations, design_water_level, boundary1, boundary2, method='simpson',
+                         intersections=None):
+    """计算设计水位下各区域的过水面积
+
+    method: 'simpson' 对各区域测点做辛普森积分（默认）；'exact' 在分界点处裁剪折线精确积分，
+            且只累加水位线以下的部分，露出水面的河心滩不计面积（只计实际过水区间）
+    intersections: 已求得的设计水位交点，给出时不再重新查找
+    """
+    if intersections is None:
+        intersections = find_waterline_intersections(distances, elevations, design_water_level)
 
     if len(intersections) < 2:
         return None, None, None
 
+    if method == 'exact':
+        left_floodplain_area = integrate_wetted_section(
+            distances, elevations, design_water_level, intersections[0], boundary1)[0]
+        channel_area = integrate_wetted_section(
+            distances, elevations, design_water_level, boundary1, boundary2)[0]
+        right_floodplain_area = integrate_wetted_section(
+            distances, elevations, design_water_level, boundary2, intersections[1])[0]
+        return left_floodplain_area, channel_area, right_floodplain_area
+    if method != 'simpson':
+        raise ValueError(f"未知的过水面积计算方法: {method}")
+
     start_idx = np.argmin(np.abs(distances - intersections[0]))
     end_idx = np.argmin(np.abs(distances - intersections[1]))
 
@@ -260,6 +837,7 @@ def calculate_flow_areas(distances, elevations, design_water_level, boundary1, b
     return left_floodplain_area, channel_area, right_floodplain_area
 
 
+@instrumented_stage('flow_distribution', size_arg=None)
 def calculate_flow_distribution(params, left_area, channel_area, right_area,
                                left_area_after, channel_area_after, right_area_after,
                                left_width_after, channel_width_after, right_width_after,
@@ -290,3 +868,1085 @@ def calculate_flow_distribution(params, left_area, channel_area, right_area,
         'total_Q': total_Q
     }
 
+
+def _manning_conveyance(area, width, n):
+    """按 calculate_flow 的宽浅河道假设（R = A/B）计算曼宁输水能力 K = A·R^(2/3)/n"""
+    area = np.asarray(area, dtype=float)
+    width = np.asarray(width, dtype=float)
+    radius = np.divide(area, width, out=np.zeros_like(area), where=width > 0)
+    return area * radius ** (2 / 3) / n
+
+
+def _outer_waterline_extent(distances, elevations, water_levels):
+    """向量化求一组水位下最外侧的左右交点，与 find_waterline_crossings(collapse=True) 一致
+
+    端点低于水位时延伸至断面端点，断面全部露出水面时为 nan。
+    对前缀最小高程二分查找第一个低于水位的测点，每个水位只需 O(log n)。
+    """
+    def first_crossing(d, e):
+        prefix_min = np.minimum.accumulate(e)
+        k = np.searchsorted(-prefix_min, -water_levels, side='right')  # 第一个低于水位的测点
+        dry = k >= len(e)
+        k = np.clip(k, 1, len(e) - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = d[k - 1] + (water_levels - e[k - 1]) * (d[k] - d[k - 1]) / (e[k] - e[k - 1])
+        crossing = np.where(e[0] < water_levels, d[0], crossing)
+        return np.where(dry, np.nan, crossing)
+
+    return first_crossing(distances, elevations), first_crossing(distances[::-1], elevations[::-1])
+
+
+def calculate_stage_table(distances, elevations, water_levels, n_l, n_c, n_r,
+                          bankfull_level=None, boundaries=None, J=None):
+    """批量计算一组水位下的水位-面积-水面宽-输水能力关系表
+
+    distances 可直接传入 CrossSection（此时 elevations 传 None）。
+    河槽分界点取 boundaries，未给出时由 identify_channel_and_floodplain 按平滩水位 bankfull_level 识别。
+    水力半径为 A/P；top_width 为各过水区间的水面宽之和（不计河心滩）。
+    各区域宽度与 ScourPipeline 传给 calculate_flow 的宽度定义相同：最外侧左右交点之间的范围
+    落在该区域内的长度（河槽为 boundary2 - boundary1），区域内露出水面的部分也计入；
+    各区域输水能力按 calculate_flow 的 R = A/B 计算，给出纵坡 J 时同时返回各区域流量 Q = K·√J。
+    返回以数组为值的字典。
+    """
+    section = as_cross_section(distances, elevations)
+
+    if boundaries is None:
+        if bankfull_level is None:
+            raise ValueError("需要给出河槽分界点或平滩水位")
+        boundaries = identify_channel_and_floodplain(section.distances, section.elevations, bankfull_level)
+    boundary1, boundary2 = boundaries
+    if boundary1 is None or boundary2 is None:
+        raise ValueError("无法识别河槽和河滩的分界点")
+
+    water_levels = np.atleast_1d(np.asarray(water_levels, dtype=float))
+    area, width, perimeter = section.geometry(water_levels)
+    hydraulic_radius = np.divide(area, perimeter, out=np.zeros_like(area), where=perimeter > 0)
+
+    table = {
+        'water_level': water_levels,
+        'area': area,
+        'top_width': width,
+        'wetted_perimeter': perimeter,
+        'hydraulic_radius': hydraulic_radius,
+    }
+
+    left_edge, right_edge = _outer_waterline_extent(section.distances, section.elevations, water_levels)
+    regions = ((-np.inf, boundary1), (boundary1, boundary2), (boundary2, np.inf))
+
+    total_K = np.zeros_like(water_levels)
+    for name, part, (low, high), n in zip(('left', 'channel', 'right'), section.split(boundary1, boundary2),
+                                          regions, (n_l, n_c, n_r)):
+        part_area = part.area(water_levels) if part is not None else np.zeros_like(water_levels)
+        part_width = np.nan_to_num(np.maximum(np.minimum(right_edge, high) - np.maximum(left_edge, low), 0))
+        part_K = _manning_conveyance(part_area, part_width, n)
+        table[f'{name}_area'] = part_area
+        table[f'{name}_width'] = part_width
+        table[f'{name}_K'] = part_K
+        total_K = total_K + part_K
+    table['total_K'] = total_K
+
+    if J is not None:
+        slope = math.sqrt(J)
+        for name in ('left', 'channel', 'right', 'total'):
+            table[f'{name}_Q'] = table[f'{name}_K'] * slope
+
+    return table
+
+
+class GeometryCache:
+    """断面几何计算结果的 LRU 缓存
+
+    键由断面内容摘要、水位、分界点和计算方法组成，超过 maxsize 时淘汰最久未使用的条目，
+    maxsize 为 0 时不缓存。hits / misses / evictions 记录命中情况，可通过 info() 读取。
+    """
+
+    def __init__(self, maxsize=GEOMETRY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """命中时返回缓存值，否则调用 compute() 计算并存入"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                self._evict()
+        return value
+
+    def resize(self, maxsize):
+        """修改最大条目数，多出的条目立即淘汰"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """清空缓存和计数"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        """返回缓存统计"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def _evict(self):
+        while len(self._entries) > max(self.maxsize, 0):
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# 模块级共享缓存，Streamlit 重复运行脚本及多个会话查看同一断面时复用几何结果
+geometry_cache = GeometryCache()
+
+
+def cached_waterline_intersections(distances, elevations, water_level, content_hash=None):
+    """带缓存的 find_waterline_intersections
+
+    content_hash: 断面内容摘要（如 CrossSection.content_hash），给出时不再重新计算
+    """
+    content_hash = content_hash or _array_digest(distances, elevations)
+    key = ('intersections', content_hash, float(water_level))
+    intersections = geometry_cache.get_or_compute(
+        key, lambda: find_waterline_intersections(distances, elevations, water_level))
+    return list(intersections)
+
+
+def cached_hydraulic_parameters(distances, elevations, water_level, interval=SAMPLING_INTERVAL,
+                                method='vectorized', wetted_only=False, content_hash=None):
+    """带缓存的 calculate_hydraulic_parameters"""
+    content_hash = content_hash or _array_digest(distances, elevations)
+    key = ('hydraulic', content_hash, float(water_level), interval, method, wetted_only)
+
+    def compute():
+        intersections = cached_waterline_intersections(distances, elevations, water_level, content_hash)
+        return calculate_hydraulic_parameters(distances, elevations, water_level, interval, method,
+                                              wetted_only, intersections=intersections)
+
+    avg_depth, max_depth, flow_area, intersections = geometry_cache.get_or_compute(key, compute)
+    if intersections is not None:
+        intersections = list(intersections)
+    return avg_depth, max_depth, flow_area, intersections
+
+
+def cached_flow_areas(distances, elevations, design_water_level, boundary1, boundary2, method='simpson',
+                      content_hash=None):
+    """带缓存的 calculate_flow_areas"""
+    content_hash = content_hash or _array_digest(distances, elevations)
+    key = ('flow_areas', content_hash, float(design_water_level), float(boundary1), float(boundary2), method)
+
+    def compute():
+        intersections = cached_waterline_intersections(distances, elevations, design_water_level, content_hash)
+        return calculate_flow_areas(distances, elevations, design_water_level, boundary1, boundary2,
+                                    method, intersections=intersections)
+
+    return geometry_cache.get_or_compute(key, compute)
+
+
+class CalculationCancelled(Exception):
+    """计算被用户取消"""
+
+
+@dataclass
+class ScourResult:
+    """一次完整冲刷计算的结果，字段与两个界面的 format_results 入参一致"""
+    params: dict
+    distances: np.ndarray
+    elevations: np.ndarray
+    boundary1: float
+    boundary2: float
+    bankfull_intersections: list
+    design_intersections: list
+    avg_depth: float
+    max_depth: float
+    avg_depth_design: float
+    max_depth_design: float
+    flow_area: float
+    spans: list
+    obstruction_results: tuple
+    pier_obstructions: list
+    flow_areas: tuple
+    flow_distribution: dict
+    scour_results: dict
+    local_scour_results: dict
+    h_p: float
+
+
+class ScourPipeline:
+    """桥梁冲刷计算流水线
+
+    计算按阶段组织为依赖图，每个阶段只读取 STAGE_INPUTS 中声明的参数和上游阶段输出，
+    中间量（水位交点、过流面积、阻水结果等）只计算一次并传给下游阶段。
+    同一实例多次调用 run 时，各阶段按断面内容、所用参数及上游阶段键做记忆化，
+    只重算输入发生变化的阶段及其下游，例如只修改 V、K_t 时仅重算局部冲刷。
+    hydraulic_method / area_method 分别传给 calculate_hydraulic_parameters 和 calculate_flow_areas。
+    """
+
+    # 阶段名称，按计算顺序排列
+    STAGES = ('bankfull', 'design', 'flow_areas', 'obstruction', 'areas_after',
+              'flow_distribution', 'general_scour', 'local_scour')
+
+    # 阶段中文名称，用于进度显示
+    STAGE_LABELS = {
+        'bankfull': '平滩水位', 'design': '设计水位', 'flow_areas': '过水面积', 'obstruction': '桥墩阻水',
+        'areas_after': '阻水后面积', 'flow_distribution': '流量分配', 'general_scour': '一般冲刷',
+        'local_scour': '局部冲刷',
+    }
+
+    # 各阶段依赖：(使用的参数, 上游阶段)
+    STAGE_INPUTS = {
+        'bankfull': (('water_level',), ()),
+        'design': (('design_water_level',), ()),
+        'flow_areas': (('design_water_level',), ('bankfull',)),
+        'obstruction': (('bridge_config', 'pier_width', 'skew_angle', 'design_water_level', 'bridge_start'),
+                        ('bankfull', 'design')),
+        'areas_after': ((), ('bankfull', 'design', 'flow_areas', 'obstruction')),
+        'flow_distribution': (('n_l', 'n_c', 'n_r', 'J', 'Design_Q'), ('areas_after',)),
+        'general_scour': (('mu', 'E', 'd'),
+                          ('bankfull', 'design', 'obstruction', 'areas_after', 'flow_distribution')),
+        'local_scour': (('choice_h_p', 'V', 'K_t', 'd', 'B_1'), ('general_scour',)),
+    }
+
+    def __init__(self, section, hydraulic_method='vectorized', area_method='simpson'):
+        self.hydraulic_method = hydraulic_method
+        self.area_method = area_method
+        self.section = None
+        self._source_digest = None
+        self._memo = {}
+        self.intermediates = {}
+        self.last_recomputed = []
+        self.set_section(section)
+
+    def set_section(self, section):
+        """更换断面数据；内容未变时保留已有的计算结果"""
+        if isinstance(section, CrossSection):
+            if self.section is None or section.content_hash != self.section.content_hash:
+                self.section = section
+            self._source_digest = None
+            return
+
+        distances, elevations = section
+        source_digest = _array_digest(distances, elevations)
+        if source_digest != self._source_digest:
+            self.section = CrossSection(distances, elevations)
+            self._source_digest = source_digest
+
+    def run(self, params, progress=None, cancel_event=None):
+        """执行计算并返回 ScourResult，只重算输入发生变化的阶段
+
+        progress: 可选回调 progress(阶段名, 序号, 阶段总数)，每个阶段开始前调用
+        cancel_event: 可选 threading.Event，已置位时在下一阶段开始前抛出 CalculationCancelled；
+                      只在阶段之间检查，正在执行的阶段不会被中断
+        """
+        section_key = (self.section.content_hash, self.hydraulic_method, self.area_method)
+        outputs = {}
+        keys = {}
+        self.last_recomputed = []
+
+        for index, name in enumerate(self.STAGES):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CalculationCancelled("计算已取消")
+            if progress is not None:
+                progress(name, index, len(self.STAGES))
+
+            param_names, upstream_names = self.STAGE_INPUTS[name]
+            stage_params = {key: params[key] for key in param_names}
+            key = (section_key, tuple(stage_params.values()), tuple(keys[up] for up in upstream_names))
+
+            cached = self._memo.get(name)
+            if cached is not None and cached[0] == key:
+                key, outputs[name] = cached
+            else:
+                outputs[name] = getattr(self, f'_stage_{name}')(stage_params, outputs)
+                self._memo[name] = (key, outputs[name])
+                self.last_recomputed.append(name)
+            keys[name] = key
+
+        # 记忆的阶段输出会在下次 run 时复用，对外只给出副本，调用方修改结果不会影响后续计算
+        outputs = copy.deepcopy(outputs)
+        self.intermediates = outputs
+        return self._build_result(params, outputs)
+
+    def clear(self):
+        """清空已记忆的阶段结果"""
+        self._memo.clear()
+
+    def memo_state(self):
+        """返回已记忆阶段结果的副本 {阶段: (键, 输出)}，可随项目文件保存，之后用 restore_memo 恢复"""
+        return copy.deepcopy(self._memo)
+
+    def restore_memo(self, state):
+        """恢复 memo_state 保存的阶段结果
+
+        键中包含断面摘要和各阶段参数，与本次计算不符的阶段在 run 时照常重算。
+        """
+        for name, (key, output) in state.items():
+            if name in self.STAGE_INPUTS:
+                self._memo[name] = (key, copy.deepcopy(output))
+
+    def _stage_bankfull(self, params, upstream):
+        """平滩水位：交点、平均水深、最大水深，交点即河槽分界点"""
+        distances, elevations = self.section.distances, self.section.elevations
+        water_level = params['water_level']
+        avg_depth, max_depth, _, intersections = cached_hydraulic_parameters(
+            distances, elevations, water_level, method=self.hydraulic_method,
+            content_hash=self.section.content_hash)
+
+        if avg_depth is None:
+            raise ValueError("平滩水位设置不合理，无法计算水力参数")
+        if len(intersections) != 2:
+            raise ValueError("无法识别河槽和河滩的分界点")
+
+        return {
+            'intersections': intersections,
+            'avg_depth': avg_depth,
+            'max_depth': max_depth,
+            'boundary1': intersections[0],
+            'boundary2': intersections[1]
+        }
+
+    def _stage_design(self, params, upstream):
+        """设计水位：交点、平均水深、最大水深、总过流面积"""
+        distances, elevations = self.section.distances, self.section.elevations
+        design_water_level = params['design_water_level']
+        avg_depth, max_depth, flow_area, intersections = cached_hydraulic_parameters(
+            distances, elevations, design_water_level, method=self.hydraulic_method,
+            content_hash=self.section.content_hash)
+
+        if avg_depth is None:
+            raise ValueError("设计水位设置不合理，无法计算水力参数")
+
+        return {
+            'intersections': intersections,
+            'avg_depth': avg_depth,
+            'max_depth': max_depth,
+            'flow_area': flow_area
+        }
+
+    def _stage_flow_areas(self, params, upstream):
+        """设计水位下左河滩、河槽、右河滩过水面积"""
+        bankfull = upstream['bankfull']
+        left_area, channel_area, right_area = cached_flow_areas(
+            self.section.distances, self.section.elevations, params['design_water_level'],
+            bankfull['boundary1'], bankfull['boundary2'],
+            method=self.area_method, content_hash=self.section.content_hash)
+
+        if left_area is None:
+            raise ValueError("无法计算各区域过水面积")
+
+        return {'left_area': left_area, 'channel_area': channel_area, 'right_area': right_area}
+
+    def _stage_obstruction(self, params, upstream):
+        """桥墩阻水，复用设计水位交点和总过流面积"""
+        bankfull, design = upstream['bankfull'], upstream['design']
+        spans = parse_bridge_config(params['bridge_config'])
+        if not spans:
+            raise ValueError("桥梁配置解析失败，请检查格式")
+
+        obstruction_results = calculate_bridge_obstruction(
+            spans, params['pier_width'], params['skew_angle'], params['design_water_level'],
+            self.section.distances, self.section.elevations, params['bridge_start'],
+            bankfull['boundary1'], bankfull['boundary2'],
+            method=self.hydraulic_method, flow_area=design['flow_area'], intersections=design['intersections'])
+
+        return {'spans': spans, 'obstruction_results': obstruction_results}
+
+    def _stage_areas_after(self, params, upstream):
+        """各区域阻水前后的过流面积、宽度及阻水后平均水深"""
+        boundary1, boundary2 = upstream['bankfull']['boundary1'], upstream['bankfull']['boundary2']
+        intersections = upstream['design']['intersections']
+        areas = upstream['flow_areas']
+        (_, _, _,
+         left_obstruction_area, channel_obstruction_area, right_obstruction_area,
+         left_obstruction_width, channel_obstruction_width,
+         right_obstruction_width) = upstream['obstruction']['obstruction_results']
+
+        left_area_after = areas['left_area'] - left_obstruction_area
+        right_area_after = areas['right_area'] - right_obstruction_area
+        channel_area_after = areas['channel_area'] - channel_obstruction_area
+
+        left_width_before = (boundary1 - intersections[0])
+        channel_width_before = (boundary2 - boundary1)
+        right_width_before = (intersections[1] - boundary2)
+
+        left_width_after = left_width_before - left_obstruction_width
+        right_width_after = right_width_before - right_obstruction_width
+        channel_width_after = channel_width_before - channel_obstruction_width
+
+        left_depth_after = left_area_after / left_width_after if left_width_after > 0 else 0
+        right_depth_after = right_area_after / right_width_after if right_width_after > 0 else 0
+        channel_depth_after = channel_area_after / channel_width_after if channel_width_after > 0 else 0
+
+        return {
+            'flow_areas': (
+                areas['left_area'], areas['channel_area'], areas['right_area'],
+                left_area_after, channel_area_after, right_area_after,
+                left_width_after, channel_width_after, right_width_after,
+                left_depth_after, channel_depth_after, right_depth_after
+            ),
+            'widths_before': (left_width_before, channel_width_before, right_width_before)
+        }
+
+    def _stage_flow_distribution(self, params, upstream):
+        """按设计流量分配各区域流量"""
+        (left_area, channel_area, right_area,
+         left_area_after, channel_area_after, right_area_after,
+         left_width_after, channel_width_after, right_width_after,
+         _, _, _) = upstream['areas_after']['flow_areas']
+        left_width_before, channel_width_before, right_width_before = upstream['areas_after']['widths_before']
+
+        return calculate_flow_distribution(
+            params, left_area, channel_area, right_area,
+            left_area_after, channel_area_after, right_area_after,
+            left_width_after, channel_width_after, right_width_after,
+            left_width_before, channel_width_before, right_width_before)
+
+    def _stage_general_scour(self, params, upstream):
+        """64-1、64-2 一般冲刷"""
+        bankfull = upstream['bankfull']
+        flow_distribution = upstream['flow_distribution']
+        obstruction_ratio = upstream['obstruction']['obstruction_results'][1]
+        flow_areas = upstream['areas_after']['flow_areas']
+        channel_width_after, channel_depth_after = flow_areas[7], flow_areas[10]
+
+        B = bankfull['boundary2'] - bankfull['boundary1']
+        H = bankfull['avg_depth']
+        Lcj = channel_width_after
+        h_max = upstream['design']['max_depth']
+        h_c = channel_depth_after
+        B_c = B
+        B_2 = channel_width_after
+
+        scour_depth_64_1, A = calculate_scour(
+            flow_distribution['channel_Q_final'], B_c, H, Lcj, h_max, h_c,
+            params['mu'], params['E'], params['d'])
+
+        scour_depth_64_2, _ = calculate_scour_64_2(
+            flow_distribution['channel_Q_final'], flow_distribution['Q_c'],
+            B_c, B_2, obstruction_ratio, params['mu'], h_max, B, H)
+
+        return {
+            'A': A,
+            'B': B,
+            'H': H,
+            'Lcj': Lcj,
+            'h_max': h_max,
+            'h_c': h_c,
+            'scour_depth_64_1': scour_depth_64_1,
+            'scour_depth_64_2': scour_depth_64_2
+        }
+
+    def _stage_local_scour(self, params, upstream):
+        """确定一般冲刷深度后计算 65-1、65-2 局部冲刷"""
+        scour_results = upstream['general_scour']
+        choice_h_p = str(params['choice_h_p'])
+
+        if choice_h_p.lower() in ('y', 'yes', ''):
+            h_p = max(scour_results['scour_depth_64_1'], scour_results['scour_depth_64_2'])
+        else:
+            try:
+                h_p = float(choice_h_p)
+            except ValueError:
+                raise ValueError(
+                    f"输入错误: '{choice_h_p}' 无法转换为浮点数。"
+                    "请输入 'y' 自动选择最大值，或输入具体数值。")
+
+        return {
+            'h_p': h_p,
+            'local_scour_65_1': calculate_local_scour_65_1(params['V'], params['K_t'], params['d'], params['B_1'], h_p),
+            'local_scour_65_2': calculate_local_scour(params['V'], params['K_t'], params['d'], params['B_1'], h_p)
+        }
+
+    def _build_result(self, params, stages):
+        """汇总各阶段输出"""
+        bankfull, design = stages['bankfull'], stages['design']
+        obstruction_results = stages['obstruction']['obstruction_results']
+        local_scour = stages['local_scour']
+
+        return ScourResult(
+            params=params,
+            distances=self.section.distances,
+            elevations=self.section.elevations,
+            boundary1=bankfull['boundary1'],
+            boundary2=bankfull['boundary2'],
+            bankfull_intersections=bankfull['intersections'],
+            design_intersections=design['intersections'],
+            avg_depth=bankfull['avg_depth'],
+            max_depth=bankfull['max_depth'],
+            avg_depth_design=design['avg_depth'],
+            max_depth_design=design['max_depth'],
+            flow_area=design['flow_area'],
+            spans=stages['obstruction']['spans'],
+            obstruction_results=obstruction_results,
+            pier_obstructions=obstruction_results[2],
+            flow_areas=stages['areas_after']['flow_areas'],
+            flow_distribution=stages['flow_distribution'],
+            scour_results=stages['general_scour'],
+            local_scour_results={
+                'local_scour_65_1': local_scour['local_scour_65_1'],
+                'local_scour_65_2': local_scour['local_scour_65_2']
+            },
+            h_p=local_scour['h_p']
+        )
+
+
+def run_scour_analysis(section, params, hydraulic_method='vectorized', area_method='simpson'):
+    """执行完整的桥梁冲刷计算
+
+    section: CrossSection 或 (distances, elevations)
+    params: 与界面一致的参数字典（n_l, n_c, n_r, J, mu, E, d, water_level, design_water_level,
+            bridge_config, pier_width, skew_angle, bridge_start, K_t, B_1, V, Design_Q, choice_h_p）
+    """
+    return ScourPipeline(section, hydraulic_method, area_method).run(params)
+
+
+# ---------------- 断面数据读取 ----------------
+
+SECTION_PARSE_CHUNK_LINES = 8192  # 整体快速解析失败时，按此行数分块重试，只有出错的块逐行解析
+SECTION_FIELD_SEPARATOR = re.compile(r'[\s,]+')
+SECTION_COMMENT = '#'
+SECTION_TEXT_ENCODINGS = ('utf-8-sig', 'gb18030')  # 字节输入依次尝试的编码，兼容旧版按 GBK 保存的断面文件
+
+
+class SectionParseError(ValueError):
+    """断面数据解析失败；bad_lines 为无法解析的行号（从 1 开始）"""
+
+    def __init__(self, message, bad_lines=()):
+        super().__init__(message)
+        self.bad_lines = list(bad_lines)
+
+
+def format_bad_lines(bad_lines, limit=10):
+    """行号列表转为提示文字，如 '3, 7 行' 或 '3, 7, 12 ... 等 15 行'"""
+    shown = ', '.join(str(line) for line in bad_lines[:limit])
+    return f"{shown} 行" if len(bad_lines) <= limit else f"{shown} 等 {len(bad_lines)} 行"
+
+
+def _bad_lines_error(bad_lines):
+    return SectionParseError(f"第 {format_bad_lines(bad_lines)}数据格式错误：需要距离、高程两个数值", bad_lines)
+
+
+def parse_section_line(line):
+    """解析一行断面数据，返回 (距离, 高程)；空行和注释行返回 None，格式错误抛出 ValueError
+
+    字段以空格、制表符或逗号分隔，只取前两列，# 之后为注释；nan、inf 等非有限数值按格式错误处理。
+    """
+    line = line.split(SECTION_COMMENT, 1)[0].strip()
+    if not line:
+        return None
+    parts = SECTION_FIELD_SEPARATOR.split(line.strip(', '))
+    if len(parts) < 2:
+        raise ValueError("需要至少两个数值（距离、高程）")
+    point = float(parts[0]), float(parts[1])
+    if not (math.isfinite(point[0]) and math.isfinite(point[1])):
+        raise ValueError("距离、高程必须是有限数值")
+    return point
+
+
+def _loadtxt_block(text):
+    """用 numpy 的 C 解析器读取一段已把逗号、制表符换成空格的文本，格式有误或含非有限数值时抛出 ValueError"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)  # 空文本不提示
+        data = np.loadtxt(io.StringIO(text), usecols=(0, 1), comments=SECTION_COMMENT, ndmin=2)
+    if not np.isfinite(data).all():
+        raise ValueError("含有非有限数值")  # 交给逐行解析定位行号
+    return data.reshape(-1, 2)
+
+
+def _decode_section_bytes(content):
+    """按 SECTION_TEXT_ENCODINGS 依次尝试解码，都失败时抛出 SectionParseError"""
+    for encoding in SECTION_TEXT_ENCODINGS:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise SectionParseError(f"无法识别文件编码，请保存为 UTF-8 或 GBK 编码（已尝试 {', '.join(SECTION_TEXT_ENCODINGS)}）")
+
+
+def parse_cross_section_text(text, strict=False):
+    """解析断面数据文本，返回 (distances, elevations, bad_lines)
+
+    先把整段文本交给 numpy 的 C 解析器一次读完；有格式错误时按 SECTION_PARSE_CHUNK_LINES
+    分块重试，只对出错的块逐行解析并记录行号。格式错误的行被跳过，行号在 bad_lines 中返回；
+    strict 为 True 时有错误行即抛出 SectionParseError。有效数据点少于 2 个时也抛出 SectionParseError。
+    字节输入按 SECTION_TEXT_ENCODINGS 解码；开头的 BOM 会被去掉；nan、inf 按格式错误的行处理。
+    """
+    if isinstance(text, bytes):
+        text = _decode_section_bytes(text)
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    cleaned = text.replace(',', ' ').replace('\t', ' ')
+
+    bad_lines = []
+    try:
+        data = _loadtxt_block(cleaned)
+    except ValueError:
+        lines = text.splitlines()
+        cleaned_lines = cleaned.splitlines()
+        blocks = []
+        for start in range(0, len(lines), SECTION_PARSE_CHUNK_LINES):
+            stop = start + SECTION_PARSE_CHUNK_LINES
+            try:
+                blocks.append(_loadtxt_block('\n'.join(cleaned_lines[start:stop])))
+                continue
+            except ValueError:
+                pass
+
+            points = []
+            for number, line in enumerate(lines[start:stop], start + 1):
+                try:
+                    point = parse_section_line(line)
+                except ValueError:
+                    bad_lines.append(number)
+                    continue
+                if point is not None:
+                    points.append(point)
+            blocks.append(np.array(points, dtype=float).reshape(-1, 2))
+        data = np.concatenate(blocks) if blocks else np.empty((0, 2))
+
+    if strict and bad_lines:
+        raise _bad_lines_error(bad_lines)
+    if len(data) < 2:
+        raise SectionParseError("至少需要2个数据点", bad_lines)
+    return data[:, 0].copy(), data[:, 1].copy(), bad_lines
+
+
+def read_cross_section_file(path, strict=False):
+    """读取断面数据文件，返回 (distances, elevations, bad_lines)，规则同 parse_cross_section_text"""
+    with open(path, 'rb') as f:
+        return parse_cross_section_text(f.read(), strict=strict)
+
+
+# ---------------- 断面二进制缓存 ----------------
+
+SECTION_CACHE_ENV = 'BRIDGE_SECTION_CACHE'  # 指定二进制缓存目录的环境变量，未设置时使用用户缓存目录
+SECTION_CACHE_VERSION = 3  # 缓存格式版本，格式变化时递增使旧缓存失效
+
+_unwritable_cache_dirs = set()  # 写入失败过的缓存目录，本进程内不再尝试写入
+
+
+def _file_digest(content):
+    """文件内容摘要，用作二进制缓存键"""
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def _atomic_write(path, write):
+    """先写入同目录临时文件再替换，避免其他进程读到写了一半的缓存"""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            write(f)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def default_section_cache_dir():
+    """断面二进制缓存的默认目录：环境变量 BRIDGE_SECTION_CACHE，否则为用户缓存目录下的 bridge_scour/sections"""
+    directory = os.environ.get(SECTION_CACHE_ENV)
+    if directory:
+        return directory
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'bridge_scour', 'sections')
+
+
+def section_cache_paths(path, cache_dir=None):
+    """返回断面文件对应的缓存目录和元数据文件路径
+
+    缓存不写在断面文件旁边，而是集中放在 cache_dir（默认 default_section_cache_dir()）中，
+    文件名带源文件绝对路径的摘要，不同目录下的同名文件互不干扰。
+    """
+    directory = cache_dir or default_section_cache_dir()
+    source = os.path.abspath(path)
+    key = hashlib.blake2b(source.encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+    return directory, os.path.join(directory, f"{os.path.basename(source)}.{key}.json")
+
+
+def _read_section_cache_meta(meta_path):
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == SECTION_CACHE_VERSION else None
+
+
+def _load_section_cache(directory, meta):
+    """内存映射方式加载缓存数组，返回 (distances, elevations)；文件缺失或损坏时返回 None"""
+    try:
+        data = np.load(os.path.join(directory, meta['data']), mmap_mode='r')
+    except (OSError, ValueError, KeyError):
+        return None
+    if data.ndim != 2 or data.shape[0] != 2:
+        return None
+    return data[0], data[1]
+
+
+def write_section_cache(path, distances, elevations, bad_lines=(), stat=None, digest=None, cache_dir=None):
+    """把断面数据写成二进制缓存，返回缓存数组文件路径
+
+    数组按 (2, N) float64 存为 .npy，距离、高程各占一行，加载后两列都是连续的内存映射视图。
+    元数据 JSON 记录源文件大小、修改时间和内容摘要；数组文件名带摘要，
+    多个进程同时写入不同内容时不会互相覆盖。
+    """
+    directory, meta_path = section_cache_paths(path, cache_dir)
+    if stat is None:
+        stat = os.stat(path)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = _file_digest(f.read())
+
+    os.makedirs(directory, exist_ok=True)
+    data_name = f"{os.path.basename(meta_path)[:-len('.json')]}.{digest}.npy"
+    data_path = os.path.join(directory, data_name)
+    # 同名数组文件已由其他进程写好时不再重写，损坏时覆盖
+    if _load_section_cache(directory, {'data': data_name}) is None:
+        data = np.vstack([np.asarray(distances, dtype=np.float64), np.asarray(elevations, dtype=np.float64)])
+        _atomic_write(data_path, lambda f: np.save(f, data))
+
+    old_meta = _read_section_cache_meta(meta_path)
+    meta = {
+        'version': SECTION_CACHE_VERSION,
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'digest': digest,
+        'data': data_name,
+        'points': int(len(distances)),
+        'bad_lines': list(bad_lines),
+    }
+    _atomic_write(meta_path, lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode('utf-8')))
+
+    # 清理旧内容的数组文件（Windows 下仍被映射时删除失败，留待下次清理）
+    if old_meta and old_meta.get('data') not in (None, data_name):
+        try:
+            os.remove(os.path.join(directory, old_meta['data']))
+        except OSError:
+            pass
+    return data_path
+
+
+def load_cross_section(path, strict=False, use_cache=False, cache_dir=None):
+    """读取断面数据文件，返回 (distances, elevations, bad_lines)
+
+    use_cache: 为 True 时使用二进制缓存（位于 cache_dir，默认 default_section_cache_dir()）。
+    源文件大小和修改时间与缓存元数据一致时直接内存映射加载缓存（只读、零拷贝，
+    多个进程共享同一份页面）；不一致时比较内容摘要，内容未变只更新元数据，
+    否则重新解析文本并写入缓存。缓存目录不可写时照常解析，且本进程内不再尝试写入。
+    strict 等规则同 parse_cross_section_text。
+    """
+    if not use_cache:
+        return read_cross_section_file(path, strict=strict)
+
+    stat = os.stat(path)
+    directory, meta_path = section_cache_paths(path, cache_dir)
+    meta = _read_section_cache_meta(meta_path)
+    cached = None
+    if meta and meta['source_size'] == stat.st_size and meta['source_mtime_ns'] == stat.st_mtime_ns:
+        cached = _load_section_cache(directory, meta)
+
+    if cached is None:
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest = _file_digest(content)
+        if meta and meta['digest'] == digest:
+            cached = _load_section_cache(directory, meta)
+        if cached is None:
+            try:
+                distances, elevations, bad_lines = parse_cross_section_text(content)
+            except SectionParseError as e:
+                if strict and e.bad_lines:
+                    raise _bad_lines_error(e.bad_lines) from None
+                raise
+            meta = {'bad_lines': bad_lines}
+            cached = distances, elevations
+        if directory not in _unwritable_cache_dirs:
+            try:
+                write_section_cache(path, cached[0], cached[1], meta['bad_lines'], stat, digest, directory)
+            except OSError:
+                _unwritable_cache_dirs.add(directory)
+
+    bad_lines = meta['bad_lines']
+    if strict and bad_lines:
+        raise _bad_lines_error(bad_lines)
+    return cached[0], cached[1], bad_lines
+
+
+# ---------------- 批量计算命令行：python -m bridge_calculations batch ----------------
+
+# 计算参数（与界面参数字典一致），bridge_config、choice_h_p 为文本，其余为数值
+PARAM_KEYS = ('n_l', 'n_c', 'n_r', 'J', 'mu', 'E', 'd', 'water_level', 'design_water_level',
+              'bridge_config', 'pier_width', 'skew_angle', 'bridge_start', 'K_t', 'B_1', 'V',
+              'Design_Q', 'choice_h_p')
+TEXT_PARAM_KEYS = ('bridge_config', 'choice_h_p')
+DEFAULT_SITE = '*'  # 参数表中 site 为 * 的行作为所有站点的默认参数
+
+# 批量结果输出字段
+BATCH_RESULT_FIELDS = (
+    'site', 'section', 'status', 'error', 'seconds', 'points',
+    'boundary1', 'boundary2', 'total_obstruction_area', 'obstruction_ratio',
+    'left_area', 'channel_area', 'right_area', 'channel_Q_final', 'left_Q_final', 'right_Q_final',
+    'Q_c', 'total_Q', 'A', 'B', 'H', 'Lcj', 'h_max', 'h_c', 'scour_depth_64_1', 'scour_depth_64_2',
+    'h_p', 'local_scour_65_1', 'local_scour_65_2')
+
+
+def _read_table(path):
+    """读取 CSV 或 JSON（对象列表）表格，返回字典列表"""
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError(f"{path}: JSON 表格应为对象列表")
+        return rows
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return [{key.strip(): value for key, value in row.items() if key} for row in csv.DictReader(f)]
+
+
+def _coerce_params(row):
+    """从表格行取出计算参数并转换类型，缺少的参数抛出 ValueError"""
+    missing = [key for key in PARAM_KEYS if row.get(key) in (None, '')]
+    if missing:
+        raise ValueError(f"缺少参数: {', '.join(missing)}")
+    return {key: str(row[key]).strip() if key in TEXT_PARAM_KEYS else float(row[key]) for key in PARAM_KEYS}
+
+
+def collect_batch_tasks(sections, params_path=None, pattern='*.txt'):
+    """整理批量计算任务，返回 [(站点名, 断面文件, 参数行), ...]
+
+    sections: 断面文件目录（按 pattern 匹配，站点名为文件名去掉扩展名），
+              或清单文件（CSV/JSON，列 site、section，可附带参数列，相对路径相对清单所在目录）
+    params_path: 参数表（CSV/JSON），按 site 列匹配站点，site 为 * 的行作为默认值；
+                 清单中的参数列优先于参数表
+    """
+    import fnmatch
+
+    if os.path.isdir(sections):
+        entries = [{'site': os.path.splitext(name)[0], 'section': os.path.join(sections, name)}
+                   for name in sorted(os.listdir(sections)) if fnmatch.fnmatch(name, pattern)]
+    else:
+        base_dir = os.path.dirname(os.path.abspath(sections))
+        entries = []
+        for row in _read_table(sections):
+            entry = dict(row)
+            entry['section'] = os.path.join(base_dir, str(row['section']))
+            entry.setdefault('site', os.path.splitext(os.path.basename(entry['section']))[0])
+            entries.append(entry)
+
+    param_rows = {}
+    if params_path:
+        for row in _read_table(params_path):
+            param_rows[str(row.get('site', DEFAULT_SITE)).strip()] = row
+
+    tasks = []
+    for entry in entries:
+        site = str(entry['site']).strip()
+        params = dict(param_rows.get(DEFAULT_SITE, {}))
+        params.update(param_rows.get(site, {}))
+        params.update({key: value for key, value in entry.items() if key in PARAM_KEYS and value not in (None, '')})
+        tasks.append((site, entry['section'], params))
+    return tasks
+
+
+def run_batch_task(site, section_path, param_row, hydraulic_method='vectorized', area_method='simpson',
+                   stage_timing=False, section_cache=False):
+    """计算一个站点，返回 BATCH_RESULT_FIELDS 对应的结果行；出错时 status 为 error
+
+    stage_timing: 为 True 时结果行另含 stage_timings（StageTimer.summary() 的各阶段耗时）
+    section_cache: 为 True 时通过二进制缓存读取断面文件，见 load_cross_section
+    """
+    row = dict.fromkeys(BATCH_RESULT_FIELDS, '')
+    row.update(site=site, section=section_path)
+    started = time.perf_counter()
+    with (StageTimer() if stage_timing else nullcontext()) as timer:
+        try:
+            params = _coerce_params(param_row)
+            distances, elevations, _ = load_cross_section(section_path, strict=True, use_cache=section_cache)
+            result = run_scour_analysis((distances, elevations), params, hydraulic_method, area_method)
+
+            row.update(
+                points=len(distances),
+                boundary1=result.boundary1,
+                boundary2=result.boundary2,
+                total_obstruction_area=result.obstruction_results[0],
+                obstruction_ratio=result.obstruction_results[1],
+                left_area=result.flow_areas[0],
+                channel_area=result.flow_areas[1],
+                right_area=result.flow_areas[2],
+                h_p=result.h_p)
+            row.update({key: value for key, value in result.flow_distribution.items() if key in row})
+            row.update({key: value for key, value in result.scour_results.items() if key in row})
+            row.update(result.local_scour_results)
+            row['status'] = 'ok'
+        except Exception as e:
+            row.update(status='error', error=f"{type(e).__name__}: {e}")
+    if timer is not None:
+        row['stage_timings'] = timer.summary()
+    row['seconds'] = time.perf_counter() - started
+
+    # 转为普通 Python 数值，便于写出 CSV/JSON
+    return {key: value.item() if isinstance(value, np.generic) else value for key, value in row.items()}
+
+
+def _batch_task_args(task):
+    """进程池入口（需为模块级函数以便序列化）"""
+    return run_batch_task(*task)
+
+
+class _BatchWriter:
+    """按输出文件扩展名逐行写出 CSV 或 JSONL，每行写完立即刷新"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.jsonl = path.lower().endswith(('.jsonl', '.json'))
+        if not self.jsonl:
+            self.writer = csv.DictWriter(self.file, fieldnames=BATCH_RESULT_FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        else:
+            self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_batch(tasks, output_path, workers=None, hydraulic_method='vectorized', area_method='simpson',
+              progress=None, stage_log=None, section_cache=False):
+    """用进程池执行批量计算，结果完成一个写出一个
+
+    workers: 进程数，默认 CPU 核数；为 1 时在当前进程顺序计算
+    progress: 可选回调 progress(结果行, 已完成数, 总数)
+    stage_log: 可选 JSON Lines 文件路径，每个站点写一行 {site, status, seconds, stages}，
+               stages 为各计算阶段的调用次数、累计耗时和最大规模
+    section_cache: 为 True 时通过二进制缓存读取断面文件，重复计算同一批断面时省去文本解析
+    返回汇总字典：total, ok, failed, seconds, sites_per_second, failures [(站点, 错误)]
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    jobs = [(site, path, params, hydraulic_method, area_method, stage_log is not None, section_cache)
+            for site, path, params in tasks]
+    writer = _BatchWriter(output_path)
+    stage_file = open(stage_log, 'w', encoding='utf-8') if stage_log else None
+    failures = []
+    started = time.perf_counter()
+
+    def handle(row, done):
+        stages = row.pop('stage_timings', None)
+        if stage_file is not None:
+            stage_file.write(json.dumps({'site': row['site'], 'status': row['status'], 'seconds': row['seconds'],
+                                         'stages': stages}, ensure_ascii=False) + '\n')
+            stage_file.flush()
+        writer.write(row)
+        if row['status'] != 'ok':
+            failures.append((row['site'], row['error']))
+        if progress is not None:
+            progress(row, done, len(jobs))
+
+    try:
+        if workers == 1:
+            for done, job in enumerate(jobs, 1):
+                handle(_batch_task_args(job), done)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_batch_task_args, job) for job in jobs]
+                for done, future in enumerate(as_completed(futures), 1):
+                    handle(future.result(), done)
+    finally:
+        writer.close()
+        if stage_file is not None:
+            stage_file.close()
+
+    seconds = time.perf_counter() - started
+    return {
+        'total': len(jobs),
+        'ok': len(jobs) - len(failures),
+        'failed': len(failures),
+        'seconds': seconds,
+        'sites_per_second': len(jobs) / seconds if seconds > 0 else 0.0,
+        'failures': failures
+    }
+
+
+def main(argv=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m bridge_calculations', description='桥梁冲刷计算命令行工具')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='批量计算多个站点断面')
+    batch.add_argument('sections', help='断面文件目录，或站点清单（CSV/JSON，列 site、section）')
+    batch.add_argument('-p', '--params', help='参数表（CSV/JSON），按 site 列匹配，site 为 * 的行为默认值')
+    batch.add_argument('-o', '--output', required=True, help='结果文件，扩展名 .csv 或 .jsonl')
+    batch.add_argument('-j', '--workers', type=int, default=None, help='进程数，默认 CPU 核数')
+    batch.add_argument('--pattern', default='*.txt', help='目录输入时的断面文件匹配模式（默认 *.txt）')
+    batch.add_argument('--hydraulic-method', default='vectorized', choices=('vectorized', 'loop', 'exact'))
+    batch.add_argument('--area-method', default='simpson', choices=('simpson', 'exact'))
+    batch.add_argument('-q', '--quiet', action='store_true', help='不逐个输出站点进度')
+    batch.add_argument('--stage-log', help='各站点分阶段耗时写入该 JSON Lines 文件，用于定位慢的计算阶段')
+    batch.add_argument('--section-cache', action='store_true',
+                       help=f'通过二进制缓存读取断面文件（缓存目录见 cache 命令，可用环境变量 {SECTION_CACHE_ENV} 指定）')
+
+    cache = commands.add_parser('cache', help='把断面文件转换为二进制缓存，供 batch --section-cache 快速加载')
+    cache.add_argument('files', nargs='+', help='断面文件')
+    cache.add_argument('--cache-dir', help='缓存目录，默认为用户缓存目录下的 bridge_scour/sections')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'cache':
+        failed = 0
+        for path in args.files:
+            try:
+                distances, _, bad_lines = load_cross_section(path, use_cache=True, cache_dir=args.cache_dir)
+                _, meta_path = section_cache_paths(path, args.cache_dir)
+                note = f"，跳过第 {format_bad_lines(bad_lines)}" if bad_lines else ''
+                print(f"{path}: {len(distances)} 个测点{note} -> {os.path.dirname(meta_path)}", file=sys.stderr)
+            except Exception as e:
+                failed += 1
+                print(f"{path}: 失败 ({type(e).__name__}: {e})", file=sys.stderr)
+        return 1 if failed else 0
+
+    tasks = collect_batch_tasks(args.sections, args.params, args.pattern)
+    if not tasks:
+        print(f"未找到断面文件: {args.sections}", file=sys.stderr)
+        return 2
+
+    def report(row, done, total):
+        if not args.quiet:
+            state = '完成' if row['status'] == 'ok' else f"失败 ({row['error']})"
+            print(f"[{done}/{total}] {row['site']}: {state}", file=sys.stderr)
+
+    summary = run_batch(tasks, args.output, args.workers, args.hydraulic_method, args.area_method, report,
+                        args.stage_log, args.section_cache)
+
+    print(f"共 {summary['total']} 个站点，成功 {summary['ok']}，失败 {summary['failed']}，"
+          f"耗时 {summary['seconds']:.2f} s，{summary['sites_per_second']:.2f} 站点/s", file=sys.stderr)
+    for site, error in summary['failures']:
+        print(f"  失败 {site}: {error}", file=sys.stderr)
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
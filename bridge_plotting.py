@@ -0,0 +1,192 @@
+"""
+桥梁冲刷绘图辅助模块
+Streamlit 与 Tkinter 两个界面共用的断面图绘制函数，不依赖界面状态，可在后台线程中对独立 Figure 调用
+"""
+import numpy as np
+
+from bridge_calculations import REGION_LABELS, find_waterline_intersections
+
+# 各区域桥墩颜色
+PIER_COLORS = {'左河滩': 'blue', '河槽': 'purple', '右河滩': 'red'}
+PIER_LABEL_SPACING = 14  # 桥墩标注最小像素间距，缩放时按此间距抽稀标注
+
+
+def decimate_minmax(x, y, n_bins):
+    """按像素列抽稀折线：每列保留首点、末点、最低点和最高点
+
+    n_bins 一般取输出宽度（像素），抽稀后最多 4 * n_bins 个点，保持原有顺序，
+    折线外形与逐点绘制一致。仅用于绘图，计算仍使用原始数据。
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n_bins = int(n_bins)
+    if n_bins < 1 or len(x) <= 4 * n_bins or not (np.all(np.isfinite(x)) and np.all(np.isfinite(y))):
+        return x, y
+
+    x_min, x_max = x.min(), x.max()
+    if x_max <= x_min:
+        return x, y
+    bins = np.minimum(((x - x_min) / (x_max - x_min) * n_bins).astype(np.int64), n_bins - 1)
+
+    # 按列分组：稳定排序得到每列首末点，按 (列, 高程) 排序得到每列最低、最高点
+    by_bin = np.argsort(bins, kind='stable')
+    by_bin_y = np.lexsort((y, bins))
+    group_start = np.flatnonzero(np.r_[True, np.diff(bins[by_bin]) != 0])
+    group_end = np.r_[group_start[1:], len(x)] - 1
+
+    keep = np.unique(np.concatenate([by_bin[group_start], by_bin[group_end],
+                                     by_bin_y[group_start], by_bin_y[group_end]]))
+    return x[keep], y[keep]
+
+
+def decimate_for_axes(ax, x, y, dpi=None):
+    """按坐标轴输出像素宽度抽稀；dpi 为保存图片的分辨率，默认按屏幕分辨率"""
+    fig = ax.get_figure()
+    width = ax.bbox.width
+    if dpi is not None:
+        width = width / fig.dpi * dpi
+    return decimate_minmax(x, y, max(int(width), 1))
+
+
+def _pier_arrays(pier_obstructions):
+    """桥墩数据转为位置、水深数组和区域名称列表，支持字典列表和 PIER_DTYPE 表"""
+    if isinstance(pier_obstructions, np.ndarray):
+        regions = [REGION_LABELS[r] for r in pier_obstructions['region']]
+        return (np.asarray(pier_obstructions['position'], dtype=float),
+                np.asarray(pier_obstructions['depth'], dtype=float), regions)
+
+    positions = np.array([pier['position'] for pier in pier_obstructions], dtype=float)
+    depths = np.array([pier['depth'] for pier in pier_obstructions], dtype=float)
+    regions = [pier['region'] for pier in pier_obstructions]
+    return positions, depths, regions
+
+
+def _thin_label_indices(ax, positions, spacing=PIER_LABEL_SPACING):
+    """选出当前视图内需要标注的桥墩，相邻标注至少间隔 spacing 像素"""
+    x_min, x_max = sorted(ax.get_xlim())
+    visible = np.flatnonzero((positions >= x_min) & (positions <= x_max))
+    if len(visible) == 0 or x_max <= x_min:
+        return visible
+
+    # 按像素分桶，每个桶只保留第一个桥墩
+    pixels = (positions[visible] - x_min) / (x_max - x_min) * max(ax.bbox.width, 1.0)
+    _, first = np.unique(np.floor(pixels / spacing), return_index=True)
+    return visible[first]
+
+
+def draw_piers(ax, pier_obstructions, design_water_level=None):
+    """批量绘制桥墩位置、水深和标注
+
+    所有桥墩的竖线、水深线分别合并为一个 LineCollection，端点用一次 scatter 绘制，
+    标注文字按当前横轴范围抽稀，缩放或平移时自动更新，绘图开销基本不随桥墩数量增长。
+    """
+    if pier_obstructions is None or len(pier_obstructions) == 0:
+        return
+    from matplotlib.collections import LineCollection
+
+    positions, depths, regions = _pier_arrays(pier_obstructions)
+    colors = [PIER_COLORS.get(region, 'red') for region in regions]
+
+    # 桥墩位置竖线，纵向贯穿坐标轴（与 axvline 相同）
+    marker_segments = np.zeros((len(positions), 2, 2))
+    marker_segments[:, :, 0] = positions[:, None]
+    marker_segments[:, 1, 1] = 1.0
+    ax.add_collection(LineCollection(
+        marker_segments, colors=colors, linestyles='--', linewidths=1,
+        transform=ax.get_xaxis_transform(), label=f'桥墩 1 ({regions[0]})'), autolim=False)
+
+    if design_water_level is None:
+        return
+
+    # 桥墩处水深线及端点
+    bottoms = design_water_level - depths
+    depth_segments = np.stack([np.column_stack([positions, bottoms]),
+                               np.column_stack([positions, np.full_like(positions, design_water_level)])],
+                              axis=1)
+    ax.add_collection(LineCollection(depth_segments, colors=colors, linewidths=1.5))
+    ax.scatter(np.concatenate([positions, positions]),
+               np.concatenate([bottoms, np.full_like(positions, design_water_level)]),
+               c=colors + colors, s=16, marker='o', zorder=3)
+
+    labels = []
+
+    def update_labels(ax):
+        for text in labels:
+            text.remove()
+        labels.clear()
+        for i in _thin_label_indices(ax, positions):
+            labels.append(ax.text(positions[i], design_water_level + 0.5, f'墩{i + 1}: {depths[i]:.1f}m',
+                                  horizontalalignment='center', rotation=90, color=colors[i]))
+
+    update_labels(ax)
+    ax.callbacks.connect('xlim_changed', update_labels)
+
+
+def _fill_below_waterline(ax, distances, elevations, plot_distances, plot_elevations, level, color, alpha):
+    """填充水位线以下的过水区域，交点按原始数据计算"""
+    intersections = find_waterline_intersections(distances, elevations, level)
+    if len(intersections) < 2:
+        return
+    start_idx = np.argmin(np.abs(plot_distances - intersections[0]))
+    end_idx = np.argmin(np.abs(plot_distances - intersections[1]))
+    x = np.concatenate([[plot_distances[start_idx]], plot_distances[start_idx:end_idx + 1], [plot_distances[end_idx]]])
+    y = np.concatenate([[level], plot_elevations[start_idx:end_idx + 1], [level]])
+    ax.fill(x, y, color, alpha=alpha)
+
+
+def draw_cross_section(figure, distances, elevations, water_level=None, design_water_level=None,
+                       channel_boundaries=None, pier_obstructions=None, title=None, config=None, dpi=None):
+    """在 figure 上绘制河道横断面图
+
+    只使用传入的数据和 config（标题、坐标轴标签、坐标范围、网格样式），不读取界面状态，
+    可在后台线程中对独立的 Figure 调用。dpi 为保存图片的分辨率，用于按输出宽度抽稀。
+    """
+    figure.clear()
+    ax = figure.add_subplot(111)
+    # 按输出像素宽度抽稀后绘制，水位交点等仍按原始数据计算
+    plot_distances, plot_elevations = decimate_for_axes(ax, distances, elevations, dpi)
+    ax.plot(plot_distances, plot_elevations, 'k-', linewidth=2, label='河道断面')
+    ax.fill_between(plot_distances, plot_elevations, np.min(elevations) - 1, color='lightgray', alpha=0.5)
+
+    # 平滩水位线及其下的水流区域
+    if water_level is not None:
+        ax.axhline(y=water_level, color='b', linestyle='--', linewidth=1.5, label='平滩水位')
+        _fill_below_waterline(ax, distances, elevations, plot_distances, plot_elevations, water_level, 'b', 0.3)
+
+    # 设计水位线及其下的水流区域
+    if design_water_level is not None:
+        ax.axhline(y=design_water_level, color='r', linestyle='-', linewidth=1.5, label='设计水位')
+        _fill_below_waterline(ax, distances, elevations, plot_distances, plot_elevations,
+                              design_water_level, 'r', 0.2)
+
+    # 标记河槽和河滩的分界点
+    if channel_boundaries is not None and len(channel_boundaries) == 2:
+        ax.axvline(x=channel_boundaries[0], color='g', linestyle='-.', linewidth=1.5, label='河槽左边界')
+        ax.axvline(x=channel_boundaries[1], color='g', linestyle='-.', linewidth=1.5, label='河槽右边界')
+
+    # 标记桥墩位置和阻水区域（批量绘制，标注随缩放抽稀）
+    draw_piers(ax, pier_obstructions, design_water_level)
+
+    # 使用自定义配置或默认值
+    if config:
+        ax.set_title(title if title else config['title'])
+        ax.set_xlabel(config['xlabel'])
+        ax.set_ylabel(config['ylabel'])
+        if config['xmin'] is not None:
+            ax.set_xlim(left=config['xmin'])
+        if config['xmax'] is not None:
+            ax.set_xlim(right=config['xmax'])
+        if config['ymin'] is not None:
+            ax.set_ylim(bottom=config['ymin'])
+        if config['ymax'] is not None:
+            ax.set_ylim(top=config['ymax'])
+        ax.grid(True, alpha=config.get('grid_alpha', 1.0), linestyle=config.get('grid_style', '-'))
+    else:
+        ax.set_title(title if title else '河道横断面图')
+        ax.set_xlabel('距离 (m)')
+        ax.set_ylabel('高程 (m)')
+        ax.grid(True, alpha=1.0, linestyle='-')
+
+    ax.legend()
+    figure.tight_layout()
+    return ax
@@ -0,0 +1,184 @@
+"""
+桥梁冲刷项目文件
+项目保存为 zip 容器：manifest.json 记录输入参数和各成员的索引，断面数组以 .npy 存放，
+另可附带上次的计算结果（如 ScourPipeline.memo_state() 的阶段结果）。
+打开项目时只读取 manifest，数组和结果在首次访问时才从文件中读取。
+旧版项目（缩进 JSON 的 .dat 文件）仍可读取。
+"""
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+PROJECT_FORMAT = 'bridge-scour-project'
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = '.bsp'  # 新版项目文件扩展名
+MANIFEST_NAME = 'manifest.json'
+
+
+def _to_json(value):
+    """把元组、numpy 标量和数组转换为可 JSON 序列化的形式，元组和数组带标记以便原样恢复"""
+    if isinstance(value, tuple):
+        return {'__tuple__': [_to_json(item) for item in value]}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return {'__array__': value.tolist(), 'dtype': value.dtype.str}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_json(obj):
+    """json.loads 的 object_hook，恢复 _to_json 标记的元组和数组"""
+    if '__tuple__' in obj:
+        return tuple(obj['__tuple__'])
+    if '__array__' in obj:
+        return np.array(obj['__array__'], dtype=obj['dtype'])
+    return obj
+
+
+def _npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def save_project_archive(path, inputs, distances=None, elevations=None, results=None):
+    """保存项目文件
+
+    inputs: get_all_inputs() 得到的输入字典
+    distances, elevations: 断面数据，给出时嵌入项目，打开时不再读取外部断面文件
+    results: 可选的计算结果 {名称: 字符串 | numpy 数组 | 由 dict/list/tuple/数值组成的对象}
+    先写临时文件再替换，保存中断不会损坏原项目文件。
+    """
+    manifest = {
+        'format': PROJECT_FORMAT,
+        'version': PROJECT_VERSION,
+        'inputs': inputs,
+        'arrays': {},
+        'results': {},
+    }
+    members = []
+
+    if distances is not None and elevations is not None:
+        section = np.vstack([np.asarray(distances, dtype=np.float64), np.asarray(elevations, dtype=np.float64)])
+        manifest['arrays']['section'] = {'file': 'arrays/section.npy', 'shape': list(section.shape)}
+        members.append(('arrays/section.npy', _npy_bytes(section), zipfile.ZIP_STORED))
+
+    for name, value in (results or {}).items():
+        if isinstance(value, np.ndarray):
+            entry = {'file': f'results/{name}.npy', 'kind': 'array'}
+            data, compression = _npy_bytes(value), zipfile.ZIP_STORED
+        elif isinstance(value, str):
+            entry = {'file': f'results/{name}.txt', 'kind': 'text'}
+            data, compression = value.encode('utf-8'), zipfile.ZIP_DEFLATED
+        else:
+            entry = {'file': f'results/{name}.json', 'kind': 'json'}
+            data, compression = json.dumps(_to_json(value), ensure_ascii=False).encode('utf-8'), zipfile.ZIP_DEFLATED
+        manifest['results'][name] = entry
+        members.append((entry['file'], data, compression))
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with zipfile.ZipFile(temp_path, 'w') as archive:
+            # manifest 放在最前，打开时只需读取这一项
+            archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2),
+                             compress_type=zipfile.ZIP_DEFLATED)
+            for name, data, compression in members:
+                archive.writestr(name, data, compress_type=compression)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class ProjectArchive:
+    """按需读取的项目文件
+
+    创建时只读取 manifest，不保持文件打开；section()、result() 首次调用时才从 zip 中读取对应成员并缓存。
+    打开后文件若被替换，再读取成员时抛出 ValueError。
+    旧版 JSON 项目文件也可打开，此时只有 inputs，没有嵌入的数组和结果。
+    zip 文件损坏时抛出 zipfile.BadZipFile。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._loaded = {}
+        self._stat = None
+        if zipfile.is_zipfile(path):
+            self._stat = self._file_stat()
+            with zipfile.ZipFile(path) as archive:
+                try:
+                    manifest = json.loads(archive.read(MANIFEST_NAME).decode('utf-8'))
+                except (KeyError, ValueError):
+                    raise ValueError("项目文件缺少有效的 manifest.json")
+            if manifest.get('format') != PROJECT_FORMAT:
+                raise ValueError("不是桥梁冲刷项目文件")
+            if manifest.get('version', 0) > PROJECT_VERSION:
+                raise ValueError("项目文件版本过高，请升级程序后打开")
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = {'inputs': json.load(f), 'arrays': {}, 'results': {}}
+        self.manifest = manifest
+
+    def _file_stat(self):
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    @property
+    def is_legacy(self):
+        """是否为旧版 JSON 项目文件"""
+        return self._stat is None
+
+    @property
+    def inputs(self):
+        return self.manifest['inputs']
+
+    @property
+    def has_section(self):
+        return 'section' in self.manifest['arrays']
+
+    def result_names(self):
+        return list(self.manifest['results'])
+
+    def _read(self, name):
+        if name not in self._loaded:
+            if self._file_stat() != self._stat:
+                raise ValueError("项目文件在打开后已被修改，请重新导入")
+            with zipfile.ZipFile(self.path) as archive:
+                self._loaded[name] = archive.read(name)
+        return self._loaded[name]
+
+    def section(self):
+        """返回嵌入的断面数据 (distances, elevations)，没有时返回 None"""
+        if not self.has_section:
+            return None
+        data = np.load(io.BytesIO(self._read(self.manifest['arrays']['section']['file'])), allow_pickle=False)
+        return data[0], data[1]
+
+    def result(self, name, default=None):
+        """读取一项附带的计算结果，不存在时返回 default"""
+        entry = self.manifest['results'].get(name)
+        if entry is None:
+            return default
+        data = self._read(entry['file'])
+        if entry['kind'] == 'array':
+            return np.load(io.BytesIO(data), allow_pickle=False)
+        if entry['kind'] == 'text':
+            return data.decode('utf-8')
+        return json.loads(data.decode('utf-8'), object_hook=_from_json)
+
+    def close(self):
+        """释放已读取成员的缓存"""
+        self._loaded.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,10 +1,13 @@
+from startup_profile import StartupProfiler
+
+STARTUP_BUDGET_SECONDS = 1.5  # 冷启动预算（秒），设置 BRIDGE_STARTUP_PROFILE=1 时检查
+STARTUP_PROFILER = StartupProfiler('chongshua_you', budget=STARTUP_BUDGET_SECONDS)
+STARTUP_PROFILER.start_import_tracking()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import math
-import re
 import logging
 from io import StringIO
 from datetime import datetime, timedelta
@@ -12,34 +15,244 @@ import os
 import json
 import hashlib
 import platform
-import subprocess
 import base64
-import socket
-import urllib.request
-import urllib.error
-try:
-    import pyperclip
-    HAS_PYPERCLIP = True
-except ImportError:
-    HAS_PYPERCLIP = False
-try:
-    from PIL import Image, ImageTk
-    HAS_PIL = True
-except ImportError:
-    HAS_PIL = False
-    logging.warning("PIL库未安装，桥梁图片功能将不可用")
-
-# 忽略matplotlib字体警告
-logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
-plt.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]
-plt.rcParams['axes.unicode_minus'] = False
+import threading
+import queue
+import struct
+import time
+import zipfile
+
+from bridge_calculations import (CalculationCancelled, ScourPipeline, load_cross_section,
+                                 parse_cross_section_text, parse_section_line)
+from bridge_plotting import decimate_minmax, draw_cross_section
+from bridge_project import PROJECT_EXTENSION, ProjectArchive, save_project_archive
+
+STARTUP_PROFILER.stop_import_tracking()
+STARTUP_PROFILER.mark('模块导入')
+
+# matplotlib、PIL、pyperclip 等较重的模块在首次使用时才导入，见 load_matplotlib / load_pil
+Figure = None
+FigureCanvasTkAgg = None
+
+
+def load_matplotlib():
+    """首次绘图时导入 matplotlib（TkAgg 后端）并设置中文字体"""
+    global Figure, FigureCanvasTkAgg
+    if Figure is None:
+        import matplotlib
+        matplotlib.use('TkAgg')
+        from matplotlib.figure import Figure as _Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg as _FigureCanvasTkAgg
+
+        # 忽略matplotlib字体警告
+        logging.getLogger('matplotlib.font_manager').setLevel(logging.ERROR)
+        matplotlib.rcParams["font.family"] = ["SimHei", "WenQuanYi Micro Hei", "Heiti TC"]
+        matplotlib.rcParams['axes.unicode_minus'] = False
+        Figure, FigureCanvasTkAgg = _Figure, _FigureCanvasTkAgg
+
+
+def load_pil():
+    """按需导入 PIL，未安装时返回 None"""
+    try:
+        from PIL import Image, ImageTk
+    except ImportError:
+        logging.warning("PIL库未安装，桥梁图片功能将不可用")
+        return None
+    return Image, ImageTk
 
 # 常量定义
-MAX_A_COEFFICIENT = 1.8  # 单宽流量集中系数最大值
-SAMPLING_INTERVAL = 0.1  # 水力参数计算采样间隔
 TRIAL_DAYS = 7  # 试用期天数
 REGISTRATION_FILE = "registration.dat"  # 注册信息文件
 REGISTRATION_VALID_DAYS = 365  # 注册有效期（天）
+PREVIEW_DEBOUNCE_MS = 250  # 文本输入停顿多久后刷新预览（毫秒）
+UI_POLL_MS = 100  # 后台计算、导出结果的轮询间隔（毫秒）
+EXPORT_DPI = 300  # 结果图片保存分辨率
+STROKE_MIN_PIXELS = 3  # 手绘笔迹相邻记录点的最小像素间距
+PROJECT_FILETYPES = [("项目文件", "*" + PROJECT_EXTENSION), ("旧版项目文件", "*.dat"), ("所有文件", "*.*")]
+PROJECT_PIPELINE_RESULT = 'pipeline'  # 项目文件中保存流水线阶段结果的名称
+
+# 网络时间源：HTTP 地址读取响应头 Date；NTP 服务器可写主机名或 (主机, 端口)
+TIME_HTTP_ENDPOINTS = (
+    'http://pool.ntp.org',
+    'http://time.nist.gov',
+    'http://time.windows.com',
+    'http://cn.pool.ntp.org'
+)
+TIME_NTP_SERVERS = ('pool.ntp.org', 'time.nist.gov', 'time.windows.com', 'cn.pool.ntp.org')
+NTP_PORT = 123
+TIME_PROBE_TIMEOUT = 5  # 时间探测超时（秒），所有时间源同时查询
+TIME_CACHE_FILE = "network_time.dat"  # 最近一次获取到的网络时间
+TIME_CACHE_GRACE_HOURS = 24  # 无法联网时，缓存时间在本机时钟流逝多久内仍可使用（小时）
+TIME_CACHE_SALT = "BRIDGE_SCOUR_TIME_CACHE"
+
+
+class StrokeBuffer:
+    """手绘笔迹缓冲区
+
+    点保存在按需倍增扩容的 NumPy 数组中；同一笔画内与上一个记录点像素距离小于
+    min_pixels 的拖动事件直接忽略，长笔画的记录和转换开销只与笔画长度有关。
+    """
+
+    def __init__(self, capacity=1024, min_pixels=STROKE_MIN_PIXELS):
+        self._data = np.empty((capacity, 2))
+        self._size = 0
+        self._last_pixel = None
+        self.min_pixels = min_pixels
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def points(self):
+        """已记录的 (x, y) 实际坐标数组"""
+        return self._data[:self._size]
+
+    def append(self, x, y, pixel_x, pixel_y):
+        """记录一个点，与上一点过近时忽略并返回 False"""
+        if self._last_pixel is not None:
+            last_x, last_y = self._last_pixel
+            if math.hypot(pixel_x - last_x, pixel_y - last_y) < self.min_pixels:
+                return False
+
+        if self._size == len(self._data):
+            grown = np.empty((2 * len(self._data), 2))
+            grown[:self._size] = self._data
+            self._data = grown
+
+        self._data[self._size] = (x, y)
+        self._size += 1
+        self._last_pixel = (pixel_x, pixel_y)
+        return True
+
+    def end_stroke(self):
+        """结束当前笔画，下一笔的第一个点总会被记录"""
+        self._last_pixel = None
+
+    def clear(self):
+        self._size = 0
+        self._last_pixel = None
+
+
+def _to_local_naive(dt):
+    """统一为不带时区的本地时间，便于与注册日期比较"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def probe_http_time(url, timeout=TIME_PROBE_TIMEOUT):
+    """从 HTTP 响应头 Date 读取时间"""
+    import urllib.request
+    import urllib.error
+    from email.utils import parsedate_to_datetime
+
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            date_str = response.headers.get('Date')
+    except urllib.error.HTTPError as e:
+        # 错误响应同样带有 Date 头
+        date_str = e.headers.get('Date')
+    return _to_local_naive(parsedate_to_datetime(date_str)) if date_str else None
+
+
+def probe_ntp_time(server, timeout=TIME_PROBE_TIMEOUT):
+    """通过 NTP 协议查询时间，server 为主机名或 (主机, 端口)"""
+    import socket
+
+    address = server if isinstance(server, tuple) else (server, NTP_PORT)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+        client.settimeout(timeout)
+        client.sendto(b'\x1b' + 47 * b'\0', address)
+        data, _ = client.recvfrom(1024)
+    if len(data) < 48:
+        return None
+    t = struct.unpack('!12I', data[:48])[10]
+    t -= 2208988800  # 1900-01-01 00:00:00
+    return datetime.fromtimestamp(t)
+
+
+def fetch_network_time(http_endpoints=TIME_HTTP_ENDPOINTS, ntp_servers=TIME_NTP_SERVERS,
+                       timeout=TIME_PROBE_TIMEOUT):
+    """同时查询所有时间源，返回最先得到的时间；全部失败或超时返回 None
+
+    每个时间源一个后台线程，最长等待约 timeout 秒，不再逐个串行等待。
+    """
+    probes = [(probe_http_time, url) for url in http_endpoints] + \
+             [(probe_ntp_time, server) for server in ntp_servers]
+    results = queue.Queue()
+
+    def run_probe(probe, source):
+        try:
+            results.put(probe(source, timeout))
+        except Exception:
+            results.put(None)
+
+    for probe, source in probes:
+        threading.Thread(target=run_probe, args=(probe, source), daemon=True).start()
+
+    deadline = time.monotonic() + timeout + 1
+    for _ in probes:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            network_time = results.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if network_time is not None:
+            return network_time
+    return None
+
+
+def _time_cache_checksum(network_time, local_time):
+    return hashlib.sha256(f"{network_time}|{local_time}|{TIME_CACHE_SALT}".encode()).hexdigest()
+
+
+def save_time_cache(network_time, path=TIME_CACHE_FILE):
+    """记录获取到的网络时间及当时的本机时间"""
+    network_str = network_time.isoformat()
+    local_str = datetime.now().isoformat()
+    data = {
+        'network_time': network_str,
+        'local_time': local_str,
+        'checksum': _time_cache_checksum(network_str, local_str)
+    }
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    except Exception as e:
+        logging.warning(f"保存网络时间缓存失败: {str(e)}")
+
+
+def load_cached_time(path=TIME_CACHE_FILE, grace=timedelta(hours=TIME_CACHE_GRACE_HOURS)):
+    """读取缓存的网络时间，按本机时钟流逝推算当前时间
+
+    本机时钟自缓存起倒退或前进超过 grace，或缓存被改动时返回 None。
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('checksum') != _time_cache_checksum(data['network_time'], data['local_time']):
+            return None
+        network_time = datetime.fromisoformat(data['network_time'])
+        local_time = datetime.fromisoformat(data['local_time'])
+    except Exception:
+        return None
+
+    elapsed = datetime.now() - local_time
+    if timedelta(0) <= elapsed <= grace:
+        return network_time + elapsed
+    return None
+
+
+def get_verified_time(http_endpoints=TIME_HTTP_ENDPOINTS, ntp_servers=TIME_NTP_SERVERS,
+                      timeout=TIME_PROBE_TIMEOUT, cache_path=TIME_CACHE_FILE):
+    """获取网络时间并写入缓存；无法联网时使用宽限期内的缓存时间"""
+    network_time = fetch_network_time(http_endpoints, ntp_servers, timeout)
+    if network_time is not None:
+        save_time_cache(network_time, cache_path)
+        return network_time
+    return load_cached_time(cache_path)
 
 
 class BridgeScourApp(tk.Tk):
@@ -51,6 +264,19 @@ class BridgeScourApp(tk.Tk):
         
         # 设置窗口关闭协议
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        STARTUP_PROFILER.mark('创建主窗口')
+
+        # 计算流水线，参数修改后只重算受影响的阶段
+        self.pipeline = None
+
+        # 后台计算和图片导出：工作线程只把消息放入 ui_queue，由主线程 after() 轮询处理
+        self.ui_queue = queue.Queue()
+        self.ui_poll_job = None
+        self.calc_thread = None
+        self.calc_cancel = None
+        self.export_queue = queue.Queue()
+        self.export_thread = None
+        self.export_pending = 0
 
         # 创建 Notebook 分页
         self.notebook = ttk.Notebook(self)
@@ -74,6 +300,7 @@ class BridgeScourApp(tk.Tk):
         
         # 初始化自定义绘制界面
         self.init_custom_frame()
+        STARTUP_PROFILER.mark('自定义绘制页')
 
         # ---------- 整体布局多个FRAME -----------
         # 创建主容器，使用grid布局，左侧参数输入，右侧图片展示
@@ -228,6 +455,18 @@ class BridgeScourApp(tk.Tk):
         self.calculate_btn = ttk.Button(self.button_frame, text="执行计算", command=self.run_calculation)
         self.calculate_btn.grid(row=0, column=1, padx=100, pady=2, sticky=tk.W)
 
+        # 取消按钮和计算进度
+        self.cancel_btn = ttk.Button(self.button_frame, text="取消计算", command=self.cancel_calculation,
+                                     state=tk.DISABLED)
+        self.cancel_btn.grid(row=0, column=2, padx=10, pady=2, sticky=tk.W)
+        self.calc_progress = ttk.Progressbar(self.button_frame, mode='determinate', length=200,
+                                             maximum=len(ScourPipeline.STAGES))
+        self.calc_progress.grid(row=1, column=0, padx=100, pady=2, sticky=tk.W)
+        self.calc_status_label = ttk.Label(self.button_frame, text="")
+        self.calc_status_label.grid(row=1, column=1, columnspan=2, padx=100, pady=2, sticky=tk.W)
+
+        STARTUP_PROFILER.mark('参数输入页')
+
         # ---------- 结果显示页布局 ----------
         self.result_text = tk.Text(self.result_frame, wrap=tk.NONE)
         self.result_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -246,11 +485,11 @@ class BridgeScourApp(tk.Tk):
         )
         self.customize_btn.pack(side=tk.LEFT, padx=5)
         
-        # 图形显示区域
-        self.figure = plt.Figure(figsize=(8, 4), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.figure, master=self.plot_frame)
-        self.canvas_widget = self.canvas.get_tk_widget()
-        self.canvas_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # 图形显示区域：切换到图形页或首次绘图时才创建（导入 matplotlib）
+        self.figure = None
+        self.canvas = None
+        self.canvas_widget = None
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
         
         # 存储图形自定义参数
         self.plot_config = {
@@ -273,12 +512,31 @@ class BridgeScourApp(tk.Tk):
         self.elevations = None
         self.file_path = None
         self.project_file_path = None  # 当前项目文件路径
+        self.project_archive = None  # 导入的项目，附带的阶段结果在首次计算或保存时才读取
         
         # 创建菜单栏
         self.create_menu_bar()
+        STARTUP_PROFILER.mark('结果页、图形页与菜单栏')
         
         # 检查注册状态
         self.check_registration_status()
+
+        # 窗口显示后输出启动耗时（仅在设置 BRIDGE_STARTUP_PROFILE 时）
+        self.after_idle(STARTUP_PROFILER.report)
+
+    def ensure_plot_canvas(self):
+        """创建图形页的 matplotlib 画布（只创建一次）"""
+        if self.figure is None:
+            load_matplotlib()
+            self.figure = Figure(figsize=(8, 4), dpi=100)
+            self.canvas = FigureCanvasTkAgg(self.figure, master=self.plot_frame)
+            self.canvas_widget = self.canvas.get_tk_widget()
+            self.canvas_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+    def on_tab_changed(self, event=None):
+        """首次切换到图形页时创建画布"""
+        if self.notebook.select() == str(self.plot_frame):
+            self.ensure_plot_canvas()
     
     def create_bridge_image_panel(self):
         """创建桥梁示意图面板"""
@@ -299,10 +557,13 @@ class BridgeScourApp(tk.Tk):
         # 尝试加载桥梁图片
         self.bridge_image = None
         self.bridge_photo = None
-        self.load_bridge_image(canvas_width, canvas_height)
-        
-        # 绘制图标和标签
-        self.draw_bridge_icons()
+
+        # 图片（需导入 PIL）和图标在窗口显示后再加载
+        def load_bridge_panel():
+            self.load_bridge_image(canvas_width, canvas_height)
+            # 绘制图标和标签
+            self.draw_bridge_icons()
+        self.after_idle(load_bridge_panel)
         
         # 添加说明文字
         info_label = ttk.Label(
@@ -315,7 +576,8 @@ class BridgeScourApp(tk.Tk):
     
     def load_bridge_image(self, canvas_width, canvas_height):
         """加载桥梁图片资源"""
-        if not HAS_PIL:
+        pil = load_pil()
+        if pil is None:
             # 如果没有PIL库，直接显示灰色区域
             self.bridge_canvas.create_rectangle(
                 10, 10, canvas_width - 10, canvas_height - 10,
@@ -341,6 +603,7 @@ class BridgeScourApp(tk.Tk):
             if os.path.exists(img_path):
                 try:
                     # 加载并调整图片大小
+                    Image, ImageTk = pil
                     img = Image.open(img_path)
                     img = img.resize((canvas_width, canvas_height), Image.Resampling.LANCZOS)
                     self.bridge_photo = ImageTk.PhotoImage(img)
@@ -493,9 +756,13 @@ class BridgeScourApp(tk.Tk):
         }
         return inputs
 
-    def set_all_inputs(self, inputs):
-        """设置所有输入框的值"""
-        if 'file_path' in inputs and inputs['file_path']:
+    def set_all_inputs(self, inputs, section=None):
+        """设置所有输入框的值；section 为项目中嵌入的断面数据，给出时不再读取断面文件"""
+        if section is not None:
+            self.distances, self.elevations = section
+            self.file_path = inputs.get('file_path')
+            self.file_path_label.config(text=self.file_path or "项目内嵌断面数据")
+        elif 'file_path' in inputs and inputs['file_path']:
             self.file_path = inputs['file_path']
             self.file_path_label.config(text=self.file_path)
             # 如果文件路径存在，尝试读取断面数据
@@ -586,6 +853,7 @@ class BridgeScourApp(tk.Tk):
         self.file_path_label.config(text="未选择文件")
         self.distances = None
         self.elevations = None
+        self.project_archive = None
         
         # 清空所有Entry控件
         entries = [
@@ -622,8 +890,9 @@ class BridgeScourApp(tk.Tk):
         self.result_text.config(state=tk.DISABLED)
         
         # 清空图形
-        self.figure.clear()
-        self.canvas.draw()
+        if self.figure is not None:
+            self.figure.clear()
+            self.canvas.draw()
 
     def new_project(self):
         """新建项目"""
@@ -632,47 +901,65 @@ class BridgeScourApp(tk.Tk):
         
         # 打开文件保存对话框
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".dat",
-            filetypes=[("数据文件", "*.dat"), ("所有文件", "*.*")],
+            defaultextension=PROJECT_EXTENSION,
+            filetypes=PROJECT_FILETYPES,
             title="新建项目 - 选择保存位置"
         )
         
         if file_path:
             self.project_file_path = file_path
             # 创建一个空的项目文件
-            project_data = self.get_all_inputs()
             try:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(project_data, f, ensure_ascii=False, indent=2)
+                self.write_project_file(file_path)
                 messagebox.showinfo("新建项目", f"项目已创建:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("错误", f"创建项目文件失败: {str(e)}")
 
+    def restore_project_results(self):
+        """把导入项目附带的阶段结果恢复到计算流水线，只在首次需要时从项目文件读取"""
+        project, self.project_archive = self.project_archive, None
+        if project is None or PROJECT_PIPELINE_RESULT not in project.result_names():
+            return
+        if self.pipeline is None:
+            if self.distances is None:
+                return
+            self.pipeline = ScourPipeline((self.distances, self.elevations))
+        self.pipeline.restore_memo(project.result(PROJECT_PIPELINE_RESULT))
+
+    def write_project_file(self, file_path):
+        """把输入参数、断面数据和流水线的阶段结果写入项目文件，重新打开后计算时不必重算未变的阶段"""
+        results = None
+        calculating = self.calc_thread is not None and self.calc_thread.is_alive()
+        if self.distances is not None and not calculating:
+            self.restore_project_results()
+            if self.pipeline is not None:
+                results = {PROJECT_PIPELINE_RESULT: self.pipeline.memo_state()}
+        save_project_archive(file_path, self.get_all_inputs(), self.distances, self.elevations, results)
+
     def load_project(self):
         """导入项目"""
         # 打开文件选择对话框
         file_path = filedialog.askopenfilename(
-            defaultextension=".dat",
-            filetypes=[("数据文件", "*.dat"), ("所有文件", "*.*")],
+            defaultextension=PROJECT_EXTENSION,
+            filetypes=PROJECT_FILETYPES,
             title="导入项目 - 选择项目文件"
         )
         
         if file_path:
             try:
-                # 读取项目文件
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    project_data = json.load(f)
-                
-                # 加载数据到输入框
-                self.set_all_inputs(project_data)
+                # 读取项目文件：新版只读取 manifest 和断面数组，附带的阶段结果在计算或保存时才读取；旧版为 JSON
+                project = ProjectArchive(file_path)
+                section = project.section()
+                self.set_all_inputs(project.inputs, section)
+                self.project_archive = project
                 
                 # 更新项目文件路径
                 self.project_file_path = file_path
                 
                 messagebox.showinfo("导入成功", f"项目已导入:\n{file_path}")
                 
-                # 如果导入了断面文件路径，尝试切换到图形标签页显示
-                if self.file_path and self.distances is not None and self.elevations is not None:
+                # 如果导入了断面数据，尝试切换到图形标签页显示
+                if (self.file_path or section is not None) and self.distances is not None:
                     self.notebook.select(self.plot_frame)
                     self.plot_cross_section(
                         distances=self.distances,
@@ -682,6 +969,8 @@ class BridgeScourApp(tk.Tk):
                 
             except json.JSONDecodeError:
                 messagebox.showerror("导入失败", "项目文件格式错误，无法解析JSON数据")
+            except zipfile.BadZipFile:
+                messagebox.showerror("导入失败", "项目文件已损坏，无法读取")
             except FileNotFoundError:
                 messagebox.showerror("导入失败", "项目文件不存在")
             except Exception as e:
@@ -695,9 +984,7 @@ class BridgeScourApp(tk.Tk):
             return
         
         try:
-            project_data = self.get_all_inputs()
-            with open(self.project_file_path, 'w', encoding='utf-8') as f:
-                json.dump(project_data, f, ensure_ascii=False, indent=2)
+            self.write_project_file(self.project_file_path)
             messagebox.showinfo("保存成功", f"项目已保存至:\n{self.project_file_path}")
         except Exception as e:
             messagebox.showerror("保存失败", f"保存项目失败: {str(e)}")
@@ -712,8 +999,8 @@ class BridgeScourApp(tk.Tk):
             initial_file = os.path.basename(self.project_file_path)
         
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".dat",
-            filetypes=[("数据文件", "*.dat"), ("所有文件", "*.*")],
+            defaultextension=PROJECT_EXTENSION,
+            filetypes=PROJECT_FILETYPES,
             title="另存项目",
             initialdir=initial_dir,
             initialfile=initial_file
@@ -721,9 +1008,7 @@ class BridgeScourApp(tk.Tk):
         
         if file_path:
             try:
-                project_data = self.get_all_inputs()
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(project_data, f, ensure_ascii=False, indent=2)
+                self.write_project_file(file_path)
                 self.project_file_path = file_path
                 messagebox.showinfo("保存成功", f"项目已保存至:\n{file_path}")
             except Exception as e:
@@ -871,329 +1156,12 @@ class BridgeScourApp(tk.Tk):
             return None, None
         
         try:
-            data = np.loadtxt(self.file_path)
-            return data[:, 0], data[:, 1]
+            distances, elevations, _ = load_cross_section(self.file_path, strict=True)
+            return distances, elevations
         except Exception as e:
             messagebox.showerror("数据读取错误", f"无法读取断面数据: {str(e)}")
             return None, None
 
-    def find_waterline_intersections(self, distances, elevations, water_level):
-        # 与原代码逻辑一致，省略重复实现...
-        # 从左向右查找左岸交点
-        left_intersection = None
-        for i in range(len(distances) - 1):
-            if (elevations[i] <= water_level and elevations[i + 1] > water_level) or \
-                    (elevations[i] >= water_level and elevations[i + 1] < water_level):
-                # 线性插值计算交点
-                x = distances[i] + (water_level - elevations[i]) * \
-                    (distances[i + 1] - distances[i]) / (elevations[i + 1] - elevations[i])
-                left_intersection = x
-                break
-
-        # 从右向左查找右岸交点
-        right_intersection = None
-        for i in range(len(distances) - 1, 0, -1):
-            if (elevations[i] <= water_level and elevations[i - 1] > water_level) or \
-                    (elevations[i] >= water_level and elevations[i - 1] < water_level):
-                # 线性插值计算交点
-                x = distances[i] + (water_level - elevations[i]) * \
-                    (distances[i - 1] - distances[i]) / (elevations[i - 1] - elevations[i])
-                right_intersection = x
-                break
-
-        # 返回左右交点
-        if left_intersection is not None and right_intersection is not None:
-            return [left_intersection, right_intersection]
-
-
-    def calculate_hydraulic_parameters(self, distances, elevations, water_level, interval=SAMPLING_INTERVAL):
-        """计算水力参数：平均水深、最大水深、过流面积"""
-        # 找到水位线与断面的交点
-        intersections = self.find_waterline_intersections(distances, elevations, water_level)
-
-        if len(intersections) < 2:
-            return None, None, None, None
-
-        # 确定水流区域
-        left_boundary, right_boundary = intersections
-
-        # 创建均匀间隔的采样点
-        sample_points = np.arange(left_boundary, right_boundary + interval, interval)
-
-        # 计算每个采样点的水深
-        water_depths = []
-        for x in sample_points:
-            # 找到最接近的两个数据点进行线性插值
-            idx = np.searchsorted(distances, x)
-
-            if idx == 0:
-                elevation = elevations[0]
-            elif idx >= len(distances):
-                elevation = elevations[-1]
-            else:
-                # 线性插值计算高程
-                ratio = (x - distances[idx - 1]) / (distances[idx] - distances[idx - 1])
-                elevation = elevations[idx - 1] + ratio * (elevations[idx] - elevations[idx - 1])
-
-            # 计算水深
-            depth = max(0, water_level - elevation)
-            water_depths.append(depth)
-
-        water_depths = np.array(water_depths)
-
-        # 计算水力参数
-        max_depth = np.max(water_depths)
-        avg_depth = np.mean(water_depths)  # 使用平均水深
-
-        # 计算过流面积（使用梯形法则）
-        flow_area = np.trapz(water_depths, sample_points)
-
-        return avg_depth, max_depth, flow_area, intersections
-
-    def identify_channel_and_floodplain(self, distances, elevations, water_level):
-        """识别河槽和河滩的分界点"""
-        # 找到水位线与断面的交点
-        intersections = self.find_waterline_intersections(distances, elevations, water_level)
-
-        if len(intersections) == 2:
-            return intersections[0], intersections[1]  # 直接返回左右交点作为河槽边界
-
-        return None, None
-
-    def parse_bridge_config(self, config_str):
-        """解析桥梁配置字符串，如"3-32"或"1-24+3-32" """
-        spans = []
-        # 使用正则表达式匹配格式如"数字-数字"的片段
-        parts = re.findall(r'(\d+)-(\d+)', config_str)
-
-        for count_str, span_str in parts:
-            count = int(count_str)
-            span = float(span_str)
-            spans.extend([span] * count)
-
-        return spans
-
-    def calculate_bridge_obstruction(self, spans, pier_width, skew_angle, water_level, distances, elevations, bridge_start,
-                                 left_channel_boundary, right_channel_boundary):
-        """计算桥墩阻水面积和阻水比率，同时区分区域"""
-        # 计算水流宽度
-        intersections = self.find_waterline_intersections(distances, elevations, water_level)
-        if len(intersections) < 2:
-            return 0, 0, [], [], [], [], []
-
-        # 计算桥墩位置（桥墩中心坐标）
-        pier_positions = []
-
-        # 起始桥墩位置（根据输入的起始距离调整）
-        current_position = bridge_start
-        pier_positions.append(current_position)
-
-        # 计算后续桥墩位置（考虑斜交角度）
-        for span in spans:
-            # 计算斜交角度下的投影距离
-            projected_span = span * math.cos(math.radians(skew_angle))
-            current_position += projected_span
-            pier_positions.append(current_position)
-
-        # 计算桥墩实际阻水宽度（考虑斜交角度）
-        effective_pier_width = pier_width
-        # effective_pier_width = pier_width * math.cos(math.radians(skew_angle))
-        # 计算每个桥墩的阻水面积并累加
-        total_obstruction_area = 0
-        left_obstruction_area = 0
-        channel_obstruction_area = 0
-        right_obstruction_area = 0
-
-        left_obstruction_width = 0
-        channel_obstruction_width = 0
-        right_obstruction_width = 0
-
-        pier_obstructions = []
-
-        for pier_pos in pier_positions:
-            # 计算桥墩在断面上的水平投影距离
-            projected_pos = pier_pos
-
-            # 找到投影位置在断面数据中的索引
-            if projected_pos < distances[0] or projected_pos > distances[-1]:
-                continue  # 桥墩位置超出断面范围
-
-            # 找到最接近的两个点进行插值
-            idx = np.searchsorted(distances, projected_pos)
-            if idx == 0:
-                depth = water_level - elevations[0]
-            elif idx >= len(distances):
-                depth = water_level - elevations[-1]
-            else:
-                # 线性插值计算水深
-                ratio = (projected_pos - distances[idx - 1]) / (distances[idx] - distances[idx - 1])
-                elevation = elevations[idx - 1] + ratio * (elevations[idx] - elevations[idx - 1])
-                depth = water_level - elevation
-
-            # 确保水深为正
-            depth = max(0, depth)
-
-            # 计算单个桥墩的阻水面积
-            pier_area = effective_pier_width * depth
-            total_obstruction_area += pier_area
-
-            # 确定桥墩所在区域
-            if projected_pos < left_channel_boundary:
-                # 左河滩
-                left_obstruction_area += pier_area
-                left_obstruction_width += effective_pier_width
-            elif projected_pos > right_channel_boundary:
-                # 右河滩
-                right_obstruction_area += pier_area
-                right_obstruction_width += effective_pier_width
-            else:
-                # 河槽
-                channel_obstruction_area += pier_area
-                channel_obstruction_width += effective_pier_width
-
-            # 记录每个桥墩的信息
-            pier_obstructions.append({
-                'position': projected_pos,
-                'depth': depth,
-                'area': pier_area,
-                'region': '左河滩' if projected_pos < left_channel_boundary else
-                '右河滩' if projected_pos > right_channel_boundary else '河槽'
-            })
-
-        # 计算水力参数
-        _, _, flow_area, _ = self.calculate_hydraulic_parameters(distances, elevations, water_level)
-
-        # 计算阻水比率
-        obstruction_ratio = total_obstruction_area / flow_area if flow_area > 0 else 0
-
-        return (total_obstruction_area, obstruction_ratio, pier_obstructions,
-                left_obstruction_area, channel_obstruction_area, right_obstruction_area,
-                left_obstruction_width, channel_obstruction_width, right_obstruction_width)
-
-    def calculate_flow(self, area, width, n, J):
-        """计算流量"""
-        if width <= 0:
-            return 0, 0, 0  # 流量, 流速, 水力半径
-
-        # 计算平均水深
-        avg_depth = area / width
-
-        # 计算水力半径 (假设宽浅河道，R ≈ 水深)
-        hydraulic_radius = avg_depth
-
-        # 计算谢才系数 (曼宁公式)
-        C = (hydraulic_radius ** (1 / 6)) / n
-
-        # 计算流速 (谢才公式)
-        velocity = C * math.sqrt(J * hydraulic_radius)
-
-        # 计算流量
-        discharge = area * velocity
-
-        return discharge, velocity, hydraulic_radius
-
-    # def calculate_scour(self, channel_Q, B, H, Lcj, h_max, h_c, mu, E, d):
-    #     """计算桥梁一般冲刷深度64-1"""
-    #     # 计算单宽流量集中系数 A
-    #     A = (math.sqrt(B) / H) ** 0.15
-
-    #     # 限制 A 不超过最大值
-    #     A = min(A, MAX_A_COEFFICIENT)
-
-    #     # 计算冲刷深度
-    #     scour_depth = (A * channel_Q / (mu * Lcj * E * d ** (1 / 6))) ** (3 / 5) * (h_max / h_c)
-
-    #     return scour_depth, A
-
-    def calculate_scour(self, channel_Q, B, H, Lcj, h_max, h_c, mu, E, d):
-        """
-        计算桥梁一般冲刷深度（64-1修正式，匹配图片8.3.1-4式）
-        """
-    # 1. 计算单宽流量集中系数 A_d（对应图片的A_d）
-        A_d = (math.sqrt(B) / H) ** 0.15
-    # 限制A_d不超过最大值
-        A_d = min(A_d, MAX_A_COEFFICIENT)
-    # 2. 计算图片中分子的核心项：(h_cm / h_cq)^(5/3)
-        h_ratio = (h_max / h_c) ** (5 / 3)  # 对应图片的(h_cm/h_cq)^(5/3)
-
-    # 3. 严格匹配图片公式结构
-        numerator = A_d * (channel_Q / (mu * Lcj)) * h_ratio  # 分子部分
-        denominator = E * (d ** (1 / 6))  # 分母部分
-        scour_depth = (numerator / denominator) ** (3 / 5)  # 整体3/5次方
-        return scour_depth, A_d
-
-    # def calculate_scour_64_2(self, Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z):
-    #     """
-    #     根据64-2计算公式计算桥梁一般冲刷后的最大水深
-    #     """
-    #     # 计算Ad
-    #     A_d = (math.sqrt(B_z) / H_z) ** 0.15
-    #     if A_d > MAX_A_COEFFICIENT:
-    #         A_d = MAX_A_COEFFICIENT
-    #     # 计算hp
-    #     h_p = 1.04 * (A_d * (Q_2 / Q_c) ** 0.90 * (B_c / ((1 - lambda_) * mu * B_2)) ** 0.66 * h_cm)
-    #     return h_p, A_d
-
-    def calculate_scour_64_2(self, Q_2, Q_c, B_c, B_2, lambda_, mu, h_cm, B_z, H_z):
-        """
-        根据64-2计算公式计算桥梁一般冲刷后的最大水深（匹配图片公式）
-        注：入参中B_2实际对应图片的B_eg（桥长范围内河槽宽度）
-        """
-        # 计算Ad（匹配图片8.3.1-3式）
-        A_d = (math.sqrt(B_z) / H_z) ** 0.15
-        if A_d > MAX_A_COEFFICIENT:
-            A_d = MAX_A_COEFFICIENT
-        
-        # 修正：按图片公式，分母是(1-lambda_) * mu * B_2（B_2对应图片B_eg）
-        term1 = (A_d * (Q_2 / Q_c)) ** 0.90  # 对应公式中(A_d·Q2/Qc)^0.90
-        term2 = (B_c / ((1 - lambda_) * mu * B_2)) ** 0.66  # 对应公式中(Bc/((1-λ)μBcg))^0.66
-        
-        # 严格匹配图片公式（保留1.04系数）
-        h_p = 1.04 * term1 * term2 * h_cm
-        
-        return h_p, A_d
-
-
-
-    def calculate_local_scour(self, V, K_t, d, B_1, h_p):
-        """
-        根据65-2计算公式计算桥墩局部冲刷深度
-        """
-        # 计算V_0
-        V_0 = 0.28 * (d + 0.7) ** 0.5
-        # 计算V_0_prime
-        V_0_prime = 0.12 * (d + 0.5) ** 0.55
-        # 计算K_η2
-        K_η2 = (0.0023 / (d ** 2.2)) + 0.375 * d ** 0.24
-        # 计算n2
-        n2 = (V_0 / V) ** (0.23 + 0.19 * math.log10(d))
-        if V <= V_0:
-            h_b = K_t * K_η2 * B_1 ** 0.6 * h_p ** 0.15 * ((V - V_0_prime) / V_0)
-        else:
-            h_b = K_t * K_η2 * B_1 ** 0.6 * h_p ** 0.15 * ((V - V_0_prime) / V_0) ** n2
-        return h_b
-
-    def calculate_local_scour_65_1(self, V, K_t, d, B_1, h_p):
-        """
-        根据65-1计算公式计算桥墩局部冲刷深度
-        """
-        # 计算V_0
-        V_0 = 0.0246 * (h_p / d) ** 0.14 * math.sqrt(332 * d + (10 + h_p) / (d ** 0.72))
-        # 计算K_η1
-        K_η1 = 0.8 * (1 / (d ** 0.45) + 1 / (d ** 0.15))
-        # 计算V_0_prime
-        V_0_prime = 0.462 * (d / B_1) ** 0.06 * V_0
-        # 计算n1
-        n1 = (V_0 / V) ** (0.25 * d ** 0.19)
-
-        if V <= V_0:
-            h_b = K_t * K_η1 * B_1 ** 0.6 * (V - V_0_prime)
-        else:
-            h_b = K_t * K_η1 * B_1 ** 0.6 * (V_0 - V_0_prime) * ((V - V_0_prime) / (V_0 - V_0_prime)) ** n1
-
-        return h_b
-
-
     def update_result_display(self, text):
         """更新结果显示区域"""
         self.result_text.config(state=tk.NORMAL)
@@ -1266,76 +1234,6 @@ class BridgeScourApp(tk.Tk):
             'choice_h_p': self.choice_h_p_entry.get()
         }
 
-    def calculate_flow_areas(self, design_water_level, boundary1, boundary2):
-        """计算设计水位下各区域的过水面积"""
-        intersections = self.find_waterline_intersections(
-            self.distances, self.elevations, design_water_level)
-        
-        if len(intersections) < 2:
-            return None, None, None
-        
-        start_idx = np.argmin(np.abs(self.distances - intersections[0]))
-        end_idx = np.argmin(np.abs(self.distances - intersections[1]))
-        
-        # 计算水深
-        water_depths = design_water_level - self.elevations[start_idx:end_idx + 1]
-        water_depths = np.maximum(water_depths, 0)
-        
-        # 创建区域掩码
-        distances_slice = self.distances[start_idx:end_idx + 1]
-        channel_mask = (distances_slice >= boundary1) & (distances_slice <= boundary2)
-        left_floodplain_mask = (distances_slice < boundary1)
-        right_floodplain_mask = (distances_slice > boundary2)
-        
-        # 计算各区域面积
-        channel_area = np.trapz(water_depths[channel_mask], distances_slice[channel_mask])
-        left_floodplain_area = np.trapz(
-            water_depths[left_floodplain_mask], distances_slice[left_floodplain_mask])
-        right_floodplain_area = np.trapz(
-            water_depths[right_floodplain_mask], distances_slice[right_floodplain_mask])
-        
-        return left_floodplain_area, channel_area, right_floodplain_area
-
-    def calculate_flow_distribution(self, params, left_area, channel_area, right_area,
-                                   left_area_after, channel_area_after, right_area_after,
-                                   left_width_after, channel_width_after, right_width_after,
-                                   left_width_before, channel_width_before, right_width_before,
-                                   intersections, boundary1, boundary2):
-        """计算流量分布"""
-        # 计算各区域阻水后的流量
-        left_Q, _, _ = self.calculate_flow(
-            left_area_after, left_width_after, params['n_l'], params['J'])
-        channel_Q, _, _ = self.calculate_flow(
-            channel_area_after, channel_width_after, params['n_c'], params['J'])
-        right_Q, _, _ = self.calculate_flow(
-            right_area_after, right_width_after, params['n_r'], params['J'])
-        
-        # 计算各区域天然流量
-        left_Q_before = self.calculate_flow(
-            left_area, left_width_before, params['n_l'], params['J'])[0]
-        channel_Q_before = self.calculate_flow(
-            channel_area, channel_width_before, params['n_c'], params['J'])[0]
-        right_Q_before = self.calculate_flow(
-            right_area, right_width_before, params['n_r'], params['J'])[0]
-        
-        total_Q = left_Q + channel_Q + right_Q
-        total_Q_before = left_Q_before + channel_Q_before + right_Q_before
-        
-        # 按设计流量分配
-        channel_Q_final = channel_Q * params['Design_Q'] / total_Q if total_Q > 0 else 0
-        left_Q_final = left_Q * params['Design_Q'] / total_Q if total_Q > 0 else 0
-        right_Q_final = right_Q * params['Design_Q'] / total_Q if total_Q > 0 else 0
-        
-        Q_c = channel_Q_before * params['Design_Q'] / total_Q_before if total_Q_before > 0 else 0
-        
-        return {
-            'channel_Q_final': channel_Q_final,
-            'left_Q_final': left_Q_final,
-            'right_Q_final': right_Q_final,
-            'Q_c': Q_c,
-            'total_Q': total_Q
-        }
-
     def format_results(self, params, obstruction_results, flow_areas, flow_distribution,
                       scour_results, local_scour_results):
         """格式化计算结果输出"""
@@ -1417,6 +1315,7 @@ class BridgeScourApp(tk.Tk):
             save_path: 可选，保存图片的路径。如果为None则不保存
             use_config: 是否使用自定义配置
         """
+        self.ensure_plot_canvas()
         # 保存绘图数据用于重新绘制
         self.current_plot_data = {
             'distances': distances,
@@ -1426,110 +1325,17 @@ class BridgeScourApp(tk.Tk):
             'channel_boundaries': channel_boundaries,
             'pier_obstructions': pier_obstructions
         }
+        figure = self.figure
+        output_dpi = EXPORT_DPI if save_path else None
         
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.plot(distances, elevations, 'k-', linewidth=2, label='河道断面')
-        ax.fill_between(distances, elevations, np.min(elevations) - 1, color='lightgray', alpha=0.5)
-
-        # 绘制平滩水位线
-        if water_level is not None:
-            ax.axhline(y=water_level, color='b', linestyle='--', linewidth=1.5, label='平滩水位')
-
-            # 填充平滩水位以下的区域
-            intersections = self.find_waterline_intersections(distances, elevations, water_level)
-            if len(intersections) >= 2:
-                start_idx = np.argmin(np.abs(distances - intersections[0]))
-                end_idx = np.argmin(np.abs(distances - intersections[1]))
-
-                # 绘制平滩水位下的水流区域
-                x = np.concatenate([[distances[start_idx]], distances[start_idx:end_idx + 1], [distances[end_idx]]])
-                y = np.concatenate([[water_level], elevations[start_idx:end_idx + 1], [water_level]])
-                ax.fill(x, y, 'b', alpha=0.3)
-
-        # 绘制设计水位线
-        if design_water_level is not None:
-            ax.axhline(y=design_water_level, color='r', linestyle='-', linewidth=1.5, label='设计水位')
-
-            # 填充设计水位以下的区域
-            intersections = self.find_waterline_intersections(distances, elevations, design_water_level)
-            if len(intersections) >= 2:
-                start_idx = np.argmin(np.abs(distances - intersections[0]))
-                end_idx = np.argmin(np.abs(distances - intersections[1]))
-
-                # 绘制设计水位下的水流区域
-                x = np.concatenate([[distances[start_idx]], distances[start_idx:end_idx + 1], [distances[end_idx]]])
-                y = np.concatenate([[design_water_level], elevations[start_idx:end_idx + 1], [design_water_level]])
-                ax.fill(x, y, 'r', alpha=0.2)
-
-        # 标记河槽和河滩的分界点
-        if channel_boundaries is not None and len(channel_boundaries) == 2:
-            ax.axvline(x=channel_boundaries[0], color='g', linestyle='-.', linewidth=1.5, label='河槽左边界')
-            ax.axvline(x=channel_boundaries[1], color='g', linestyle='-.', linewidth=1.5, label='河槽右边界')
-
-        # 标记桥墩位置和阻水区域
-        if pier_obstructions and len(pier_obstructions) > 0:
-            for i, pier in enumerate(pier_obstructions):
-                pier_pos = pier['position']
-                depth = pier['depth']
-                area = pier['area']
-                region = pier['region']
-
-                # 根据区域设置不同颜色
-                color = 'purple' if region == '河槽' else 'blue' if region == '左河滩' else 'red'
-
-                # 标记桥墩位置
-                ax.axvline(x=pier_pos, color=color, linestyle='--', linewidth=1,
-                           label=f'桥墩 {i + 1} ({region})' if i == 0 else None)
-
-                # 标记桥墩高度
-                ax.plot([pier_pos, pier_pos], [design_water_level - depth, design_water_level],
-                        color, marker='o', markersize=4)
-
-                # 添加桥墩信息文本
-                ax.text(pier_pos, design_water_level + 0.5,
-                        f'墩{i + 1}: {depth:.1f}m',
-                        horizontalalignment='center',
-                        rotation=90,  # 添加旋转参数
-                        color=color)
-
-        # 使用自定义配置或默认值
-        if use_config and self.plot_config:
-            plot_title = title if title else self.plot_config['title']
-            xlabel = self.plot_config['xlabel']
-            ylabel = self.plot_config['ylabel']
-        else:
-            plot_title = title if title else '河道横断面图'
-            xlabel = '距离 (m)'
-            ylabel = '高程 (m)'
-        
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.set_title(plot_title)
-        
-        # 设置坐标轴范围
-        if use_config and self.plot_config:
-            if self.plot_config['xmin'] is not None:
-                ax.set_xlim(left=self.plot_config['xmin'])
-            if self.plot_config['xmax'] is not None:
-                ax.set_xlim(right=self.plot_config['xmax'])
-            if self.plot_config['ymin'] is not None:
-                ax.set_ylim(bottom=self.plot_config['ymin'])
-            if self.plot_config['ymax'] is not None:
-                ax.set_ylim(top=self.plot_config['ymax'])
-        
-        # 设置网格
-        grid_alpha = self.plot_config.get('grid_alpha', 1.0) if use_config else 1.0
-        grid_style = self.plot_config.get('grid_style', '-') if use_config else '-'
-        ax.grid(True, alpha=grid_alpha, linestyle=grid_style)
-        
-        ax.legend()
-        self.figure.tight_layout()
+        config = self.plot_config if use_config else None
+        draw_cross_section(figure, distances, elevations, water_level, design_water_level,
+                           channel_boundaries, pier_obstructions, title, config, output_dpi)
 
         # 保存图片（如果指定了保存路径）
         if save_path:
             try:
-                self.figure.savefig(save_path, dpi=300, bbox_inches='tight')
+                figure.savefig(save_path, dpi=EXPORT_DPI, bbox_inches='tight')
             except Exception as e:
                 logging.warning(f"保存图片失败: {str(e)}")
 
@@ -1669,6 +1475,10 @@ class BridgeScourApp(tk.Tk):
             )
 
     def run_calculation(self):
+        """校验输入后在后台线程执行计算，结果通过 after() 回到主线程显示"""
+        if self.calc_thread is not None and self.calc_thread.is_alive():
+            return
+
         try:
             # 清空之前的结果
             self.result_text.config(state=tk.NORMAL)
@@ -1685,168 +1495,130 @@ class BridgeScourApp(tk.Tk):
             self.distances, self.elevations = self.read_cross_section()
             if self.distances is None:
                 return
+            self.restore_project_results()
+        except ValueError as e:
+            messagebox.showerror("输入错误", str(e))
+            self.update_result_display(f"计算失败: {str(e)}\n")
+            return
+        except Exception as e:
+            messagebox.showerror("计算错误", f"发生错误: {str(e)}")
+            self.update_result_display(f"计算失败: {str(e)}\n")
+            return
 
-            # 计算平滩水位下的水力参数
-            avg_depth, max_depth, _, _ = self.calculate_hydraulic_parameters(
-                self.distances, self.elevations, params['water_level'])
-            
-            if avg_depth is None:
-                raise ValueError("平滩水位设置不合理，无法计算水力参数")
-
-            # 识别河槽和河滩的分界点
-            boundary1, boundary2 = self.identify_channel_and_floodplain(
-                self.distances, self.elevations, params['water_level'])
-            
-            if boundary1 is None or boundary2 is None:
-                raise ValueError("无法识别河槽和河滩的分界点")
-
-            # 计算设计水位下的参数
-            avg_depth_design, max_depth_design, flow_area, _ = self.calculate_hydraulic_parameters(
-                self.distances, self.elevations, params['design_water_level'])
-            
-            if avg_depth_design is None:
-                raise ValueError("设计水位设置不合理，无法计算水力参数")
-
-            # 计算各区域过水面积
-            left_area, channel_area, right_area = self.calculate_flow_areas(
-                params['design_water_level'], boundary1, boundary2)
-            
-            if left_area is None:
-                raise ValueError("无法计算各区域过水面积")
-
-
-
+        self.calc_cancel = threading.Event()
+        self.set_calculation_running(True)
+        self.calc_thread = threading.Thread(
+            target=self.calculation_worker,
+            args=(params, self.distances, self.elevations, self.calc_cancel),
+            daemon=True)
+        self.calc_thread.start()
+        self.start_ui_polling()
+
+    def calculation_worker(self, params, distances, elevations, cancel_event):
+        """后台线程：执行计算，进度和结果放入 ui_queue，不直接操作界面"""
+        try:
+            # 各中间量只计算一次，未变化的阶段直接复用上次结果
+            if self.pipeline is None:
+                self.pipeline = ScourPipeline((distances, elevations))
+            else:
+                self.pipeline.set_section((distances, elevations))
+            result = self.pipeline.run(
+                params,
+                progress=lambda name, index, total: self.ui_queue.put(('progress', (name, index, total))),
+                cancel_event=cancel_event)
+            self.ui_queue.put(('done', (params, result)))
+        except CalculationCancelled:
+            self.ui_queue.put(('cancelled', None))
+        except Exception as e:
+            self.ui_queue.put(('error', e))
 
+    def cancel_calculation(self):
+        """请求取消正在进行的计算
 
-            # 解析桥梁配置
-            spans = self.parse_bridge_config(params['bridge_config'])
-            if not spans:
-                raise ValueError("桥梁配置解析失败，请检查格式")
+        取消在下一计算阶段开始前生效，正在执行的阶段（如大断面的水力参数计算）会先执行完。
+        """
+        if self.calc_cancel is not None:
+            self.calc_cancel.set()
+            self.calc_status_label.config(text="正在取消...")
+
+    def set_calculation_running(self, running):
+        """切换计算按钮、取消按钮和进度条状态"""
+        self.calculate_btn.config(state=tk.DISABLED if running else tk.NORMAL)
+        self.cancel_btn.config(state=tk.NORMAL if running else tk.DISABLED)
+        if running:
+            self.calc_progress['value'] = 0
+            self.calc_status_label.config(text="正在计算...")
+
+    def start_ui_polling(self):
+        """开始轮询后台消息（已在轮询时不重复启动）"""
+        if self.ui_poll_job is None:
+            self.ui_poll_job = self.after(UI_POLL_MS, self.poll_ui_queue)
+
+    def poll_ui_queue(self):
+        """在主线程处理后台线程发来的进度、结果和导出消息"""
+        self.ui_poll_job = None
+        while True:
+            try:
+                kind, payload = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
 
-            # 计算桥墩阻水面积
-            intersections = self.find_waterline_intersections(
-                self.distances, self.elevations, params['design_water_level'])
-            
-            obstruction_results = self.calculate_bridge_obstruction(
-                spans, params['pier_width'], params['skew_angle'], 
-                params['design_water_level'], self.distances, self.elevations, 
-                params['bridge_start'], boundary1, boundary2)
-
-            (total_obstruction_area, obstruction_ratio, pier_obstructions,
-             left_obstruction_area, channel_obstruction_area, right_obstruction_area,
-             left_obstruction_width, channel_obstruction_width, right_obstruction_width) = obstruction_results
-
-            # 计算各区域阻水后的过流面积和宽度
-            left_area_after = left_area - left_obstruction_area
-            right_area_after = right_area - right_obstruction_area
-            channel_area_after = channel_area - channel_obstruction_area
-
-            left_width_after = (boundary1 - intersections[0]) - left_obstruction_width
-            right_width_after = (intersections[1] - boundary2) - right_obstruction_width
-            channel_width_after = (boundary2 - boundary1) - channel_obstruction_width
-
-            left_width_before = (boundary1 - intersections[0])
-            channel_width_before = (boundary2 - boundary1)
-            right_width_before = (intersections[1] - boundary2)
-
-            # 计算各区域平均水深
-            left_depth_after = left_area_after / left_width_after if left_width_after > 0 else 0
-            right_depth_after = right_area_after / right_width_after if right_width_after > 0 else 0
-            channel_depth_after = channel_area_after / channel_width_after if channel_width_after > 0 else 0
-
-            # 计算流量分布
-            flow_distribution = self.calculate_flow_distribution(
-                params, left_area, channel_area, right_area,
-                left_area_after, channel_area_after, right_area_after,
-                left_width_after, channel_width_after, right_width_after,
-                left_width_before, channel_width_before, right_width_before,
-                intersections, boundary1, boundary2)
-
-            # 计算冲刷深度参数
-            B = boundary2 - boundary1  # 平滩水位时的水面宽
-            H = avg_depth  # 平滩水位时的平均水深
-            Lcj = channel_width_after  # 河槽阻水后的过流宽度
-            h_max = max_depth_design  # 设计水位下的最大水深
-            h_c = channel_depth_after  # 河槽部分的平均水深
-            B_c = B
-            B_2 = channel_width_after
-
-            # 计算一般冲刷深度
-            scour_depth_64_1, A = self.calculate_scour(
-                flow_distribution['channel_Q_final'], B_c, H, Lcj, h_max, h_c, 
-                params['mu'], params['E'], params['d'])
-            
-            scour_depth_64_2, A_2 = self.calculate_scour_64_2(
-                flow_distribution['channel_Q_final'], flow_distribution['Q_c'], 
-                B_c, B_2, obstruction_ratio, params['mu'], h_max, B, H)
+            if kind == 'progress':
+                name, index, total = payload
+                self.calc_progress['value'] = index
+                self.calc_status_label.config(
+                    text=f"正在计算：{ScourPipeline.STAGE_LABELS[name]} ({index + 1}/{total})")
+            elif kind == 'done':
+                self.set_calculation_running(False)
+                self.calc_progress['value'] = len(ScourPipeline.STAGES)
+                self.calc_status_label.config(text="计算完成")
+                self.finish_calculation(*payload)
+            elif kind == 'cancelled':
+                self.set_calculation_running(False)
+                self.calc_status_label.config(text="计算已取消")
+                self.update_result_display("计算已取消\n")
+            elif kind == 'error':
+                self.set_calculation_running(False)
+                self.calc_status_label.config(text="计算失败")
+                if isinstance(payload, ValueError):
+                    messagebox.showerror("输入错误", str(payload))
+                else:
+                    messagebox.showerror("计算错误", f"发生错误: {str(payload)}")
+                self.update_result_display(f"计算失败: {str(payload)}\n")
+            elif kind == 'export':
+                image_path, error = payload
+                self.export_pending -= 1
+                if error is None:
+                    self.update_result_display(f"\n\n图片已保存至: {image_path}\n")
+                else:
+                    self.update_result_display(f"\n\n图片保存失败: {str(error)}\n")
 
-            # 确定一般冲刷深度
-            if params['choice_h_p'].lower() in ('y', 'yes', ''):
-                h_p = max(scour_depth_64_1, scour_depth_64_2)
-            else:
-                try:
-                    h_p = float(params['choice_h_p'])
-                except ValueError:
-                    raise ValueError(
-                        f"输入错误: '{params['choice_h_p']}' 无法转换为浮点数。"
-                        "请输入 'y' 自动选择最大值，或输入具体数值。")
-
-            # 计算局部冲刷深度
-            local_scour_65_2 = self.calculate_local_scour(
-                params['V'], params['K_t'], params['d'], params['B_1'], h_p)
-            local_scour_65_1 = self.calculate_local_scour_65_1(
-                params['V'], params['K_t'], params['d'], params['B_1'], h_p)
-
-            # 准备结果数据
-            flow_areas = (
-                left_area, channel_area, right_area,
-                left_area_after, channel_area_after, right_area_after,
-                left_width_after, channel_width_after, right_width_after,
-                left_depth_after, channel_depth_after, right_depth_after
-            )
-            
-            scour_results = {
-                'A': A,
-                'B': B,
-                'H': H,
-                'Lcj': Lcj,
-                'h_max': h_max,
-                'h_c': h_c,
-                'scour_depth_64_1': scour_depth_64_1,
-                'scour_depth_64_2': scour_depth_64_2
-            }
-            
-            local_scour_results = {
-                'local_scour_65_1': local_scour_65_1,
-                'local_scour_65_2': local_scour_65_2
-            }
+        calculating = self.calc_thread is not None and self.calc_thread.is_alive()
+        if calculating or self.export_pending > 0 or not self.ui_queue.empty():
+            self.start_ui_polling()
 
+    def finish_calculation(self, params, result):
+        """主线程：显示计算结果、绘图，并把图片保存交给导出队列"""
+        try:
             # 格式化并显示结果
             result_text = self.format_results(
-                params, obstruction_results, flow_areas, flow_distribution,
-                scour_results, local_scour_results)
+                params, result.obstruction_results, result.flow_areas, result.flow_distribution,
+                result.scour_results, result.local_scour_results)
             self.update_result_display(result_text)
 
             # 绘制最终图形
-            self.plot_cross_section(
-                self.distances, self.elevations, 
-                params['water_level'], params['design_water_level'],
-                [boundary1, boundary2], pier_obstructions, 
+            plot_args = dict(
+                distances=self.distances, elevations=self.elevations,
+                water_level=params['water_level'], design_water_level=params['design_water_level'],
+                channel_boundaries=[result.boundary1, result.boundary2],
+                pier_obstructions=result.pier_obstructions,
                 title="河道横断面分析")
+            self.plot_cross_section(**plot_args)
             
-            # 保存计算结果图片
+            # 后台保存计算结果图片
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             image_filename = f"桥梁冲刷计算结果_{timestamp}.png"
-            image_path = os.path.join(os.getcwd(), image_filename)
-            
-            try:
-                self.figure.savefig(image_path, dpi=300, bbox_inches='tight')
-                # 在结果中显示保存信息
-                save_info = f"\n\n图片已保存至: {image_path}\n"
-                self.update_result_display(save_info)
-            except Exception as e:
-                error_msg = f"\n\n图片保存失败: {str(e)}\n"
-                self.update_result_display(error_msg)
+            self.queue_figure_export(os.path.join(os.getcwd(), image_filename), plot_args)
             
             # 切换到计算结果标签页
             self.notebook.select(self.result_frame)
@@ -1854,15 +1626,36 @@ class BridgeScourApp(tk.Tk):
             # 弹出计算完成提示
             messagebox.showinfo("计算完成", "计算已完成！\n结果已显示在'计算结果'标签页中。")
 
-        except ValueError as e:
-            messagebox.showerror("输入错误", str(e))
-            self.update_result_display(f"计算失败: {str(e)}\n")
         except Exception as e:
             messagebox.showerror("计算错误", f"发生错误: {str(e)}")
             self.update_result_display(f"计算失败: {str(e)}\n")
+
+    def queue_figure_export(self, image_path, plot_args):
+        """把图片保存任务放入导出队列，由导出线程在独立 Figure 上绘制并保存"""
+        if self.export_thread is None:
+            self.export_thread = threading.Thread(target=self.export_worker, daemon=True)
+            self.export_thread.start()
+        self.export_pending += 1
+        # 绘图配置在主线程复制一份，导出线程只使用快照，不读取界面状态
+        self.export_queue.put((image_path, plot_args, dict(self.plot_config), self.figure.get_size_inches()))
+        self.start_ui_polling()
+
+    def export_worker(self):
+        """导出线程：依次处理导出队列，结果放入 ui_queue；只调用纯绘图函数，不访问界面对象"""
+        while True:
+            image_path, plot_args, config, size = self.export_queue.get()
+            try:
+                figure = Figure(figsize=size)
+                draw_cross_section(figure, config=config, dpi=EXPORT_DPI, **plot_args)
+                figure.savefig(image_path, dpi=EXPORT_DPI, bbox_inches='tight')
+                self.ui_queue.put(('export', (image_path, None)))
+            except Exception as e:
+                self.ui_queue.put(('export', (image_path, e)))
     
     def on_closing(self):
         """窗口关闭事件处理"""
+        if self.calc_cancel is not None:
+            self.calc_cancel.set()
         self.destroy()
     
     def open_custom_frame(self):
@@ -1939,6 +1732,7 @@ class BridgeScourApp(tk.Tk):
         )
         self.text_input.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar_y.config(command=self.on_text_yscroll)
+        self.track_text_edits()
         
         # 绑定文本变化事件，实时更新序号和绘图
         self.text_input.bind('<KeyRelease>', self.on_text_change)
@@ -1968,11 +1762,18 @@ class BridgeScourApp(tk.Tk):
         self.preview_canvas.pack(fill=tk.BOTH, expand=True)
         
         # 绑定画布大小改变事件
-        self.preview_canvas.bind("<Configure>", lambda e: self.update_preview_plot())
+        self.preview_canvas.bind("<Configure>", lambda e: self.schedule_preview_update())
         
         # 存储临时数据用于预览
         self.temp_distances = None
         self.temp_elevations = None
+
+        # 增量解析缓存：逐行解析结果（无效行为 NaN），行数与输入框一致；
+        # preview_dirty 为上次预览后被修改的行号范围 (首行, 末行)（从 1 开始，按当前文本计），None 表示无修改
+        self.preview_values = np.full((1, 2), np.nan)
+        self.preview_dirty = None
+        self.preview_job = None
+        self.line_number_count = 0
     
     def init_canvas_input(self):
         """初始化画布绘制界面"""
@@ -2032,7 +1833,7 @@ class BridgeScourApp(tk.Tk):
         self.draw_canvas.after(100, self.draw_canvas_axes)
         
         # 画布数据
-        self.canvas_points = []
+        self.canvas_points = StrokeBuffer()
         self.canvas_x_range = (0, 100)
         self.canvas_y_range = (0, 100)
         self.canvas_spacing = 1.0
@@ -2067,7 +1868,7 @@ class BridgeScourApp(tk.Tk):
             
             # 清空画布并重新绘制
             self.draw_canvas.delete("all")
-            self.canvas_points = []
+            self.canvas_points.clear()
             
             # 绘制坐标轴
             self.draw_canvas.after(50, self.draw_canvas_axes)
@@ -2157,18 +1958,19 @@ class BridgeScourApp(tk.Tk):
             x_real = self.canvas_x_range[0] + (x_plot / plot_width) * (self.canvas_x_range[1] - self.canvas_x_range[0])
             y_real = self.canvas_y_range[0] + (y_plot / plot_height) * (self.canvas_y_range[1] - self.canvas_y_range[0])
             
-            self.canvas_points.append((x_real, y_real))
-            
-            # 绘制点
-            self.draw_canvas.create_oval(
-                event.x - 2, event.y - 2,
-                event.x + 2, event.y + 2,
-                fill='blue', outline='blue'
-            )
+            # 与上一记录点过近的拖动事件不记录、不绘制
+            if self.canvas_points.append(x_real, y_real, event.x, event.y):
+                # 绘制点
+                self.draw_canvas.create_oval(
+                    event.x - 2, event.y - 2,
+                    event.x + 2, event.y + 2,
+                    fill='blue', outline='blue'
+                )
     
     def on_canvas_release(self, event):
         """画布释放事件"""
         self.is_drawing = False
+        self.canvas_points.end_stroke()
     
     def process_canvas_input(self):
         """处理画布输入数据并自动开始计算"""
@@ -2177,37 +1979,14 @@ class BridgeScourApp(tk.Tk):
             return
         
         try:
-            # 按X坐标排序
-            sorted_points = sorted(self.canvas_points, key=lambda p: p[0])
+            # 按X坐标排序，相同X的点取平均高程，保证插值横坐标严格递增
+            points = self.canvas_points.points
+            x_sorted, inverse = np.unique(points[:, 0], return_inverse=True)
+            y_sorted = np.bincount(inverse, weights=points[:, 1]) / np.bincount(inverse)
             
-            # 生成等间距数据
-            x_min = sorted_points[0][0]
-            x_max = sorted_points[-1][0]
-            
-            # 使用线性插值生成等间距点
-            distances = []
-            elevations = []
-            
-            for x in np.arange(x_min, x_max + self.canvas_spacing, self.canvas_spacing):
-                # 找到最近的点进行插值
-                if x <= sorted_points[0][0]:
-                    y = sorted_points[0][1]
-                elif x >= sorted_points[-1][0]:
-                    y = sorted_points[-1][1]
-            else:
-                    # 线性插值
-                    for i in range(len(sorted_points) - 1):
-                        if sorted_points[i][0] <= x <= sorted_points[i+1][0]:
-                            x1, y1 = sorted_points[i]
-                            x2, y2 = sorted_points[i+1]
-                            if x2 != x1:
-                                y = y1 + (y2 - y1) * (x - x1) / (x2 - x1)
-                            else:
-                                y = y1
-                            break
-                
-                    distances.append(x)
-                    elevations.append(y)
+            # 生成等间距数据，一次线性插值（区间外取端点高程）
+            distances = np.arange(x_sorted[0], x_sorted[-1] + self.canvas_spacing, self.canvas_spacing)
+            elevations = np.interp(distances, x_sorted, y_sorted)
             
             # 保存数据
             self.distances = np.array(distances)
@@ -2236,33 +2015,117 @@ class BridgeScourApp(tk.Tk):
         self.on_text_scroll(*args)
     
     def on_text_change(self, event=None):
-        """文本变化时更新序号和绘图"""
+        """文本变化时更新序号，预览在输入停顿后再刷新"""
         self.update_line_numbers()
-        self.update_preview_plot()
+        self.schedule_preview_update()
+
+    def schedule_preview_update(self):
+        """合并连续的编辑，停顿 PREVIEW_DEBOUNCE_MS 毫秒后刷新一次预览"""
+        if self.preview_job is not None:
+            self.after_cancel(self.preview_job)
+        self.preview_job = self.after(PREVIEW_DEBOUNCE_MS, self.update_preview_plot)
     
     def update_line_numbers(self):
-        """更新行号显示"""
+        """更新行号显示，只增删变化的行号"""
         # 获取文本行数
-        content = self.text_input.get(1.0, tk.END)
-        line_count = content.count('\n')
+        line_count = int(self.text_input.index('end-1c').split('.')[0])
         
         # 更新序号列
-        self.line_numbers.config(state=tk.NORMAL)
-        self.line_numbers.delete(1.0, tk.END)
-        
-        for i in range(1, line_count + 1):
-            self.line_numbers.insert(tk.END, f"{i}\n")
-        
-        self.line_numbers.config(state=tk.DISABLED)
+        if line_count != self.line_number_count:
+            self.line_numbers.config(state=tk.NORMAL)
+            if line_count > self.line_number_count:
+                self.line_numbers.insert(
+                    tk.END, ''.join(f"{i}\n" for i in range(self.line_number_count + 1, line_count + 1)))
+            else:
+                self.line_numbers.delete(f"{line_count + 1}.0", tk.END)
+            self.line_numbers.config(state=tk.DISABLED)
+            self.line_number_count = line_count
         
         # 同步滚动
         self.line_numbers.yview_moveto(self.text_input.yview()[0])
-    
+
+    @staticmethod
+    def parse_preview_line(line):
+        """解析一行断面数据，空行和无效行返回 NaN"""
+        try:
+            point = parse_section_line(line)
+        except ValueError:
+            point = None
+        return point if point is not None else (math.nan, math.nan)
+
+    def track_text_edits(self):
+        """拦截输入框的 insert/delete/replace 命令，记录被修改的行号范围
+
+        键入、粘贴、剪切及程序写入都经过这几个 Tk 命令，预览时只需重新解析记录的行，
+        不必每次取出全文逐行比较。
+        """
+        widget = self.text_input._w
+        original = widget + '_original'
+        self.tk.call('rename', widget, original)
+        self.tk.createcommand(widget, lambda *args: self.on_text_command(original, *args))
+
+    def on_text_command(self, original, *args):
+        """转发输入框的 Tk 命令，修改文本时合并修改的行号范围到 preview_dirty"""
+        if not args or args[0] not in ('insert', 'delete', 'replace'):
+            return self.tk.call(original, *args)
+
+        def line_of(index):
+            return int(str(self.tk.call(original, 'index', index)).split('.')[0])
+
+        old_count = line_of('end-1c')
+        if args[0] == 'insert':
+            lines = [line_of(args[1])]
+        elif args[0] == 'delete':
+            # 只给一个位置时删除该位置的一个字符（可能是换行符）
+            indices = args[1:] if len(args) > 2 else (args[1], f'{args[1]}+1c')
+            lines = [line_of(index) for index in indices]
+        else:
+            lines = [line_of(args[1]), line_of(args[2])]
+        first = min(max(min(lines), 1), old_count)
+        old_last = min(max(lines), old_count)
+
+        result = self.tk.call(original, *args)
+
+        # 修改范围以后的行整体平移 shift 行，范围内的行变为 first..last；之前记录的范围按此换算后合并
+        shift = line_of('end-1c') - old_count
+        last = max(first, old_last + shift)
+        if self.preview_dirty is not None:
+            dirty_first, dirty_last = self.preview_dirty
+            if dirty_first > old_last:
+                dirty_first += shift
+            dirty_last = dirty_last + shift if dirty_last > old_last else min(dirty_last, last)
+            first, last = min(first, dirty_first), max(last, dirty_last)
+        self.preview_dirty = (first, last)
+        return result
+
+    def parse_preview_text(self):
+        """增量解析：只重新解析 preview_dirty 记录的行，其余行沿用上次的解析结果"""
+        if self.preview_dirty is not None:
+            line_count = int(self.text_input.index('end-1c').split('.')[0])
+            first, last = self.preview_dirty
+            self.preview_dirty = None
+            tail = line_count - last  # 修改范围之后未变的行数
+            if first - 1 + tail > len(self.preview_values):
+                first, last, tail = 1, line_count, 0  # 记录与缓存不一致，全部重新解析
+
+            lines = self.text_input.get(f'{first}.0', f'{last}.end').split('\n')
+            changed = np.array([self.parse_preview_line(line) for line in lines], dtype=float).reshape(-1, 2)
+            self.preview_values = np.concatenate([
+                self.preview_values[:first - 1],
+                changed,
+                self.preview_values[len(self.preview_values) - tail:]
+            ])
+
+        valid = ~np.isnan(self.preview_values).any(axis=1)
+        return self.preview_values[valid, 0], self.preview_values[valid, 1]
+
     def update_preview_plot(self):
         """更新实时预览绘图"""
-        text = self.text_input.get(1.0, tk.END).strip()
-        
-        if not text:
+        self.preview_job = None
+        distances, elevations = self.parse_preview_text()
+
+        # 输入框中没有非空白字符
+        if not self.text_input.search(r'\S', '1.0', tk.END, regexp=True):
             self.preview_canvas.delete("all")
             self.preview_canvas.create_text(
                 self.preview_canvas.winfo_width() // 2,
@@ -2274,29 +2137,9 @@ class BridgeScourApp(tk.Tk):
             return
         
         try:
-            distances = []
-            elevations = []
-            
-            lines = text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 支持空格、制表符、逗号分隔
-                parts = re.split(r'[\s,\t]+', line)
-                if len(parts) >= 2:
-                    try:
-                        dist = float(parts[0])
-                        elev = float(parts[1])
-                        distances.append(dist)
-                        elevations.append(elev)
-                    except ValueError:
-                        continue
-            
             if len(distances) >= 2:
-                self.temp_distances = np.array(distances)
-                self.temp_elevations = np.array(elevations)
+                self.temp_distances = distances
+                self.temp_elevations = elevations
                 self.draw_preview_plot()
             else:
                 self.preview_canvas.delete("all")
@@ -2364,22 +2207,20 @@ class BridgeScourApp(tk.Tk):
             fill='black', width=2
         )
         
-        # 绘制断面线
+        # 绘制断面线（按绘图宽度抽稀，点数很多时不再逐点绘制标记）
         if len(self.temp_distances) > 1:
-            points = []
-            for i in range(len(self.temp_distances)):
-                x = to_canvas_x(self.temp_distances[i])
-                y = to_canvas_y(self.temp_elevations[i])
-                points.extend([x, y])
-            
+            plot_distances, plot_elevations = decimate_minmax(self.temp_distances, self.temp_elevations, plot_width)
+            xs = to_canvas_x(plot_distances)
+            ys = to_canvas_y(plot_elevations)
+            points = np.column_stack([xs, ys]).ravel().tolist()
+
             self.preview_canvas.create_line(*points, fill='blue', width=2, smooth=True)
-            
+
             # 绘制数据点
-            for i in range(len(self.temp_distances)):
-                x = to_canvas_x(self.temp_distances[i])
-                y = to_canvas_y(self.temp_elevations[i])
-                self.preview_canvas.create_oval(x-3, y-3, x+3, y+3, fill='red', outline='red')
-        
+            if len(plot_distances) == len(self.temp_distances):
+                for x, y in zip(xs.tolist(), ys.tolist()):
+                    self.preview_canvas.create_oval(x-3, y-3, x+3, y+3, fill='red', outline='red')
+
         # 绘制标签
         self.preview_canvas.create_text(
             width // 2, height - 20,
@@ -2395,45 +2236,19 @@ class BridgeScourApp(tk.Tk):
     
     def process_text_input(self):
         """处理文本输入数据并自动开始计算"""
-        text = self.text_input.get(1.0, tk.END).strip()
+        text = self.text_input.get(1.0, tk.END)
         
-        if not text:
+        if not text.strip():
             messagebox.showwarning("警告", "请输入断面数据")
             return
         
         try:
-            distances = []
-            elevations = []
-            
-            lines = text.split('\n')
-            for i, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # 支持空格、制表符、逗号分隔
-                parts = re.split(r'[\s,\t]+', line)
-                if len(parts) < 2:
-                    raise ValueError(f"第 {i} 行数据格式错误：需要至少两个数值（距离、高程）")
-                
-                try:
-                    dist = float(parts[0])
-                    elev = float(parts[1])
-                    distances.append(dist)
-                    elevations.append(elev)
-                except ValueError:
-                    raise ValueError(f"第 {i} 行数据格式错误：无法转换为数值")
-            
-            if len(distances) < 2:
-                raise ValueError("至少需要2个数据点")
-            
-            # 检查数据有效性
-            if len(distances) != len(elevations):
-                raise ValueError("距离和高程数据数量不匹配")
+            # 严格模式：有格式错误的行时报告全部错误行号（与文本框行号一致）
+            distances, elevations, _ = parse_cross_section_text(text, strict=True)
             
             # 保存数据
-            self.distances = np.array(distances)
-            self.elevations = np.array(elevations)
+            self.distances = distances
+            self.elevations = elevations
             self.file_path = None
             self.file_path_label.config(text="自定义文本数据")
             
@@ -2450,62 +2265,17 @@ class BridgeScourApp(tk.Tk):
             messagebox.showerror("错误", f"处理文本数据失败: {str(e)}")
     
     def get_network_time(self):
-        """获取网络时间"""
-        ntp_servers = [
-            'pool.ntp.org',
-            'time.nist.gov',
-            'time.windows.com',
-            'cn.pool.ntp.org'
-        ]
-        
-        for server in ntp_servers:
-            try:
-                # 尝试通过HTTP获取时间（更简单可靠）
-                url = f'http://{server}'
-                response = urllib.request.urlopen(url, timeout=5)
-                # 从响应头获取时间
-                date_str = response.headers.get('Date')
-                if date_str:
-                    from email.utils import parsedate_to_datetime
-                    return parsedate_to_datetime(date_str)
-            except Exception:
-                continue
-        
-        # 如果HTTP方法失败，尝试NTP协议
-        try:
-            import struct
-            import time
-            
-            client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            client.settimeout(5)
-            
-            for server in ntp_servers:
-                try:
-                    data = b'\x1b' + 47 * b'\0'
-                    client.sendto(data, (server, 123))
-                    data, address = client.recvfrom(1024)
-                    if data:
-                        t = struct.unpack('!12I', data)[10]
-                        t -= 2208988800  # 1900-01-01 00:00:00
-                        client.close()
-                        return datetime.fromtimestamp(t)
-                except Exception:
-                    continue
-            
-            client.close()
-        except Exception:
-            pass
-        
-        return None
+        """获取网络时间（并发查询各时间源，失败时使用缓存）"""
+        return get_verified_time()
     
     def copy_to_clipboard(self, text):
         """复制文本到剪贴板"""
-        if HAS_PYPERCLIP:
-            try:
-                pyperclip.copy(text)
-                return True
-            except Exception:
-                pass
+        try:
+            import pyperclip
+            pyperclip.copy(text)
+            return True
+        except Exception:
+            pass
         
         # 备用方法：使用tkinter的剪贴板
         try:
@@ -2521,6 +2291,7 @@ class BridgeScourApp(tk.Tk):
         try:
             # Windows系统
             if platform.system() == 'Windows':
+                import subprocess
                 # 获取CPU序列号
                 cpu_id = subprocess.check_output('wmic cpu get ProcessorId', shell=True).decode().strip().split('\n')[1].strip()
                 # 获取主板序列号
@@ -2620,9 +2391,22 @@ class BridgeScourApp(tk.Tk):
             return 0
     
     def check_registration_status(self):
-        """检查注册状态"""
-        # 首先检查网络时间
-        network_time = self.get_network_time()
+        """检查注册状态：网络时间在后台线程获取，主窗口无需等待"""
+        self.time_check_queue = queue.Queue()
+        threading.Thread(target=lambda: self.time_check_queue.put(self.get_network_time()), daemon=True).start()
+        self.after(UI_POLL_MS, self.poll_registration_check)
+
+    def poll_registration_check(self):
+        """等待后台网络时间结果，取得后在主线程继续检查注册状态"""
+        try:
+            network_time = self.time_check_queue.get_nowait()
+        except queue.Empty:
+            self.after(UI_POLL_MS, self.poll_registration_check)
+            return
+        self.finish_registration_check(network_time)
+
+    def finish_registration_check(self, network_time):
+        """根据网络时间检查注册状态"""
         if network_time is None:
             messagebox.showerror(
                 "网络错误",
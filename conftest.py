@@ -0,0 +1,5 @@
+"""pytest 配置：把仓库根目录加入模块搜索路径，测试可直接导入各计算模块"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,120 @@
+"""
+启动耗时分析
+设置环境变量 BRIDGE_STARTUP_PROFILE=1 后记录模块导入和各初始化阶段耗时，输出到标准错误；
+变量值以 .json 结尾时同时写入该 JSON 文件。未设置时所有记录操作均为空操作。
+"""
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV_VAR = 'BRIDGE_STARTUP_PROFILE'
+
+_profiled_names = set()  # 本进程内已分析过的名称，once=True 时同名分析器只启用一次
+_profiled_lock = threading.Lock()
+
+
+class StartupProfiler:
+    """记录导入与初始化阶段耗时，并与启动预算比较
+
+    once: 为 True 时同一进程内同名分析器只有第一个启用，之后创建的均为空操作；
+          用于 Streamlit 这类每次交互都重新执行脚本的场景，只分析首次运行。
+    """
+
+    def __init__(self, name, budget=None, enabled=None, once=False):
+        self.name = name
+        self.budget = budget
+        self.setting = os.environ.get(PROFILE_ENV_VAR, '')
+        self.enabled = bool(self.setting) if enabled is None else enabled
+        if self.enabled and once:
+            with _profiled_lock:
+                self.enabled = name not in _profiled_names
+                _profiled_names.add(name)
+        self.start = time.perf_counter()
+        self.imports = []
+        self.phases = []
+        self._original_import = None
+        self._timed_import = None
+        self._depth = 0
+        self._last_mark = self.start
+        self._reported = False
+
+    def start_import_tracking(self):
+        """开始记录顶层 import 语句的耗时（含其引入的子模块）
+
+        只记录调用本方法的线程中的导入，其他线程同时导入的模块不计入，也不影响嵌套计数。
+        """
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        original = self._original_import
+        owner = threading.get_ident()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if self._depth > 0 or threading.get_ident() != owner or name in sys.modules:
+                return original(name, globals, locals, fromlist, level)
+            self._depth += 1
+            started = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth -= 1
+                self.imports.append((name, time.perf_counter() - started))
+
+        self._timed_import = timed_import
+        builtins.__import__ = timed_import
+
+    def stop_import_tracking(self):
+        """停止记录导入耗时；__import__ 之后又被其他代码替换时不还原，避免覆盖对方的设置"""
+        if self._original_import is not None:
+            if builtins.__import__ is self._timed_import:
+                builtins.__import__ = self._original_import
+            self._original_import = None
+            self._timed_import = None
+
+    def mark(self, name):
+        """记录从上一个标记（或分析器创建）到现在的阶段耗时，适合按顺序执行的初始化代码"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last_mark))
+        self._last_mark = now
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def report(self):
+        """输出耗时统计（只输出一次），返回统计字典；未启用时返回 None"""
+        if not self.enabled or self._reported:
+            return None
+        self._reported = True
+        self.stop_import_tracking()
+
+        total = self.elapsed()
+        summary = {
+            'name': self.name,
+            'total': total,
+            'budget': self.budget,
+            'over_budget': self.budget is not None and total > self.budget,
+            'imports': [{'module': name, 'seconds': seconds}
+                        for name, seconds in sorted(self.imports, key=lambda item: -item[1])],
+            'phases': [{'phase': name, 'seconds': seconds} for name, seconds in self.phases],
+        }
+
+        lines = [f"[启动分析] {self.name} 总耗时 {total * 1000:.1f} ms"]
+        if self.budget is not None:
+            status = '超出预算' if summary['over_budget'] else '预算内'
+            lines[0] += f"（预算 {self.budget * 1000:.0f} ms，{status}）"
+        lines += [f"  导入 {item['module']:<30} {item['seconds'] * 1000:8.1f} ms" for item in summary['imports']]
+        lines += [f"  阶段 {item['phase']:<30} {item['seconds'] * 1000:8.1f} ms" for item in summary['phases']]
+        print('\n'.join(lines), file=sys.stderr)
+
+        if self.setting.endswith('.json'):
+            try:
+                with open(self.setting, 'w', encoding='utf-8') as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
+            except OSError as e:
+                print(f"[启动分析] 写入 {self.setting} 失败: {e}", file=sys.stderr)
+        return summary
@@ -0,0 +1,44 @@
+"""
+测试用小断面：(名称, 距离, 高程, 水位)
+"""
+import numpy as np
+
+_rng = np.random.default_rng(7)
+_noisy_d = np.linspace(0.0, 120.0, 61)
+_noisy_e = 10 - 6 * np.sin(np.linspace(0, np.pi, 61)) + _rng.normal(0, 0.2, 61)
+_noisy_e[[0, -1]] = 12.0
+
+SECTIONS = [
+    # 单一 V 形河槽
+    ('v', [0.0, 10.0, 20.0, 30.0, 40.0], [10.0, 5.0, 2.0, 5.0, 10.0], 7.0),
+    # 水位恰好经过测点
+    ('vertex', [0.0, 10.0, 20.0, 30.0, 40.0], [10.0, 5.0, 2.0, 5.0, 10.0], 5.0),
+    # 河心滩露出水面
+    ('island', [0.0, 10.0, 20.0, 30.0, 40.0, 50.0, 60.0], [10.0, 3.0, 3.0, 8.0, 3.0, 3.0, 10.0], 6.0),
+    # 河心滩顶恰在水位线上
+    ('island_vertex', [0.0, 10.0, 20.0, 30.0, 40.0], [10.0, 2.0, 5.0, 2.0, 10.0], 5.0),
+    # 不等间距、含水平段
+    ('uneven', [0.0, 3.0, 3.5, 11.0, 12.0, 20.0, 27.5, 30.0], [9.0, 6.0, 4.0, 4.0, 1.5, 4.0, 6.5, 9.5], 6.0),
+    ('noisy', _noisy_d.tolist(), _noisy_e.tolist(), 8.5),
+]
+
+# 水位低于最低点，断面全部露出水面
+DRY_SECTION = ([0.0, 10.0, 20.0, 30.0], [8.0, 4.0, 3.0, 8.0], 2.0)
+
+
+def section_ids():
+    return [name for name, *_ in SECTIONS]
+
+
+# 完整计算流程用的断面和参数（与界面默认参数一致）
+_pipeline_rng = np.random.default_rng(1)
+PIPELINE_DISTANCES = np.linspace(-600.0, 600.0, 400)
+PIPELINE_ELEVATIONS = 960 + 8 * np.abs(np.linspace(-1, 1, 400)) ** 1.5 + _pipeline_rng.normal(0, 0.3, 400)
+PIPELINE_ELEVATIONS[[0, -1]] = 975.0
+
+PIPELINE_PARAMS = {
+    'n_l': 0.034, 'n_c': 0.032, 'n_r': 0.034, 'J': 0.00173, 'mu': 1.0, 'E': 0.86, 'd': 3.0,
+    'water_level': 963.38, 'design_water_level': 968.52, 'bridge_config': '8-32+1-40+2-64+1-40+3-32',
+    'pier_width': 5.0, 'skew_angle': 68.0, 'bridge_start': -426.0, 'K_t': 1.0, 'B_1': 6.0, 'V': 2.0,
+    'Design_Q': 3480.0, 'choice_h_p': 'y',
+}
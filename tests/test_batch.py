@@ -0,0 +1,150 @@
+import csv
+import json
+
+import pytest
+
+import bridge_calculations
+from bridge_calculations import (GeometryCache, PARAM_KEYS, StageTimer, collect_batch_tasks,
+                                 find_waterline_intersections, main, run_batch, run_scour_analysis)
+from sections import PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS
+
+SITE_V = {'a': 2.0, 'b': 2.6}  # b 覆盖默认流速
+
+
+@pytest.fixture(autouse=True)
+def fresh_geometry_cache(monkeypatch):
+    """每个测试使用独立的几何缓存，阶段计时不受其他测试缓存命中影响"""
+    monkeypatch.setattr(bridge_calculations, 'geometry_cache', GeometryCache(64))
+
+
+def write_section(path, distances=PIPELINE_DISTANCES, elevations=PIPELINE_ELEVATIONS):
+    path.write_text(''.join(f"{float(d)!r},{float(e)!r}\n" for d, e in zip(distances, elevations)),
+                    encoding='utf-8')
+
+
+def write_params(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=('site',) + PARAM_KEYS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    """两个正常站点 a、b，站点 bad 的断面文件无法解析；参数表含默认行和 b 的流速覆盖"""
+    sections = tmp_path / 'sections'
+    sections.mkdir()
+    write_section(sections / 'a.txt')
+    write_section(sections / 'b.txt')
+    (sections / 'bad.txt').write_text("距离,高程\n0,abc\n", encoding='utf-8')
+    (sections / 'notes.md').write_text("不是断面文件", encoding='utf-8')
+    params = tmp_path / 'params.csv'
+    write_params(params, [dict(PIPELINE_PARAMS, site='*'), dict(PIPELINE_PARAMS, site='b', V=SITE_V['b'])])
+    return sections, params
+
+
+def test_collect_tasks_merges_default_and_site_params(batch_dir):
+    sections, params = batch_dir
+    tasks = collect_batch_tasks(str(sections), str(params))
+    assert [site for site, _, _ in tasks] == ['a', 'b', 'bad']
+    assert [path for _, path, _ in tasks] == [str(sections / name) for name in ('a.txt', 'b.txt', 'bad.txt')]
+    by_site = {site: row for site, _, row in tasks}
+    assert float(by_site['a']['V']) == SITE_V['a']
+    assert float(by_site['b']['V']) == SITE_V['b']
+    assert by_site['b']['bridge_config'] == PIPELINE_PARAMS['bridge_config']
+
+
+def test_manifest_columns_override_params_table(tmp_path, batch_dir):
+    sections, params = batch_dir
+    manifest = tmp_path / 'sites.json'
+    manifest.write_text(json.dumps([{'site': 'north', 'section': 'sections/a.txt', 'V': 3.1},
+                                    {'section': 'sections/b.txt'}]), encoding='utf-8')
+    tasks = collect_batch_tasks(str(manifest), str(params))
+    assert [(site, path) for site, path, _ in tasks] == [('north', str(sections / 'a.txt')),
+                                                         ('b', str(sections / 'b.txt'))]
+    assert tasks[0][2]['V'] == 3.1
+    assert float(tasks[1][2]['V']) == SITE_V['b']
+
+
+def test_bad_site_reported_while_others_complete(tmp_path, batch_dir):
+    sections, params = batch_dir
+    output = tmp_path / 'results.jsonl'
+    done = []
+    summary = run_batch(collect_batch_tasks(str(sections), str(params)), str(output), workers=1,
+                        progress=lambda row, count, total: done.append((row['site'], count, total)))
+
+    assert summary['total'] == 3 and summary['ok'] == 2 and summary['failed'] == 1
+    assert [site for site, _ in summary['failures']] == ['bad']
+    assert done == [('a', 1, 3), ('b', 2, 3), ('bad', 3, 3)]
+
+    rows = {row['site']: row for row in map(json.loads, output.read_text(encoding='utf-8').splitlines())}
+    assert rows['bad']['status'] == 'error' and rows['bad']['error']
+    for site, v in SITE_V.items():
+        expected = run_scour_analysis((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS), dict(PIPELINE_PARAMS, V=v))
+        assert rows[site]['status'] == 'ok'
+        assert rows[site]['points'] == len(PIPELINE_DISTANCES)
+        assert rows[site]['boundary1'] == pytest.approx(expected.boundary1)
+        assert rows[site]['local_scour_65_1'] == pytest.approx(expected.local_scour_results['local_scour_65_1'])
+    assert rows['a']['local_scour_65_1'] != rows['b']['local_scour_65_1']
+
+
+def test_process_pool_matches_sequential(tmp_path, batch_dir):
+    sections, params = batch_dir
+    tasks = collect_batch_tasks(str(sections), str(params))
+    run_batch(tasks, str(tmp_path / 'sequential.csv'), workers=1)
+    summary = run_batch(tasks, str(tmp_path / 'pool.csv'), workers=2)
+    assert summary['ok'] == 2 and summary['failed'] == 1
+
+    def read(name):
+        with open(tmp_path / name, encoding='utf-8', newline='') as f:
+            return {row['site']: row for row in csv.DictReader(f)}
+
+    sequential, pool = read('sequential.csv'), read('pool.csv')
+    for site in SITE_V:
+        assert pool[site]['scour_depth_64_1'] == sequential[site]['scour_depth_64_1']
+
+
+def test_stage_timer_records_and_summary(tmp_path):
+    log = tmp_path / 'timing.jsonl'
+    with StageTimer(str(log)) as timer:
+        find_waterline_intersections(PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS['water_level'])
+        run_scour_analysis((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS), PIPELINE_PARAMS)
+    find_waterline_intersections(PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, 965.0)  # 计时结束后不再记录
+
+    first = timer.records[0]
+    assert first['stage'] == 'intersections' and first['function'] == 'find_waterline_intersections'
+    assert first['size'] == len(PIPELINE_DISTANCES) and first['depth'] == 0 and first['seconds'] >= 0
+
+    summary = timer.summary()
+    assert {'intersections', 'hydraulic', 'obstruction', 'flow_distribution', 'general_scour',
+            'local_scour'} <= set(summary)
+    assert sum(entry['calls'] for entry in summary.values()) == len(timer.records)
+    assert summary['intersections']['max_size'] == len(PIPELINE_DISTANCES)
+    assert summary['flow_distribution']['max_size'] is None
+    assert [json.loads(line) for line in log.read_text(encoding='utf-8').splitlines()] == timer.records
+
+
+def test_main_writes_results_and_stage_log(tmp_path, batch_dir, capsys):
+    sections, params = batch_dir
+    output, stage_log = tmp_path / 'results.csv', tmp_path / 'stages.jsonl'
+    code = main(['batch', str(sections), '-p', str(params), '-o', str(output), '-j', '1',
+                 '--stage-log', str(stage_log)])
+    assert code == 1
+    assert '失败 bad' in capsys.readouterr().err
+
+    with open(output, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['status'] for row in rows] == ['ok', 'ok', 'error']
+
+    log = [json.loads(line) for line in stage_log.read_text(encoding='utf-8').splitlines()]
+    assert [(entry['site'], entry['status']) for entry in log] == [('a', 'ok'), ('b', 'ok'), ('bad', 'error')]
+    assert {'obstruction', 'flow_distribution', 'general_scour', 'local_scour'} <= set(log[0]['stages'])
+    for entry in log[0]['stages'].values():
+        assert entry['calls'] >= 1 and entry['seconds'] >= 0
+    assert 'stage_timings' not in rows[0]
+
+
+def test_main_without_sections_returns_error(tmp_path, capsys):
+    assert main(['batch', str(tmp_path), '-o', str(tmp_path / 'out.csv')]) == 2
+    assert '未找到断面文件' in capsys.readouterr().err
@@ -0,0 +1,117 @@
+import math
+
+import numpy as np
+import pytest
+
+import baseline
+from bridge_calculations import CrossSection, integrate_wetted_section
+from sections import SECTIONS, section_ids
+
+
+def loop_geometry(distances, elevations, water_level):
+    """逐段循环在水位线处裁剪折线，返回 (过流面积, 水面宽度, 湿周)，作为参照"""
+    area = width = perimeter = 0.0
+    for i in range(len(distances) - 1):
+        x0, x1 = distances[i], distances[i + 1]
+        h0, h1 = water_level - elevations[i], water_level - elevations[i + 1]
+        if h0 <= 0 and h1 <= 0:
+            continue
+        if h0 < 0 or h1 < 0:
+            # 部分淹没：截到水位线交点
+            fraction = max(h0, h1) / abs(h1 - h0)
+            dx = (x1 - x0) * fraction
+            area += 0.5 * max(h0, h1) * dx
+            width += dx
+            perimeter += math.hypot(dx, max(h0, h1))
+        else:
+            area += 0.5 * (h0 + h1) * (x1 - x0)
+            width += x1 - x0
+            perimeter += math.hypot(x1 - x0, h1 - h0)
+    return area, width, perimeter
+
+
+_rng = np.random.default_rng(11)
+RANDOM_SECTIONS = []
+for _ in range(5):
+    _count = int(_rng.integers(5, 60))
+    _d = np.cumsum(_rng.uniform(0.2, 5.0, _count))
+    _e = _rng.uniform(0.0, 10.0, _count)
+    _e[[0, -1]] = 12.0
+    RANDOM_SECTIONS.append((_d, _e))
+
+DEGENERATE_SECTIONS = [
+    # 平底河槽，水位恰在河底、略高于河底
+    ('flat_bottom', [0.0, 5.0, 10.0, 20.0, 25.0, 30.0], [8.0, 2.0, 2.0, 2.0, 2.0, 8.0], [2.0, 2.5, 7.9]),
+    # 水位恰好经过测点
+    ('vertex', [0.0, 10.0, 20.0, 30.0, 40.0], [10.0, 5.0, 2.0, 5.0, 10.0], [2.0, 5.0, 10.0]),
+    # 水位高于两岸
+    ('above_banks', [0.0, 10.0, 20.0, 30.0], [6.0, 1.0, 3.0, 7.0], [7.0, 9.5]),
+    # 竖直岸壁（重复距离）
+    ('vertical_bank', [0.0, 0.0, 10.0, 20.0, 20.0], [9.0, 1.0, 0.5, 1.0, 9.0], [1.0, 4.0]),
+]
+
+
+def levels_for(elevations):
+    elevations = np.asarray(elevations, dtype=float)
+    return np.concatenate([np.linspace(elevations.min() - 1, elevations.max() + 1, 41), elevations])
+
+
+@pytest.mark.parametrize('index', range(len(RANDOM_SECTIONS)))
+def test_random_sections_match_exact_integration(index):
+    distances, elevations = RANDOM_SECTIONS[index]
+    section = CrossSection(distances, elevations)
+    levels = levels_for(elevations)
+    area, width, perimeter = section.geometry(levels)
+    for level, a, w, p in zip(levels, area, width, perimeter):
+        exact_area, exact_width, _, exact_perimeter = integrate_wetted_section(distances, elevations, level)
+        assert a == pytest.approx(exact_area, rel=1e-9, abs=1e-9)
+        assert w == pytest.approx(exact_width, rel=1e-9, abs=1e-9)
+        assert p == pytest.approx(exact_perimeter, rel=1e-9, abs=1e-9)
+        assert (a, w, p) == pytest.approx(loop_geometry(distances, elevations, level), rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('name, distances, elevations, levels', DEGENERATE_SECTIONS,
+                         ids=[item[0] for item in DEGENERATE_SECTIONS])
+def test_degenerate_sections(name, distances, elevations, levels):
+    section = CrossSection(distances, elevations)
+    for level in levels:
+        expected = loop_geometry(distances, elevations, level)
+        assert section.geometry(level) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+        exact_area, exact_width, _, exact_perimeter = integrate_wetted_section(distances, elevations, level)
+        assert (exact_area, exact_width, exact_perimeter) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def test_flat_bottom_at_waterline_is_dry():
+    section = CrossSection([0.0, 5.0, 25.0, 30.0], [8.0, 2.0, 2.0, 8.0])
+    assert section.geometry(2.0) == (0.0, 0.0, 0.0)
+
+
+def test_above_banks_covers_whole_section():
+    distances, elevations = [0.0, 10.0, 20.0, 30.0], [6.0, 1.0, 3.0, 7.0]
+    area, width, perimeter = CrossSection(distances, elevations).geometry(9.5)
+    assert width == pytest.approx(30.0)
+    assert area == pytest.approx(sum(0.5 * (19.0 - a - b) * 10.0 for a, b in zip(elevations, elevations[1:])))
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_area_matches_sampled_baseline(name, distances, elevations, water_level):
+    """与原始按 0.1 m 采样的辛普森积分相比，差异只来自采样误差"""
+    _, _, expected, _ = baseline.calculate_hydraulic_parameters(np.array(distances), np.array(elevations),
+                                                                water_level)
+    assert CrossSection(distances, elevations).area(water_level) == pytest.approx(expected, rel=2e-3)
+
+
+def test_array_query_matches_scalar_queries():
+    distances, elevations = RANDOM_SECTIONS[0]
+    section = CrossSection(distances, elevations)
+    levels = levels_for(elevations)
+    areas, widths, perimeters = section.geometry(levels)
+    for level, a, w, p in zip(levels, areas, widths, perimeters):
+        assert section.geometry(float(level)) == pytest.approx((a, w, p), rel=1e-12, abs=1e-12)
+
+
+def test_index_is_built_on_first_query():
+    section = CrossSection([0.0, 10.0, 20.0], [5.0, 1.0, 5.0])
+    assert section._z_ref is None
+    section.area(3.0)
+    assert section._z_ref == 1.0
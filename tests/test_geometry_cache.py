@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+import bridge_calculations
+from bridge_calculations import (GeometryCache, cached_flow_areas, cached_hydraulic_parameters,
+                                 cached_waterline_intersections, calculate_flow_areas,
+                                 calculate_hydraulic_parameters, find_waterline_intersections)
+from sections import SECTIONS
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, value):
+        def compute():
+            self.calls += 1
+            return value
+        return compute
+
+
+def test_hit_and_miss_counters():
+    cache = GeometryCache(maxsize=4)
+    compute = Counter()
+    assert cache.get_or_compute('a', compute(1)) == 1
+    assert cache.get_or_compute('a', compute(2)) == 1
+    assert cache.get_or_compute('b', compute(3)) == 3
+    assert compute.calls == 2
+    assert cache.info() == {'hits': 1, 'misses': 2, 'evictions': 0, 'size': 2, 'maxsize': 4}
+
+
+def test_evicts_least_recently_used_at_capacity():
+    cache = GeometryCache(maxsize=2)
+    compute = Counter()
+    cache.get_or_compute('a', compute('A'))
+    cache.get_or_compute('b', compute('B'))
+    cache.get_or_compute('a', compute('A2'))  # a 变为最近使用
+    cache.get_or_compute('c', compute('C'))   # 淘汰 b
+    assert len(cache) == 2
+    assert cache.info()['evictions'] == 1
+
+    assert cache.get_or_compute('a', compute('A3')) == 'A'
+    assert cache.get_or_compute('b', compute('B2')) == 'B2'  # b 已被淘汰，重新计算
+    assert cache.info()['evictions'] == 2  # 重新存入 b 时淘汰 c
+    assert cache.get_or_compute('c', compute('C2')) == 'C2'
+
+
+def test_resize_and_zero_size():
+    cache = GeometryCache(maxsize=3)
+    for key in 'abc':
+        cache.get_or_compute(key, lambda: key)
+    cache.resize(1)
+    assert len(cache) == 1 and cache.info()['evictions'] == 2
+    assert cache.get_or_compute('c', lambda: 'new') == 'c'
+
+    cache.resize(0)
+    compute = Counter()
+    cache.get_or_compute('d', compute(1))
+    cache.get_or_compute('d', compute(1))
+    assert compute.calls == 2 and len(cache) == 0
+
+
+def test_clear_resets_counters():
+    cache = GeometryCache(maxsize=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('a', lambda: 1)
+    cache.clear()
+    assert cache.info() == {'hits': 0, 'misses': 0, 'evictions': 0, 'size': 0, 'maxsize': 2}
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    cache = GeometryCache(maxsize=16)
+    monkeypatch.setattr(bridge_calculations, 'geometry_cache', cache)
+    return cache
+
+
+def test_equal_content_with_different_identity_hits(shared_cache):
+    name, distances, elevations, water_level = SECTIONS[5]
+    first = cached_hydraulic_parameters(np.array(distances), np.array(elevations), water_level)
+    misses = shared_cache.info()['misses']
+
+    copy_d, copy_e = np.array(distances), np.array(elevations)
+    second = cached_hydraulic_parameters(copy_d, copy_e, water_level)
+    assert shared_cache.info()['misses'] == misses
+    assert shared_cache.info()['hits'] == 1
+    assert second == first
+
+    # 内容改变后不命中
+    copy_e[10] += 0.5
+    cached_hydraulic_parameters(copy_d, copy_e, water_level)
+    assert shared_cache.info()['misses'] > misses
+
+
+def test_cached_helpers_match_uncached(shared_cache):
+    name, distances, elevations, water_level = SECTIONS[5]
+    d, e = np.array(distances), np.array(elevations)
+    boundary1, boundary2 = find_waterline_intersections(d, e, water_level - 1.0)
+
+    assert cached_waterline_intersections(d, e, water_level) == find_waterline_intersections(d, e, water_level)
+    assert cached_hydraulic_parameters(d, e, water_level) == calculate_hydraulic_parameters(d, e, water_level)
+    assert cached_flow_areas(d, e, water_level, boundary1, boundary2) == \
+        calculate_flow_areas(d, e, water_level, boundary1, boundary2)
+    for method in ('vectorized', 'exact'):
+        assert cached_hydraulic_parameters(d, e, water_level, method=method) == \
+            calculate_hydraulic_parameters(d, e, water_level, method=method)
+
+
+def test_cached_results_are_not_shared_lists(shared_cache):
+    name, distances, elevations, water_level = SECTIONS[0]
+    intersections = cached_waterline_intersections(distances, elevations, water_level)
+    intersections.append(-1.0)
+    assert len(cached_waterline_intersections(distances, elevations, water_level)) == 2
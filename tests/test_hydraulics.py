@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+import baseline
+from bridge_calculations import calculate_hydraulic_parameters, find_waterline_intersections
+from sections import DRY_SECTION, SECTIONS, section_ids
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_intersections_match_baseline(name, distances, elevations, water_level):
+    expected = baseline.find_waterline_intersections(distances, elevations, water_level)
+    assert find_waterline_intersections(distances, elevations, water_level) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('method', ['vectorized', 'loop'])
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_sampled_parameters_match_baseline(name, distances, elevations, water_level, method):
+    d, e = np.array(distances), np.array(elevations)
+    expected = baseline.calculate_hydraulic_parameters(d, e, water_level)
+    avg_depth, max_depth, flow_area, intersections = calculate_hydraulic_parameters(d, e, water_level, method=method)
+    assert avg_depth == pytest.approx(expected[0], rel=1e-12)
+    assert max_depth == pytest.approx(expected[1], rel=1e-12)
+    assert flow_area == pytest.approx(expected[2], rel=1e-12)
+    assert intersections == pytest.approx(expected[3])
+
+
+@pytest.mark.parametrize('method', ['vectorized', 'loop', 'exact'])
+def test_dry_section_has_no_parameters(method):
+    distances, elevations, water_level = DRY_SECTION
+    assert baseline.calculate_hydraulic_parameters(np.array(distances), np.array(elevations), water_level) == \
+        (None, None, None, None)
+    assert calculate_hydraulic_parameters(distances, elevations, water_level, method=method) == \
+        (None, None, None, None)
+
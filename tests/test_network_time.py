@@ -0,0 +1,165 @@
+import json
+import socket
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('tkinter')
+import chongshua_you  # noqa: E402
+from chongshua_you import (fetch_network_time, get_verified_time, load_cached_time, probe_http_time,  # noqa: E402
+                           probe_ntp_time, save_time_cache)
+
+HTTP_TIME = datetime(2031, 5, 6, 7, 8, 9, tzinfo=timezone.utc)
+NTP_TIME = datetime(2032, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+NTP_EPOCH_OFFSET = 2208988800
+
+
+@pytest.fixture
+def http_server():
+    """本机 HTTP 时间源，响应头 Date 为 HTTP_TIME，可设置响应延迟"""
+    class Handler(BaseHTTPRequestHandler):
+        delay = 0.0
+
+        def do_GET(self):
+            time.sleep(Handler.delay)
+            self.send_response(204)
+            self.end_headers()
+
+        def date_time_string(self, timestamp=None):
+            return format_datetime(HTTP_TIME, usegmt=True)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.handler = Handler
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ntp_server():
+    """本机 UDP NTP 桩，回复发送时间戳为 NTP_TIME 的 48 字节报文，可设置响应延迟"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    sock.settimeout(0.1)
+    state = {'delay': 0.0, 'running': True}
+
+    def serve():
+        while state['running']:
+            try:
+                _, client = sock.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            time.sleep(state['delay'])
+            words = [0] * 12
+            words[10] = int(NTP_TIME.timestamp()) + NTP_EPOCH_OFFSET
+            try:
+                sock.sendto(struct.pack('!12I', *words), client)
+            except OSError:
+                break
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    state['address'] = sock.getsockname()
+    yield state
+    state['running'] = False
+    thread.join(1)
+    sock.close()
+
+
+def closed_port():
+    """返回当前没有服务监听的本机端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def local_naive(dt):
+    return dt.astimezone().replace(tzinfo=None)
+
+
+def test_probes_read_local_servers(http_server, ntp_server):
+    assert probe_http_time(http_server.url, timeout=2) == local_naive(HTTP_TIME)
+    assert probe_ntp_time(ntp_server['address'], timeout=2) == local_naive(NTP_TIME)
+
+
+def test_first_responder_wins(http_server, ntp_server):
+    http_server.handler.delay = 1.0
+    assert fetch_network_time([http_server.url], [ntp_server['address']], timeout=3) == local_naive(NTP_TIME)
+
+    http_server.handler.delay = 0.0
+    ntp_server['delay'] = 1.0
+    assert fetch_network_time([http_server.url], [ntp_server['address']], timeout=3) == local_naive(HTTP_TIME)
+
+
+def test_failed_probes_do_not_block_a_later_answer(http_server):
+    http_server.handler.delay = 0.3
+    dead = [f"http://127.0.0.1:{closed_port()}/"]
+    assert fetch_network_time(dead + [http_server.url], [('127.0.0.1', closed_port())], timeout=2) == \
+        local_naive(HTTP_TIME)
+
+
+def test_all_probes_failing_falls_back_to_cache(tmp_path):
+    cache = tmp_path / 'network_time.dat'
+    cached_time = datetime(2030, 1, 1, 12, 0, 0)
+    save_time_cache(cached_time, str(cache))
+
+    started = time.monotonic()
+    result = get_verified_time([f"http://127.0.0.1:{closed_port()}/"], [('127.0.0.1', closed_port())],
+                               timeout=1, cache_path=str(cache))
+    assert time.monotonic() - started < 3
+    assert cached_time <= result < cached_time + timedelta(minutes=1)
+
+
+def test_successful_probe_refreshes_cache(tmp_path, http_server):
+    cache = tmp_path / 'network_time.dat'
+    assert get_verified_time([http_server.url], [], timeout=2, cache_path=str(cache)) == local_naive(HTTP_TIME)
+    assert load_cached_time(str(cache)) >= local_naive(HTTP_TIME)
+
+
+def test_tampered_cache_is_rejected(tmp_path):
+    cache = tmp_path / 'network_time.dat'
+    save_time_cache(datetime(2030, 1, 1), str(cache))
+    data = json.loads(cache.read_text(encoding='utf-8'))
+    data['network_time'] = datetime(2029, 1, 1).isoformat()
+    cache.write_text(json.dumps(data), encoding='utf-8')
+    assert load_cached_time(str(cache)) is None
+
+    cache.write_text('not json', encoding='utf-8')
+    assert load_cached_time(str(cache)) is None
+    assert load_cached_time(str(tmp_path / 'missing.dat')) is None
+
+
+def write_cache(path, network_time, local_time):
+    network_str, local_str = network_time.isoformat(), local_time.isoformat()
+    path.write_text(json.dumps({
+        'network_time': network_str,
+        'local_time': local_str,
+        'checksum': chongshua_you._time_cache_checksum(network_str, local_str),
+    }), encoding='utf-8')
+
+
+def test_cache_expires_after_grace_window(tmp_path):
+    cache = tmp_path / 'network_time.dat'
+    network_time = datetime(2030, 1, 1)
+
+    write_cache(cache, network_time, datetime.now() - timedelta(hours=2))
+    result = load_cached_time(str(cache), grace=timedelta(hours=3))
+    assert network_time + timedelta(hours=2) <= result < network_time + timedelta(hours=2, minutes=1)
+    assert load_cached_time(str(cache), grace=timedelta(hours=1)) is None
+
+    # 本机时钟倒退（缓存记录的本机时间在未来）同样拒绝
+    write_cache(cache, network_time, datetime.now() + timedelta(hours=1))
+    assert load_cached_time(str(cache)) is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import baseline
+from bridge_calculations import PIER_DTYPE, calculate_bridge_obstruction, find_waterline_intersections
+from sections import DRY_SECTION, SECTIONS, section_ids
+
+# 桥跨布置：(跨径列表, 墩宽, 斜交角, 起点)，含断面外的桥墩和落在分界点上的桥墩
+BRIDGES = [
+    ([8.0, 8.0, 8.0, 8.0], 1.5, 0.0, 2.0),
+    ([12.0, 20.0, 12.0], 2.0, 30.0, -6.0),
+    ([5.0] * 30, 1.0, 15.0, -10.0),
+]
+
+
+def channel_boundaries(distances, elevations, water_level):
+    """取水位线交点内缩四分之一作为河槽分界点"""
+    left, right = find_waterline_intersections(distances, elevations, water_level)
+    quarter = (right - left) / 4
+    return left + quarter, right - quarter
+
+
+def assert_scalars_match(result, expected):
+    for index in (0, 1, 3, 4, 5, 6, 7, 8):
+        assert result[index] == pytest.approx(expected[index], rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize('spans, pier_width, skew_angle, bridge_start', BRIDGES)
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_obstruction_matches_baseline(name, distances, elevations, water_level,
+                                      spans, pier_width, skew_angle, bridge_start):
+    d, e = np.array(distances), np.array(elevations)
+    boundary1, boundary2 = channel_boundaries(d, e, water_level)
+    args = (spans, pier_width, skew_angle, water_level, d, e, bridge_start, boundary1, boundary2)
+    expected = baseline.calculate_bridge_obstruction(*args)
+
+    result = calculate_bridge_obstruction(*args)
+    assert_scalars_match(result, expected)
+    assert len(result[2]) == len(expected[2])
+    for pier, expected_pier in zip(result[2], expected[2]):
+        assert pier['region'] == expected_pier['region']
+        for key in ('position', 'depth', 'area'):
+            assert pier[key] == pytest.approx(expected_pier[key], rel=1e-12, abs=1e-12)
+
+    table = calculate_bridge_obstruction(*args, as_table=True)
+    assert_scalars_match(table, expected)
+    assert table[2].dtype == PIER_DTYPE
+    np.testing.assert_allclose(table[2]['position'], [pier['position'] for pier in expected[2]])
+    np.testing.assert_allclose(table[2]['area'], [pier['area'] for pier in expected[2]], atol=1e-12)
+
+
+def test_boundary_pier_counts_as_channel():
+    name, distances, elevations, water_level = SECTIONS[0]
+    result = calculate_bridge_obstruction([10.0, 10.0], 1.0, 0.0, water_level, distances, elevations,
+                                          10.0, 10.0, 30.0)
+    assert [pier['region'] for pier in result[2]] == ['河槽', '河槽', '河槽']
+    assert result[6:] == (0.0, 3.0, 0.0)
+
+
+@pytest.mark.parametrize('as_table', [False, True])
+def test_dry_section_has_no_obstruction(as_table):
+    distances, elevations, water_level = DRY_SECTION
+    result = calculate_bridge_obstruction([10.0, 10.0], 1.0, 0.0, water_level, distances, elevations,
+                                          0.0, 5.0, 25.0, as_table=as_table)
+    expected = baseline.calculate_bridge_obstruction([10.0, 10.0], 1.0, 0.0, water_level, distances, elevations,
+                                                     0.0, 5.0, 25.0)
+    assert_scalars_match(result, expected)
+    if as_table:
+        assert result[2].dtype == PIER_DTYPE
+        assert result[2].shape == (0,)
+    else:
+        assert result[2] == []
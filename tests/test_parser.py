@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+import bridge_calculations
+from bridge_calculations import SectionParseError, parse_cross_section_text, parse_section_line, read_cross_section_file
+
+
+def loop_parse(text):
+    """逐行调用 parse_section_line，作为整体解析的参照"""
+    points, bad_lines = [], []
+    for number, line in enumerate(text.splitlines(), 1):
+        try:
+            point = parse_section_line(line)
+        except ValueError:
+            bad_lines.append(number)
+            continue
+        if point is not None:
+            points.append(point)
+    return [p[0] for p in points], [p[1] for p in points], bad_lines
+
+
+MIXED_TEXT = (
+    "# 距离 高程\n"
+    "0, 10.5\n"
+    "5\t8.25\n"
+    "\n"
+    "10 6.0  # 河槽\n"
+    "abc 5\n"
+    "15,  4.5, 备注\n"
+    "20\n"
+    "25 7.0\n"
+)
+
+
+def test_clean_text():
+    distances, elevations, bad_lines = parse_cross_section_text("0 10\n5 8\n10 9\n")
+    assert distances.tolist() == [0.0, 5.0, 10.0]
+    assert elevations.tolist() == [10.0, 8.0, 9.0]
+    assert bad_lines == []
+
+
+def test_bad_lines_are_skipped_and_reported():
+    distances, elevations, bad_lines = parse_cross_section_text(MIXED_TEXT)
+    expected = loop_parse(MIXED_TEXT)
+    assert distances.tolist() == expected[0]
+    assert elevations.tolist() == expected[1]
+    assert bad_lines == expected[2] == [6, 8]
+
+
+def test_bad_lines_in_later_chunks(monkeypatch):
+    monkeypatch.setattr(bridge_calculations, 'SECTION_PARSE_CHUNK_LINES', 4)
+    lines = [f"{i} {i * 0.5}" for i in range(40)]
+    lines[9] = "9 x"
+    lines[33] = "--"
+    text = '\n'.join(lines)
+    distances, elevations, bad_lines = parse_cross_section_text(text)
+    expected = loop_parse(text)
+    assert distances.tolist() == expected[0]
+    assert elevations.tolist() == expected[1]
+    assert bad_lines == [10, 34]
+
+
+def test_strict_raises_with_line_numbers():
+    with pytest.raises(SectionParseError) as error:
+        parse_cross_section_text(MIXED_TEXT, strict=True)
+    assert error.value.bad_lines == [6, 8]
+    assert "第 6, 8 行数据格式错误" in str(error.value)
+
+
+def test_too_few_points():
+    with pytest.raises(SectionParseError) as error:
+        parse_cross_section_text("# 只有一行\n0 1\nx y\n")
+    assert error.value.bad_lines == [3]
+
+
+@pytest.mark.parametrize('text', ["0 1\nnan 2\n2 inf\n3 4\n", "0 1\n1 NaN\n-inf 2\n3 4\n"])
+def test_non_finite_values_are_bad_lines(text):
+    distances, elevations, bad_lines = parse_cross_section_text(text)
+    assert np.isfinite(distances).all() and np.isfinite(elevations).all()
+    assert distances.tolist() == [0.0, 3.0]
+    assert bad_lines == [2, 3]
+
+
+def test_bom_in_str_input():
+    distances, elevations, bad_lines = parse_cross_section_text("\ufeff0 1\n1 2\n")
+    assert distances.tolist() == [0.0, 1.0]
+    assert bad_lines == []
+
+
+def test_bom_in_bytes_input():
+    distances, elevations, bad_lines = parse_cross_section_text("0 1\n1 2\n".encode('utf-8-sig'))
+    assert distances.tolist() == [0.0, 1.0]
+    assert bad_lines == []
+
+
+def test_gbk_bytes_input():
+    distances, elevations, bad_lines = parse_cross_section_text("# 左岸\n0 1\n1 2  # 右岸\n".encode('gbk'))
+    assert distances.tolist() == [0.0, 1.0]
+    assert elevations.tolist() == [1.0, 2.0]
+    assert bad_lines == []
+
+
+def test_undecodable_bytes_raise_parse_error():
+    with pytest.raises(SectionParseError):
+        parse_cross_section_text(b"0 1\n\xff\xfe\x00\x81\x30\n")
+
+
+def test_read_file_matches_text(tmp_path):
+    path = tmp_path / 'section.txt'
+    path.write_bytes(MIXED_TEXT.encode('gbk'))
+    distances, elevations, bad_lines = read_cross_section_file(str(path))
+    expected = parse_cross_section_text(MIXED_TEXT)
+    assert distances.tolist() == expected[0].tolist()
+    assert elevations.tolist() == expected[1].tolist()
+    assert bad_lines == expected[2]
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+from scipy.integrate import simpson
+
+import baseline
+from bridge_calculations import SAMPLING_INTERVAL, ScourPipeline, find_waterline_intersections, run_scour_analysis
+from sections import PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = ScourPipeline((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS))
+    pipeline.run(PIPELINE_PARAMS)
+    assert pipeline.last_recomputed == list(ScourPipeline.STAGES)
+    return pipeline
+
+
+def rerun(pipeline, **changes):
+    pipeline.run(dict(PIPELINE_PARAMS, **changes))
+    return pipeline.last_recomputed
+
+
+def test_design_water_level_keeps_bankfull(pipeline):
+    recomputed = rerun(pipeline, design_water_level=PIPELINE_PARAMS['design_water_level'] + 0.3)
+    assert 'bankfull' not in recomputed
+    assert recomputed == [name for name in ScourPipeline.STAGES if name != 'bankfull']
+
+
+def test_water_level_keeps_design(pipeline):
+    recomputed = rerun(pipeline, water_level=PIPELINE_PARAMS['water_level'] + 0.2)
+    assert 'design' not in recomputed
+    assert recomputed[0] == 'bankfull'
+
+
+def test_local_scour_parameter_recomputes_only_local_scour(pipeline):
+    assert rerun(pipeline, V=PIPELINE_PARAMS['V'] * 1.1) == ['local_scour']
+
+
+def test_design_discharge_recomputes_distribution_and_scour(pipeline):
+    assert rerun(pipeline, Design_Q=PIPELINE_PARAMS['Design_Q'] * 1.2) == [
+        'flow_distribution', 'general_scour', 'local_scour']
+
+
+def test_unchanged_parameters_recompute_nothing(pipeline):
+    assert rerun(pipeline) == []
+
+
+def test_section_change_recomputes_everything(pipeline):
+    pipeline.set_section((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS - 0.05))
+    assert rerun(pipeline) == list(ScourPipeline.STAGES)
+
+
+def test_results_are_copies_of_memoized_outputs(pipeline):
+    result = pipeline.run(PIPELINE_PARAMS)
+    expected = result.flow_distribution['channel_Q_final']
+    result.flow_distribution['channel_Q_final'] = -1.0
+    result.pier_obstructions.clear()
+    pipeline.intermediates['bankfull']['boundary1'] = 0.0
+
+    again = pipeline.run(PIPELINE_PARAMS)
+    assert pipeline.last_recomputed == []
+    assert again.flow_distribution['channel_Q_final'] == expected
+    assert again.pier_obstructions
+    assert again.boundary1 != 0.0
+
+
+def assert_matches(value, expected):
+    if isinstance(expected, dict):
+        for key, item in expected.items():
+            assert_matches(value[key], item)
+    elif isinstance(expected, (list, tuple)):
+        assert len(value) == len(expected)
+        for item, expected_item in zip(value, expected):
+            assert_matches(item, expected_item)
+    elif isinstance(expected, str):
+        assert value == expected
+    else:
+        assert value == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+@pytest.mark.parametrize('choice_h_p', ['y', '2.5'])
+def test_run_scour_analysis_matches_app_sequence(choice_h_p):
+    params = dict(PIPELINE_PARAMS, choice_h_p=choice_h_p)
+    expected = baseline.run_app_sequence(PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, params)
+    result = run_scour_analysis((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS), params)
+    for field, value in expected.items():
+        assert_matches(getattr(result, field), value)
+
+
+def test_areas_use_simpson_integration():
+    """原 Tk 界面用 np.trapz 积分，统一流水线后与网页版一致使用辛普森积分"""
+    result = run_scour_analysis((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS), PIPELINE_PARAMS)
+    design_level = PIPELINE_PARAMS['design_water_level']
+    left, right = find_waterline_intersections(PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, design_level)
+    start = np.argmin(np.abs(PIPELINE_DISTANCES - left))
+    end = np.argmin(np.abs(PIPELINE_DISTANCES - right))
+    x = PIPELINE_DISTANCES[start:end + 1]
+    depths = np.maximum(design_level - PIPELINE_ELEVATIONS[start:end + 1], 0)
+    channel = (x >= result.boundary1) & (x <= result.boundary2)
+
+    channel_area = result.flow_areas[1]
+    assert channel_area == pytest.approx(simpson(depths[channel], x=x[channel]), rel=1e-12)
+    assert channel_area != pytest.approx(np.trapezoid(depths[channel], x=x[channel]), rel=1e-9)
+
+    samples = np.arange(left, right + SAMPLING_INTERVAL, SAMPLING_INTERVAL)
+    sample_depths = np.maximum(design_level - np.interp(samples, PIPELINE_DISTANCES, PIPELINE_ELEVATIONS), 0)
+    assert result.flow_area == pytest.approx(simpson(sample_depths, x=samples), rel=1e-12)
+    assert result.flow_area != pytest.approx(np.trapezoid(sample_depths, x=samples), rel=1e-12)
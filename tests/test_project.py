@@ -0,0 +1,162 @@
+import dataclasses
+import json
+import os
+import zipfile
+
+import numpy as np
+import pytest
+
+from bridge_calculations import ScourPipeline
+from bridge_project import ProjectArchive, save_project_archive
+from sections import PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS
+
+PIPELINE_RESULT = 'pipeline'
+
+
+def assert_same(actual, expected):
+    """递归比较阶段结果，数组逐元素比较，元组与列表不混用；numpy 标量保存后为 Python 数值"""
+    if not isinstance(expected, (np.generic, int, float)):
+        assert type(actual) is type(expected)
+    if dataclasses.is_dataclass(expected):
+        for field in dataclasses.fields(expected):
+            assert_same(getattr(actual, field.name), getattr(expected, field.name))
+    elif isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            assert_same(actual[key], expected[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_same(a, e)
+    elif isinstance(expected, np.ndarray):
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+    else:
+        assert actual == expected
+
+
+@pytest.fixture
+def saved_project(tmp_path):
+    """保存带断面和流水线阶段结果的项目，返回 (路径, 流水线)"""
+    pipeline = ScourPipeline((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS))
+    pipeline.run(PIPELINE_PARAMS)
+    path = tmp_path / 'site.bsp'
+    save_project_archive(str(path), dict(PIPELINE_PARAMS), PIPELINE_DISTANCES, PIPELINE_ELEVATIONS,
+                         {PIPELINE_RESULT: pipeline.memo_state(), 'note': '说明', 'levels': np.arange(3.0)})
+    return path, pipeline
+
+
+def test_restored_memo_skips_all_stages(saved_project):
+    path, original = saved_project
+    with ProjectArchive(str(path)) as project:
+        assert not project.is_legacy
+        assert project.inputs == PIPELINE_PARAMS
+        distances, elevations = project.section()
+        np.testing.assert_array_equal(distances, PIPELINE_DISTANCES)
+        np.testing.assert_array_equal(elevations, PIPELINE_ELEVATIONS)
+
+        pipeline = ScourPipeline((distances, elevations))
+        pipeline.restore_memo(project.result(PIPELINE_RESULT))
+
+    results = pipeline.run(project.inputs)
+    assert pipeline.last_recomputed == []
+    assert_same(results, original.run(PIPELINE_PARAMS))
+
+    # 参数变化时恢复的结果照常按依赖重算
+    pipeline.run(dict(PIPELINE_PARAMS, V=PIPELINE_PARAMS['V'] * 1.1))
+    assert pipeline.last_recomputed == ['local_scour']
+
+
+def test_text_and_array_results(saved_project):
+    path, _ = saved_project
+    project = ProjectArchive(str(path))
+    assert project.result_names() == [PIPELINE_RESULT, 'note', 'levels']
+    assert project.result('note') == '说明'
+    np.testing.assert_array_equal(project.result('levels'), [0.0, 1.0, 2.0])
+    assert project.result('missing', 'default') == 'default'
+
+
+def test_opening_reads_only_the_manifest(saved_project, monkeypatch):
+    path, _ = saved_project
+    reads = []
+    read = zipfile.ZipFile.read
+
+    def recording_read(self, name, *args):
+        reads.append(name)
+        return read(self, name, *args)
+
+    monkeypatch.setattr(zipfile.ZipFile, 'read', recording_read)
+    project = ProjectArchive(str(path))
+    assert reads == ['manifest.json']
+    project.result('note')
+    project.result('note')
+    assert reads == ['manifest.json', 'results/note.txt']
+
+
+def test_legacy_json_project(tmp_path):
+    path = tmp_path / 'old_project.dat'
+    inputs = {'n_l': 0.035, 'bridge_config': '1*20+3*30', 'file_path': 'section.txt'}
+    path.write_text(json.dumps(inputs, ensure_ascii=False, indent=4), encoding='utf-8')
+
+    project = ProjectArchive(str(path))
+    assert project.is_legacy
+    assert project.inputs == inputs
+    assert not project.has_section
+    assert project.section() is None
+    assert project.result_names() == []
+    assert project.result(PIPELINE_RESULT) is None
+
+
+def test_invalid_json_project_raises(tmp_path):
+    path = tmp_path / 'broken.dat'
+    path.write_text('{"n_l": ', encoding='utf-8')
+    with pytest.raises(json.JSONDecodeError):
+        ProjectArchive(str(path))
+
+
+def test_file_changed_after_opening_is_rejected(saved_project):
+    path, _ = saved_project
+    project = ProjectArchive(str(path))
+    project.result('note')  # 已读取的成员仍可使用
+
+    save_project_archive(str(path), {'n_l': 0.04}, [0.0, 1.0], [2.0, 3.0])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert project.result('note') == '说明'
+    with pytest.raises(ValueError):
+        project.section()
+    with pytest.raises(ValueError):
+        project.result(PIPELINE_RESULT)
+    assert ProjectArchive(str(path)).inputs == {'n_l': 0.04}
+
+
+def test_failed_save_keeps_original_file(saved_project, monkeypatch):
+    path, _ = saved_project
+    original = path.read_bytes()
+    writestr = zipfile.ZipFile.writestr
+
+    def failing_writestr(self, name, data, *args, **kwargs):
+        if name.startswith('results/'):
+            raise OSError("磁盘已满")
+        return writestr(self, name, data, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, 'writestr', failing_writestr)
+    with pytest.raises(OSError):
+        save_project_archive(str(path), {'n_l': 0.04}, [0.0, 1.0], [2.0, 3.0], {'note': 'new'})
+
+    assert path.read_bytes() == original
+    assert [p.name for p in path.parent.iterdir()] == ['site.bsp']
+    assert ProjectArchive(str(path)).inputs == PIPELINE_PARAMS
+
+
+def test_failed_first_save_leaves_no_file(tmp_path, monkeypatch):
+    path = tmp_path / 'new.bsp'
+
+    def failing_replace(src, dst):
+        raise OSError("目标文件被占用")
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        save_project_archive(str(path), {'n_l': 0.04})
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,94 @@
+import math
+
+import numpy as np
+import pytest
+
+from bridge_calculations import (calculate_local_scour, calculate_local_scour_65_1, calculate_local_scour_65_1_array,
+                                 calculate_local_scour_array, calculate_scour, calculate_scour_64_2,
+                                 calculate_scour_64_2_array, calculate_scour_array)
+
+_rng = np.random.default_rng(5)
+N = 50
+
+
+def uniform(low, high):
+    return _rng.uniform(low, high, N)
+
+
+def assert_elementwise(array_result, scalar_function, *columns):
+    """数组结果与逐元素调用标量函数的结果一致"""
+    array_result = array_result if isinstance(array_result, tuple) else (array_result,)
+    rows = np.broadcast_arrays(*(np.asarray(column, dtype=float) for column in columns))
+    for index in np.ndindex(rows[0].shape):
+        expected = scalar_function(*(float(column[index]) for column in rows))
+        expected = expected if isinstance(expected, tuple) else (expected,)
+        for value, expected_value in zip(array_result, expected):
+            assert value[index] == pytest.approx(expected_value, rel=1e-12)
+
+
+def test_scour_array_matches_scalar():
+    # B 的取值使 A_d 上限 1.8 对部分元素生效、部分不生效
+    columns = (uniform(500, 3000), uniform(10, 400), uniform(0.02, 3), uniform(100, 400), uniform(3, 8),
+               uniform(2, 6), uniform(0.9, 1.0), uniform(0.6, 1.0), uniform(0.5, 5))
+    scour_depth, A_d = calculate_scour_array(*columns)
+    assert (A_d == 1.8).any() and (A_d < 1.8).any()
+    assert_elementwise((scour_depth, A_d), calculate_scour, *columns)
+
+
+def test_scour_64_2_array_matches_scalar():
+    columns = (uniform(500, 3000), uniform(400, 2500), uniform(100, 400), uniform(80, 380), uniform(0.01, 0.2),
+               uniform(0.9, 1.0), uniform(3, 8), uniform(10, 400), uniform(0.02, 3))
+    h_p, A_d = calculate_scour_64_2_array(*columns)
+    assert (A_d == 1.8).any() and (A_d < 1.8).any()
+    assert_elementwise((h_p, A_d), calculate_scour_64_2, *columns)
+
+
+def test_local_scour_array_covers_both_branches():
+    d = uniform(0.5, 5)
+    V_0 = 0.28 * (d + 0.7) ** 0.5
+    V = V_0 * np.where(np.arange(N) % 2 == 0, uniform(0.5, 1.0), uniform(1.01, 4.0))
+    V[0] = V_0[0]  # 恰好等于 V_0 时取 V <= V_0 分支
+    columns = (V, uniform(0.8, 1.2), d, uniform(1, 8), uniform(2, 12))
+    assert (V <= V_0).any() and (V > V_0).any()
+    assert_elementwise(calculate_local_scour_array(*columns), calculate_local_scour, *columns)
+
+
+def test_local_scour_65_1_array_covers_both_branches():
+    d, h_p, B_1 = uniform(0.5, 5), uniform(2, 12), uniform(1, 8)
+    V_0 = 0.0246 * (h_p / d) ** 0.14 * np.sqrt(332 * d + (10 + h_p) / (d ** 0.72))
+    V = V_0 * np.where(np.arange(N) % 2 == 0, uniform(0.6, 1.0), uniform(1.01, 4.0))
+    columns = (V, uniform(0.8, 1.2), d, B_1, h_p)
+    assert (V <= V_0).any() and (V > V_0).any()
+    assert_elementwise(calculate_local_scour_65_1_array(*columns), calculate_local_scour_65_1, *columns)
+
+
+def test_scalar_arguments_broadcast():
+    V = np.linspace(0.3, 3.0, 7)
+    result = calculate_local_scour_array(V, 1.0, 3.0, 6.0, 5.0)
+    assert result.shape == V.shape
+    assert_elementwise(result, calculate_local_scour, V, 1.0, 3.0, 6.0, 5.0)
+
+    grid = calculate_local_scour_65_1_array(V[:, None], 1.0, 3.0, 6.0, np.array([2.0, 5.0, 9.0]))
+    assert grid.shape == (7, 3)
+    assert_elementwise(grid, calculate_local_scour_65_1, V[:, None], 1.0, 3.0, 6.0, np.array([2.0, 5.0, 9.0]))
+
+    scour_depth, A_d = calculate_scour_array(2000.0, 300.0, 2.5, 250.0, 6.0, 4.0, 1.0, 0.86, 3.0)
+    assert scour_depth.shape == A_d.shape == ()
+    assert float(scour_depth) == pytest.approx(calculate_scour(2000.0, 300.0, 2.5, 250.0, 6.0, 4.0, 1.0, 0.86, 3.0)[0])
+
+
+def test_empty_input():
+    empty = np.empty(0)
+    assert calculate_local_scour_array(empty, 1.0, 3.0, 6.0, 5.0).shape == (0,)
+    assert calculate_local_scour_65_1_array(empty, 1.0, 3.0, 6.0, 5.0).shape == (0,)
+    scour_depth, A_d = calculate_scour_array(empty, 300.0, 2.5, 250.0, 6.0, 4.0, 1.0, 0.86, 3.0)
+    assert scour_depth.shape == A_d.shape == (0,)
+    h_p, A_d = calculate_scour_64_2_array(empty, 2000.0, 300.0, 280.0, 0.1, 1.0, 6.0, 300.0, 2.5)
+    assert h_p.shape == A_d.shape == (0,)
+
+
+def test_array_versions_do_not_warn_for_unused_branch():
+    # V < V_0' 时另一分支对负数取非整数次幂，不应产生警告
+    with np.errstate(all='raise'):
+        calculate_local_scour_array(np.array([0.05, 2.0]), 1.0, 3.0, 6.0, 5.0)
+    assert math.isfinite(calculate_local_scour(0.05, 1.0, 3.0, 6.0, 5.0))
@@ -0,0 +1,161 @@
+import os
+
+import numpy as np
+import pytest
+
+import bridge_calculations
+from bridge_calculations import (SECTION_CACHE_ENV, default_section_cache_dir, load_cross_section,
+                                 section_cache_paths)
+
+SECTION_TEXT = "0,10\n5,6\n10,4\nbad line\n15,6\n20,10\n"
+CHANGED_TEXT = "0,12\n5,7\n10,3\n15,7\n20,12\n25,13\n"
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """记录 load_cross_section 重新解析文本的次数"""
+    calls = []
+    parse = bridge_calculations.parse_cross_section_text
+
+    def counting_parse(content, *args, **kwargs):
+        calls.append(content)
+        return parse(content, *args, **kwargs)
+
+    monkeypatch.setattr(bridge_calculations, 'parse_cross_section_text', counting_parse)
+    monkeypatch.setattr(bridge_calculations, '_unwritable_cache_dirs', set())
+    return calls
+
+
+@pytest.fixture
+def section_file(tmp_path):
+    path = tmp_path / 'section.txt'
+    path.write_text(SECTION_TEXT, encoding='utf-8')
+    return path
+
+
+def load(path, cache_dir):
+    distances, elevations, bad_lines = load_cross_section(str(path), use_cache=True, cache_dir=str(cache_dir))
+    return np.asarray(distances), np.asarray(elevations), bad_lines
+
+
+def test_default_dir_prefers_env_variable(monkeypatch, tmp_path):
+    monkeypatch.setenv(SECTION_CACHE_ENV, str(tmp_path / 'custom'))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    assert default_section_cache_dir() == str(tmp_path / 'custom')
+
+
+def test_default_dir_under_xdg_cache_home(monkeypatch, tmp_path):
+    monkeypatch.delenv(SECTION_CACHE_ENV, raising=False)
+    monkeypatch.setattr(os, 'name', 'posix')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    assert default_section_cache_dir() == os.path.join(str(tmp_path / 'xdg'), 'bridge_scour', 'sections')
+
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    assert default_section_cache_dir() == os.path.join(str(tmp_path / 'home'), '.cache', 'bridge_scour', 'sections')
+
+
+def test_default_dir_under_localappdata(monkeypatch, tmp_path):
+    monkeypatch.delenv(SECTION_CACHE_ENV, raising=False)
+    monkeypatch.setattr(os, 'name', 'nt')
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path / 'local'))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'xdg'))
+    assert default_section_cache_dir() == os.path.join(str(tmp_path / 'local'), 'bridge_scour', 'sections')
+
+
+def test_cache_used_by_default_dir(monkeypatch, tmp_path, section_file, parse_calls):
+    monkeypatch.setenv(SECTION_CACHE_ENV, str(tmp_path / 'cache'))
+    load_cross_section(str(section_file), use_cache=True)
+    directory, meta_path = section_cache_paths(str(section_file))
+    assert directory == str(tmp_path / 'cache')
+    assert os.path.exists(meta_path)
+    assert not any(p.suffix in ('.json', '.npy') for p in section_file.parent.iterdir())
+
+
+def test_second_load_maps_cache_without_parsing(tmp_path, section_file, parse_calls):
+    first = load(section_file, tmp_path / 'cache')
+    distances, elevations, bad_lines = load_cross_section(str(section_file), use_cache=True,
+                                                          cache_dir=str(tmp_path / 'cache'))
+    assert len(parse_calls) == 1
+    assert isinstance(distances, np.memmap)
+    np.testing.assert_array_equal(distances, first[0])
+    np.testing.assert_array_equal(elevations, first[1])
+    assert bad_lines == first[2] == [4]
+    with pytest.raises(ValueError):
+        load_cross_section(str(section_file), strict=True, use_cache=True, cache_dir=str(tmp_path / 'cache'))
+
+
+def test_changed_source_invalidates_cache(tmp_path, section_file, parse_calls):
+    cache_dir = tmp_path / 'cache'
+    load(section_file, cache_dir)
+    section_file.write_text(CHANGED_TEXT, encoding='utf-8')
+
+    distances, elevations, bad_lines = load(section_file, cache_dir)
+    assert len(parse_calls) == 2
+    np.testing.assert_array_equal(distances, [0, 5, 10, 15, 20, 25])
+    np.testing.assert_array_equal(elevations, [12, 7, 3, 7, 12, 13])
+    assert bad_lines == []
+    # 旧内容的数组文件已清理
+    assert len(list(cache_dir.glob('*.npy'))) == 1
+
+    load(section_file, cache_dir)
+    assert len(parse_calls) == 2
+
+
+def test_touched_source_with_same_content_is_not_reparsed(tmp_path, section_file, parse_calls):
+    cache_dir = tmp_path / 'cache'
+    expected = load(section_file, cache_dir)
+    stat = section_file.stat()
+    os.utime(section_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+    distances, elevations, bad_lines = load(section_file, cache_dir)
+    assert len(parse_calls) == 1
+    np.testing.assert_array_equal(distances, expected[0])
+    assert bad_lines == expected[2]
+
+
+@pytest.mark.parametrize('corrupt', ['meta', 'data', 'version'])
+def test_corrupt_cache_falls_back_to_parsing(tmp_path, section_file, parse_calls, corrupt):
+    cache_dir = tmp_path / 'cache'
+    expected = load(section_file, cache_dir)
+    _, meta_path = section_cache_paths(str(section_file), str(cache_dir))
+    if corrupt == 'meta':
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            f.write('{"version": 3, "source_')
+    elif corrupt == 'version':
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            f.write('{"version": 0}')
+    else:
+        for data_path in cache_dir.glob('*.npy'):
+            data_path.write_bytes(b'not an npy file')
+
+    distances, elevations, bad_lines = load(section_file, cache_dir)
+    assert len(parse_calls) == 2
+    np.testing.assert_array_equal(distances, expected[0])
+    np.testing.assert_array_equal(elevations, expected[1])
+    assert bad_lines == expected[2]
+
+    # 重新解析后缓存已修复
+    load(section_file, cache_dir)
+    assert len(parse_calls) == 2
+
+
+def test_unwritable_cache_dir_is_remembered(tmp_path, section_file, parse_calls, monkeypatch):
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('', encoding='utf-8')
+    cache_dir = blocker / 'cache'
+    writes = []
+    write = bridge_calculations.write_section_cache
+
+    def counting_write(*args, **kwargs):
+        writes.append(args[0])
+        return write(*args, **kwargs)
+
+    monkeypatch.setattr(bridge_calculations, 'write_section_cache', counting_write)
+    for _ in range(2):
+        distances, _, bad_lines = load(section_file, cache_dir)
+        np.testing.assert_array_equal(distances, [0, 5, 10, 15, 20])
+        assert bad_lines == [4]
+    assert len(parse_calls) == 2
+    assert len(writes) == 1
+    assert str(cache_dir) in bridge_calculations._unwritable_cache_dirs
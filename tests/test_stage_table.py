@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from bridge_calculations import (CrossSection, ScourPipeline, calculate_flow, calculate_stage_table,
+                                 find_waterline_crossings, identify_channel_and_floodplain, integrate_wetted_section)
+from sections import PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS, SECTIONS
+
+ROUGHNESS = (0.034, 0.032, 0.034)
+SLOPE = 0.00173
+REGIONS = ('left', 'channel', 'right')
+
+
+def region_widths(distances, elevations, water_level, boundary1, boundary2):
+    """逐个水位按 ScourPipeline 的宽度定义求各区域宽度，作为参照"""
+    starts, ends = find_waterline_crossings(distances, elevations, water_level, collapse=True)
+    if len(starts) == 0:
+        return 0.0, 0.0, 0.0
+    left, right = starts[0], ends[0]
+    bounds = ((-np.inf, boundary1), (boundary1, boundary2), (boundary2, np.inf))
+    return tuple(max(min(right, high) - max(left, low), 0.0) for low, high in bounds)
+
+
+@pytest.fixture(params=[SECTIONS[2], SECTIONS[5]], ids=['island', 'noisy'])
+def section_case(request):
+    name, distances, elevations, water_level = request.param
+    d, e = np.array(distances), np.array(elevations)
+    boundary1, boundary2 = identify_channel_and_floodplain(d, e, water_level)
+    levels = np.concatenate([np.linspace(e.min() - 0.5, e.max() + 0.5, 25), e[1:-1]])
+    return d, e, water_level, (boundary1, boundary2), levels
+
+
+def test_rows_match_scalar_functions(section_case):
+    d, e, _, (boundary1, boundary2), levels = section_case
+    table = calculate_stage_table(d, e, levels, *ROUGHNESS, boundaries=(boundary1, boundary2), J=SLOPE)
+    section = CrossSection(d, e)
+
+    for row, level in enumerate(levels):
+        area, width, perimeter = section.geometry(float(level))
+        assert table['area'][row] == pytest.approx(area, abs=1e-9)
+        assert table['top_width'][row] == pytest.approx(width, abs=1e-9)
+        assert table['wetted_perimeter'][row] == pytest.approx(perimeter, abs=1e-9)
+        assert table['hydraulic_radius'][row] == pytest.approx(area / perimeter if perimeter > 0 else 0.0)
+
+        widths = region_widths(d, e, level, boundary1, boundary2)
+        ranges = ((d[0], boundary1), (boundary1, boundary2), (boundary2, d[-1]))
+        total_Q = 0.0
+        for name, n, expected_width, (low, high) in zip(REGIONS, ROUGHNESS, widths, ranges):
+            expected_area = integrate_wetted_section(d, e, level, low, high)[0]
+            expected_Q = calculate_flow(expected_area, expected_width, n, SLOPE)[0]
+            assert table[f'{name}_area'][row] == pytest.approx(expected_area, abs=1e-9)
+            assert table[f'{name}_width'][row] == pytest.approx(expected_width, abs=1e-9)
+            assert table[f'{name}_Q'][row] == pytest.approx(expected_Q, rel=1e-9, abs=1e-9)
+            total_Q += expected_Q
+        assert table['total_Q'][row] == pytest.approx(total_Q, rel=1e-9, abs=1e-9)
+
+
+def test_design_level_matches_pipeline_widths():
+    pipeline = ScourPipeline((PIPELINE_DISTANCES, PIPELINE_ELEVATIONS))
+    result = pipeline.run(PIPELINE_PARAMS)
+    table = calculate_stage_table(PIPELINE_DISTANCES, PIPELINE_ELEVATIONS, PIPELINE_PARAMS['design_water_level'],
+                                  PIPELINE_PARAMS['n_l'], PIPELINE_PARAMS['n_c'], PIPELINE_PARAMS['n_r'],
+                                  boundaries=(result.boundary1, result.boundary2))
+    widths_before = pipeline.intermediates['areas_after']['widths_before']
+    for name, width in zip(REGIONS, widths_before):
+        assert table[f'{name}_width'][0] == pytest.approx(width)
+
+
+def test_bankfull_level_identifies_boundaries(section_case):
+    d, e, bankfull_level, boundaries, levels = section_case
+    by_boundaries = calculate_stage_table(d, e, levels, *ROUGHNESS, boundaries=boundaries)
+    by_level = calculate_stage_table(CrossSection(d, e), None, levels, *ROUGHNESS, bankfull_level=bankfull_level)
+    for key, values in by_boundaries.items():
+        np.testing.assert_allclose(by_level[key], values)
+    assert 'total_Q' not in by_boundaries
+
+
+def test_scalar_level_gives_one_row(section_case):
+    d, e, _, boundaries, levels = section_case
+    table = calculate_stage_table(d, e, float(levels[5]), *ROUGHNESS, boundaries=boundaries, J=SLOPE)
+    full = calculate_stage_table(d, e, levels, *ROUGHNESS, boundaries=boundaries, J=SLOPE)
+    for key, values in table.items():
+        assert values.shape == (1,)
+        assert values[0] == pytest.approx(full[key][5])
+
+
+def test_empty_levels(section_case):
+    d, e, _, boundaries, _ = section_case
+    table = calculate_stage_table(d, e, [], *ROUGHNESS, boundaries=boundaries, J=SLOPE)
+    assert all(values.shape == (0,) for values in table.values())
+
+
+def test_missing_boundaries():
+    with pytest.raises(ValueError):
+        calculate_stage_table([0.0, 1.0, 2.0], [5.0, 1.0, 5.0], [2.0], *ROUGHNESS)
+    with pytest.raises(ValueError):
+        calculate_stage_table([0.0, 1.0, 2.0], [5.0, 1.0, 5.0], [2.0], *ROUGHNESS, bankfull_level=0.5)
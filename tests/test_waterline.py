@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+import baseline
+from bridge_calculations import (CrossSection, calculate_hydraulic_parameters, find_waterline_crossings,
+                                 integrate_wetted_section)
+from sections import DRY_SECTION, SECTIONS, section_ids
+
+
+def loop_crossings(distances, elevations, water_level):
+    """逐段循环求过水区间，作为 find_waterline_crossings 的参照"""
+    def crossing(i):
+        return distances[i] + (water_level - elevations[i]) * \
+            (distances[i + 1] - distances[i]) / (elevations[i + 1] - elevations[i])
+
+    starts, ends = [], []
+    inside = False
+    for i in range(len(distances) - 1):
+        e0, e1 = elevations[i], elevations[i + 1]
+        if min(e0, e1) >= water_level:
+            continue
+        if not inside:
+            starts.append(distances[i] if e0 < water_level else crossing(i))
+            inside = True
+        if e1 >= water_level:
+            ends.append(crossing(i))
+            inside = False
+    if inside:
+        ends.append(distances[-1])
+    return starts, ends
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_crossings_match_loop(name, distances, elevations, water_level):
+    starts, ends = find_waterline_crossings(distances, elevations, water_level)
+    expected_starts, expected_ends = loop_crossings(distances, elevations, water_level)
+    assert isinstance(starts, np.ndarray) and isinstance(ends, np.ndarray)
+    assert starts.tolist() == pytest.approx(expected_starts)
+    assert ends.tolist() == pytest.approx(expected_ends)
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_collapse_matches_baseline_intersections(name, distances, elevations, water_level):
+    starts, ends = find_waterline_crossings(distances, elevations, water_level, collapse=True)
+    expected = baseline.find_waterline_intersections(distances, elevations, water_level)
+    assert isinstance(starts, np.ndarray) and isinstance(ends, np.ndarray)
+    assert [starts[0], ends[0]] == pytest.approx(expected)
+
+
+def test_island_splits_intervals():
+    name, distances, elevations, water_level = SECTIONS[2]
+    starts, ends = find_waterline_crossings(distances, elevations, water_level)
+    assert starts.tolist() == pytest.approx([5.71428571, 34.0])
+    assert ends.tolist() == pytest.approx([26.0, 54.28571429])
+
+
+def test_island_top_at_waterline_splits_intervals():
+    name, distances, elevations, water_level = SECTIONS[3]
+    starts, ends = find_waterline_crossings(distances, elevations, water_level)
+    assert starts.tolist() == pytest.approx([6.25, 20.0])
+    assert ends.tolist() == pytest.approx([20.0, 33.75])
+
+
+@pytest.mark.parametrize('collapse', [False, True])
+def test_dry_section_has_no_crossings(collapse):
+    starts, ends = find_waterline_crossings(*DRY_SECTION, collapse=collapse)
+    assert starts.shape == ends.shape == (0,)
+
+
+@pytest.mark.parametrize('distances, elevations', [([], []), ([0.0], [1.0])])
+@pytest.mark.parametrize('collapse', [False, True])
+def test_short_section_has_no_crossings(distances, elevations, collapse):
+    starts, ends = find_waterline_crossings(distances, elevations, 5.0, collapse=collapse)
+    assert starts.shape == ends.shape == (0,)
+
+
+def test_submerged_ends_extend_to_section_ends():
+    starts, ends = find_waterline_crossings([0.0, 10.0, 20.0], [4.0, 8.0, 4.0], 6.0)
+    assert starts.tolist() == pytest.approx([0.0, 15.0])
+    assert ends.tolist() == pytest.approx([5.0, 20.0])
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_cross_section_intervals_match_function(name, distances, elevations, water_level):
+    section = CrossSection(distances, elevations)
+    starts, ends = section.wetted_intervals(water_level)
+    expected_starts, expected_ends = find_waterline_crossings(distances, elevations, water_level)
+    np.testing.assert_allclose(starts, expected_starts)
+    np.testing.assert_allclose(ends, expected_ends)
+
+
+@pytest.mark.parametrize('name, distances, elevations, water_level', SECTIONS, ids=section_ids())
+def test_wetted_width_matches_interval_lengths(name, distances, elevations, water_level):
+    starts, ends = find_waterline_crossings(distances, elevations, water_level)
+    _, width, _, _ = integrate_wetted_section(distances, elevations, water_level)
+    assert width == pytest.approx(float(np.sum(ends - starts)))
+
+
+def test_wetted_only_excludes_island():
+    name, distances, elevations, water_level = SECTIONS[2]
+    d, e = np.array(distances), np.array(elevations)
+    for method in ('vectorized', 'exact'):
+        avg_depth, _, flow_area, (left, right) = calculate_hydraulic_parameters(d, e, water_level, method=method)
+        wetted_avg, _, wetted_area, _ = calculate_hydraulic_parameters(d, e, water_level, method=method,
+                                                                       wetted_only=True)
+
+        # 河心滩在 6 m 水位下露出 26～34 之间的 8 m
+        assert wetted_area == pytest.approx(flow_area)
+        assert wetted_avg == pytest.approx(flow_area / (right - left - 8.0))
+        if method == 'exact':
+            assert avg_depth == pytest.approx(flow_area / (right - left))